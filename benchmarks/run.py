@@ -0,0 +1,278 @@
+"""
+Performance benchmarks for the main pipeline stages.
+
+Times fit, predict, decompose, rolling CV, scenarios and panel fitting on
+synthetic data of configurable size, and reports wall time, peak Python
+memory (tracemalloc) and throughput per stage. Results can be saved as
+JSON and compared against an earlier run to catch regressions:
+
+    python -m benchmarks.run --weeks 104 520 --channels 6 24 --save new.json
+    python -m benchmarks.run --compare baseline.json
+"""
+
+import argparse
+import functools
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+from src.data.generate import generate_weekly_data
+from src.insights import budget_scenario, budget_scenarios, decompose_sales
+from src.model import MMM, PanelMMM
+from src.validation import rolling_origin_cv
+
+N_SCENARIOS = 1000
+
+
+def make_data(n_weeks, n_channels, seed=0):
+    """
+    generate_weekly_data, widened to n_channels spend columns.
+
+    Extra channels are noisy copies of the base six; they only exist to
+    scale the feature count, so sales are left as generated.
+    """
+    df = generate_weekly_data(n_weeks=n_weeks, seed=seed)
+    base = [c for c in df.columns if c.startswith("spend_")]
+    rng = np.random.default_rng(seed)
+
+    extra = {}
+    for k in range(max(0, n_channels - len(base))):
+        source = df[base[k % len(base)]].to_numpy()
+        extra[f"spend_extra{k}"] = source * rng.uniform(0.5, 1.5, n_weeks)
+    df = pd.concat([df, pd.DataFrame(extra, index=df.index)], axis=1)
+
+    drop = base[n_channels:] if n_channels < len(base) else []
+    return df.drop(columns=drop)
+
+
+def make_panel(n_weeks, n_channels, n_groups):
+    parts = []
+    for g in range(n_groups):
+        df = make_data(n_weeks, n_channels, seed=g)
+        df["group"] = g
+        parts.append(df)
+    return pd.concat(parts, ignore_index=True)
+
+
+def _stages(n_weeks, n_channels, n_groups):
+    """
+    (stage name, setup -> callable, work units, unit name) for one size.
+
+    Setup is lazy and shared: data, the fitted model and the panel are
+    built on first use, so running one stage only pays for what it needs
+    (and setup never lands in a stage's timing or memory peak).
+    """
+    min_train = max(8, n_weeks // 2)
+    data = functools.cache(lambda: make_data(n_weeks, n_channels))
+    model = functools.cache(lambda: MMM().fit(data()))
+    panel = functools.cache(lambda: make_panel(n_weeks, n_channels, n_groups))
+
+    def fit():
+        df = data()
+        return lambda: MMM().fit(df)
+
+    def predict():
+        df, m = data(), model()
+
+        def uncached_predict():
+            # clear the feature cache so this measures the full feature build
+            m._feature_cache.clear()
+            return m.predict(df)
+
+        return uncached_predict
+
+    def predict_cached():
+        df, m = data(), model()
+        return lambda: m.predict(df)
+
+    def decompose():
+        df, m = data(), model()
+        return lambda: decompose_sales(m, df)
+
+    def cv(reuse_features=False):
+        df = data()
+        return lambda: rolling_origin_cv(
+            df, min_train_weeks=min_train, step=4, reuse_features=reuse_features
+        )
+
+    def scenario():
+        df, m = data(), model()
+        return lambda: budget_scenario(m, df, {m.spend_cols_[0]: 1.1})
+
+    def scenarios_batch():
+        df, m = data(), model()
+        multipliers = np.random.default_rng(0).uniform(
+            0.8, 1.2, size=(N_SCENARIOS, len(m.spend_cols_))
+        )
+        return lambda: budget_scenarios(m, df, multipliers)
+
+    def panel_fit():
+        df = panel()
+        return lambda: PanelMMM("group").fit(df)
+
+    return [
+        ("fit", fit, n_weeks, "rows/s"),
+        ("predict", predict, n_weeks, "rows/s"),
+        ("predict_cached", predict_cached, n_weeks, "rows/s"),
+        ("decompose", decompose, n_weeks, "rows/s"),
+        ("cv", cv, n_weeks, "rows/s"),
+        ("cv_reuse", lambda: cv(reuse_features=True), n_weeks, "rows/s"),
+        ("scenario", scenario, 1, "scenarios/s"),
+        ("scenarios_batch", scenarios_batch, N_SCENARIOS, "scenarios/s"),
+        ("panel_fit", panel_fit, n_groups, "groups/s"),
+    ]
+
+
+def _measure(func, repeat):
+    """Median wall time over repeat runs, plus peak traced memory of one run."""
+    func()  # warm up imports / caches outside the timed runs
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return statistics.median(times), peak / 1e6
+
+
+def run_benchmarks(weeks=(104,), channels=(6,), groups=(4,), repeat=3, stages=None):
+    """
+    Run every stage for every (weeks, channels, groups) combination.
+
+    Returns a dict with run metadata and a list of result rows.
+    """
+    results = []
+    for n_weeks in weeks:
+        for n_channels in channels:
+            for n_groups in groups:
+                for name, setup, units, unit in _stages(n_weeks, n_channels, n_groups):
+                    if stages and name not in stages:
+                        continue
+                    wall, peak_mb = _measure(setup(), repeat)
+                    results.append({
+                        "stage": name,
+                        "weeks": n_weeks,
+                        "channels": n_channels,
+                        "groups": n_groups,
+                        "wall_s": wall,
+                        "peak_mb": peak_mb,
+                        "throughput": units / wall if wall > 0 else float("inf"),
+                        "unit": unit,
+                    })
+
+    return {"meta": _metadata(repeat), "results": results}
+
+
+def _metadata(repeat):
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "repeat": repeat,
+    }
+
+
+def _key(row):
+    return (row["stage"], row["weeks"], row["channels"], row["groups"])
+
+
+def compare(baseline, current, threshold=0.25):
+    """
+    Match rows by (stage, weeks, channels, groups) and flag slowdowns.
+
+    Returns a list of dicts with baseline/current wall time, the ratio
+    (current / baseline) and regressed = ratio > 1 + threshold.
+    """
+    old = {_key(row): row for row in baseline["results"]}
+    rows = []
+    for row in current["results"]:
+        before = old.get(_key(row))
+        if before is None:
+            continue
+        ratio = row["wall_s"] / before["wall_s"] if before["wall_s"] > 0 else 1.0
+        rows.append({
+            "stage": row["stage"],
+            "weeks": row["weeks"],
+            "channels": row["channels"],
+            "groups": row["groups"],
+            "baseline_s": before["wall_s"],
+            "current_s": row["wall_s"],
+            "ratio": ratio,
+            "regressed": ratio > 1 + threshold,
+        })
+    return rows
+
+
+def _print_results(report):
+    print(f"{'stage':18s} {'weeks':>6s} {'chan':>5s} {'groups':>6s} "
+          f"{'wall ms':>10s} {'peak MB':>8s} {'throughput':>14s}")
+    for r in report["results"]:
+        print(f"{r['stage']:18s} {r['weeks']:6d} {r['channels']:5d} {r['groups']:6d} "
+              f"{r['wall_s'] * 1e3:10.2f} {r['peak_mb']:8.2f} "
+              f"{r['throughput']:10.0f} {r['unit']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--weeks", type=int, nargs="+", default=[104])
+    parser.add_argument("--channels", type=int, nargs="+", default=[6])
+    parser.add_argument("--groups", type=int, nargs="+", default=[4])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--stages", nargs="+", help="only run these stages")
+    parser.add_argument("--save", help="write results JSON here")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown before flagging (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(
+        args.weeks, args.channels, args.groups, args.repeat, args.stages
+    )
+    _print_results(report)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved results to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows = compare(baseline, report, args.threshold)
+        print(f"\nvs {args.compare} (commit {baseline['meta'].get('commit')}):")
+        for r in rows:
+            flag = "  REGRESSED" if r["regressed"] else ""
+            print(f"  {r['stage']:18s} w={r['weeks']} c={r['channels']} "
+                  f"g={r['groups']}: {r['ratio']:.2f}x{flag}")
+        if any(r["regressed"] for r in rows):
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
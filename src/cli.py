@@ -0,0 +1,487 @@
+"""
+Command-line entry point for the whole pipeline: `mmm <command> ...`
+
+    mmm generate --out data/weekly_data.csv
+    mmm fit --data data/weekly_data.csv --out models/model.mmm --decay meta=0.7
+    mmm cv --data data/weekly_data.csv --n-jobs -1
+    mmm decompose --model models/model.mmm --data data/weekly_data.csv
+    mmm scenario --model models/model.mmm --data data/weekly_data.csv \\
+        --set spend_meta=1.1 --set spend_reddit=0.9
+    mmm export --model models/a.mmm --data data/a.csv \\
+        --model models/b.mmm --data data/b.csv --format csv --format parquet
+    mmm plot --roas data/roas_summary.csv
+    mmm plot --model models/a.mmm --data data/a.csv \\
+        --model models/b.mmm --data data/b.csv --n-jobs -1
+    mmm batch jobs.json
+
+Heavy modules (sklearn, scipy, matplotlib) are imported inside the
+command that needs them, so e.g. `mmm generate` never loads sklearn and
+nothing but `mmm plot` loads matplotlib.
+
+Any command takes --config FILE (JSON or TOML) to fill in options not
+given on the command line. `mmm batch FILE` runs a list of jobs:
+    {"jobs": [{"command": "fit", "data": "a.csv", "out": "a.mmm"}, ...]}
+Option names in config files use underscores (min_train_weeks) and
+decay_rates may be given as a {"channel": rate} table.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+
+def _load_config(path):
+    if path.endswith(".toml"):
+        import tomllib
+
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    with open(path) as f:
+        return json.load(f)
+
+
+def _decay_rates(value):
+    """
+    --decay meta=0.7 --decay google=0.3, or a dict from a config file
+    (which can also hold kernel specs, e.g. {"type": "weibull", ...}).
+    """
+    if not value:
+        return None
+    if isinstance(value, dict):
+        # kernel adstock specs (dicts) pass through as they are
+        return {
+            k: v if isinstance(v, dict) else float(v) for k, v in value.items()
+        }
+
+    rates = {}
+    for item in value:
+        channel, sep, rate = item.partition("=")
+        if not sep:
+            raise SystemExit(f"--decay expects CHANNEL=RATE, got {item!r}")
+        rates[channel] = float(rate)
+    return rates
+
+
+def _seasonalities(value):
+    """--seasonality 7:3 --seasonality 365.25:10, or [[7, 3], ...] from config."""
+    if not value:
+        return None
+    pairs = []
+    for item in value:
+        if isinstance(item, str):
+            period, sep, order = item.partition(":")
+            if not sep:
+                raise SystemExit(f"--seasonality expects PERIOD:ORDER, got {item!r}")
+            item = (period, order)
+        pairs.append((float(item[0]), int(item[1])))
+    return pairs
+
+
+def _saturation_params(value):
+    """
+    --saturation-param slope=1.5 --saturation-param half_saturation.meta=60000,
+    or a {"param": value or {"channel": value}} table from a config file.
+    """
+    if not value:
+        return None
+    if isinstance(value, dict):
+        return value
+
+    params = {}
+    for item in value:
+        key, sep, number = item.partition("=")
+        if not sep:
+            raise SystemExit(
+                f"--saturation-param expects NAME[.CHANNEL]=VALUE, got {item!r}"
+            )
+        name, _, channel = key.partition(".")
+        if channel:
+            params.setdefault(name, {})[channel] = float(number)
+        else:
+            params[name] = float(number)
+    return params
+
+
+def _mmm_kwargs(args):
+    return {
+        "decay_rates": _decay_rates(args.decay_rates),
+        "saturation_method": args.saturation,
+        "n_fourier_terms": args.fourier_terms,
+        "alpha": args.alpha,
+        "l1_ratio": args.l1_ratio,
+        "seasonalities": _seasonalities(args.seasonalities),
+        "time_col": args.time_col,
+        "saturation_params": _saturation_params(args.saturation_params),
+    }
+
+
+def _read_data(path):
+    import pandas as pd
+
+    return pd.read_csv(path)
+
+
+def _ensure_parent(path):
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+
+
+def _print_json(result, out=None):
+    from src.utils import to_jsonable
+
+    text = json.dumps(to_jsonable(result), indent=2)
+    if out:
+        _ensure_parent(out)
+        with open(out, "w") as f:
+            f.write(text + "\n")
+        print(f"Wrote {out}")
+    else:
+        print(text)
+
+
+def cmd_generate(args):
+    from src.data.generate import (
+        generate_panel_chunks,
+        generate_weekly_data,
+        write_chunks,
+    )
+
+    single = (args.titles, args.geos, args.channels, args.freq) == (1, 1, 6, "W")
+    if single and not args.out.endswith((".parquet", ".pq")):
+        df = generate_weekly_data(n_weeks=args.weeks, seed=args.seed)
+        _ensure_parent(args.out)
+        df.to_csv(args.out, index=False)
+        print(f"Generated {len(df)} weeks of data -> {args.out}")
+        return
+
+    # larger panels are streamed to disk chunk by chunk
+    chunks = generate_panel_chunks(
+        n_periods=args.weeks,
+        n_channels=args.channels,
+        freq=args.freq,
+        titles=args.titles,
+        geos=args.geos,
+        chunk_rows=args.chunk_rows,
+        seed=args.seed,
+    )
+    n_rows = write_chunks(chunks, args.out)
+    print(f"Generated {n_rows} rows of panel data -> {args.out}")
+
+
+def cmd_fit(args):
+    from src.model import MMM, save_model
+
+    df = _read_data(args.data)
+    model = MMM(**_mmm_kwargs(args)).fit(df, target_col=args.target)
+    _ensure_parent(args.out)
+    save_model(model, args.out)
+    print(f"Fitted model on {len(df)} rows -> {args.out}")
+
+
+def cmd_cv(args):
+    from src.validation import rolling_origin_cv
+
+    results = rolling_origin_cv(
+        _read_data(args.data),
+        min_train_weeks=args.min_train_weeks,
+        test_weeks=args.test_weeks,
+        step=args.step,
+        target_col=args.target,
+        reuse_features=args.reuse_features,
+        n_jobs=args.n_jobs,
+        **_mmm_kwargs(args),
+    )
+    if not args.folds:
+        results = {k: v for k, v in results.items() if k != "folds"}
+    _print_json(results, args.out)
+
+
+def cmd_decompose(args):
+    from src.insights import decompose_sales, roas_summary
+    from src.model import load_model
+
+    model = load_model(args.model)
+    df = _read_data(args.data)
+
+    decomp = decompose_sales(model, df)
+    decomp.insert(0, model.time_col, df[model.time_col].to_numpy())
+    _ensure_parent(args.out)
+    decomp.to_csv(args.out, index=False)
+    print(f"Exported decomposition to {args.out}")
+
+    if args.roas:
+        _ensure_parent(args.roas)
+        roas_summary(model, df).to_csv(args.roas, index=False)
+        print(f"Exported ROAS summary to {args.roas}")
+
+
+def _model_jobs(args, command):
+    """name -> (model path, data path) from repeated --model/--data/--name."""
+    models, data = args.model or [], args.data or []
+    if not models or len(models) != len(data):
+        raise SystemExit(f"{command} needs one --data per --model")
+    names = args.name or [os.path.splitext(os.path.basename(m))[0] for m in models]
+    if len(names) != len(models) or len(set(names)) != len(names):
+        raise SystemExit(f"{command} needs one unique --name per --model")
+    return dict(zip(names, zip(models, data)))
+
+
+def cmd_export(args):
+    from src.viz.export_data import export_models
+
+    results = export_models(
+        _model_jobs(args, "export"),
+        output_dir=args.out_dir,
+        formats=args.format or ["csv"],
+        force=args.force,
+        n_jobs=args.n_jobs,
+    )
+    written = sum(r["status"] == "written" for r in results.values())
+    print(
+        f"Exported {written} model(s), skipped {len(results) - written} "
+        f"unchanged -> {args.out_dir}"
+    )
+
+
+def cmd_scenario(args):
+    from src.insights import budget_scenario, optimize_budget
+    from src.model import load_model
+
+    model = load_model(args.model)
+    df = _read_data(args.data)
+
+    if args.optimize:
+        result = optimize_budget(model, df, total_budget=args.total_budget)
+    else:
+        reallocations = args.set
+        if not isinstance(reallocations, dict):
+            reallocations = {}
+            for item in args.set or []:
+                col, sep, multiplier = item.partition("=")
+                if not sep:
+                    raise SystemExit(f"--set expects COLUMN=MULTIPLIER, got {item!r}")
+                reallocations[col] = float(multiplier)
+        if not reallocations:
+            raise SystemExit("scenario needs --set COLUMN=MULTIPLIER or --optimize")
+        result = budget_scenario(model, df, reallocations)
+
+    _print_json(result, args.out)
+
+
+def cmd_plot(args):
+    if args.model:
+        from src.viz.charts import render_charts
+
+        files = render_charts(
+            _model_jobs(args, "plot"),
+            output_dir=args.out_dir,
+            charts=args.chart or ["roas", "contribution"],
+            n_jobs=args.n_jobs,
+        )
+        print(f"Rendered charts for {len(files)} model(s) -> {args.out_dir}")
+        return
+
+    from src.viz.charts import plot_contribution
+    from src.viz.roas_chart import plot_roas
+
+    plot_roas(input_file=args.roas, output_dir=args.out_dir)
+    if args.decomposition:
+        path = plot_contribution(
+            _read_data(args.decomposition),
+            os.path.join(args.out_dir, "channel_contribution.png"),
+        )
+        print(f"Saved: {path}")
+
+
+def cmd_batch(args):
+    config = _load_config(args.file)
+    jobs = config.get("jobs", [])
+    parser = build_parser()
+
+    for i, job in enumerate(jobs):
+        job = dict(job)
+        command = job.pop("command", None)
+        if command not in COMMANDS or command == "batch":
+            raise SystemExit(f"job {i}: unknown command {command!r}")
+
+        job_args = parser.parse_args([command, *_required_args(command, job)])
+        _apply_config(parser, job_args, job)
+        print(f"[{i + 1}/{len(jobs)}] {command}")
+        job_args.func(job_args)
+
+
+def _required_args(command, job):
+    # required options must be on the argv for argparse to accept it
+    argv = []
+    for option in REQUIRED.get(command, []):
+        if option in job:
+            argv += [f"--{option.replace('_', '-')}", str(job[option])]
+    return argv
+
+
+def _apply_config(parser, args, config):
+    """Fill options still at their default from a config dict."""
+    subparser = SUBPARSERS[args.command]
+    for key, value in config.items():
+        key = key.replace("-", "_")
+        if key == "decay":
+            key = "decay_rates"
+        if not hasattr(args, key):
+            raise SystemExit(f"{args.command}: unknown option {key!r} in config")
+        if getattr(args, key) == subparser.get_default(key):
+            setattr(args, key, value)
+
+
+COMMANDS = {
+    "generate": cmd_generate,
+    "fit": cmd_fit,
+    "cv": cmd_cv,
+    "decompose": cmd_decompose,
+    "export": cmd_export,
+    "scenario": cmd_scenario,
+    "plot": cmd_plot,
+    "batch": cmd_batch,
+}
+
+# options that are required on the command line (but may come from config)
+REQUIRED = {
+    "fit": ["data"],
+    "cv": ["data"],
+    "decompose": ["model", "data"],
+    "scenario": ["model", "data"],
+}
+
+SUBPARSERS = {}
+
+
+def _add_model_args(p):
+    p.add_argument("--decay", dest="decay_rates", action="append",
+                   metavar="CHANNEL=RATE", help="decay rate per channel (default 0.5)")
+    p.add_argument("--saturation", default="sqrt",
+                   choices=["sqrt", "log", "hill", "logistic"])
+    p.add_argument("--saturation-param", dest="saturation_params", action="append",
+                   metavar="NAME[.CHANNEL]=VALUE",
+                   help="curve parameter for hill/logistic, repeatable")
+    p.add_argument("--fourier-terms", type=int, default=2)
+    p.add_argument("--alpha", type=float, default=1.0)
+    p.add_argument("--l1-ratio", type=float, default=0.5)
+    p.add_argument("--seasonality", dest="seasonalities", action="append",
+                   metavar="PERIOD:ORDER",
+                   help="seasonal cycle, repeatable (default 52:FOURIER_TERMS)")
+    p.add_argument("--time-col", default="week")
+    p.add_argument("--target", default="sales")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="mmm", description="Lightweight Marketing Mix Model pipeline"
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add(name, help):
+        p = sub.add_parser(name, help=help)
+        p.add_argument("--config", help="JSON/TOML file with default options")
+        p.set_defaults(func=COMMANDS[name])
+        SUBPARSERS[name] = p
+        return p
+
+    p = add("generate", "generate synthetic data (CSV, or Parquet by extension)")
+    p.add_argument("--weeks", type=int, default=104,
+                   help="periods per series (days with --freq D)")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--out", default="data/weekly_data.csv")
+    p.add_argument("--channels", type=int, default=6)
+    p.add_argument("--freq", default="W", choices=["W", "D"])
+    p.add_argument("--titles", type=int, default=1)
+    p.add_argument("--geos", type=int, default=1)
+    p.add_argument("--chunk-rows", type=int, default=1_000_000)
+
+    p = add("fit", "fit a model and save it")
+    p.add_argument("--data", required=True)
+    p.add_argument("--out", default="models/model.mmm")
+    _add_model_args(p)
+
+    p = add("cv", "rolling-origin cross-validation")
+    p.add_argument("--data", required=True)
+    p.add_argument("--min-train-weeks", type=int, default=52)
+    p.add_argument("--test-weeks", type=int, default=4)
+    p.add_argument("--step", type=int, default=4)
+    p.add_argument("--reuse-features", action="store_true")
+    p.add_argument("--n-jobs", type=int, default=1)
+    p.add_argument("--folds", action="store_true", help="include per-fold metrics")
+    p.add_argument("--out", help="write JSON here instead of stdout")
+    _add_model_args(p)
+
+    p = add("decompose", "export decomposition (and ROAS) for a saved model")
+    p.add_argument("--model", required=True)
+    p.add_argument("--data", required=True)
+    p.add_argument("--out", default="data/decomposition.csv")
+    p.add_argument("--roas", help="also write the ROAS summary here")
+
+    p = add("export", "export decomposition/ROAS for many models, skipping "
+                      "unchanged ones")
+    p.add_argument("--model", action="append", help="saved model, repeatable")
+    p.add_argument("--data", action="append", help="its data (CSV/Parquet)")
+    p.add_argument("--name", action="append",
+                   help="output name per model (default: model file name)")
+    p.add_argument("--out-dir", default="reports/exports")
+    p.add_argument("--format", action="append", choices=["csv", "parquet", "arrow"])
+    p.add_argument("--force", action="store_true", help="ignore the manifest")
+    p.add_argument("--n-jobs", type=int, default=1)
+
+    p = add("scenario", "budget reallocation what-ifs for a saved model")
+    p.add_argument("--model", required=True)
+    p.add_argument("--data", required=True)
+    p.add_argument("--set", action="append", metavar="COLUMN=MULTIPLIER")
+    p.add_argument("--optimize", action="store_true",
+                   help="find the best mix for the budget instead")
+    p.add_argument("--total-budget", type=float)
+    p.add_argument("--out", help="write JSON here instead of stdout")
+
+    p = add("plot", "render charts")
+    p.add_argument("--roas", default="data/roas_summary.csv")
+    p.add_argument("--decomposition",
+                   help="also draw contribution over time from this CSV")
+    p.add_argument("--model", action="append",
+                   help="saved model, repeatable: render charts for each "
+                        "model/--data pair instead of --roas")
+    p.add_argument("--data", action="append", help="its data (CSV/Parquet)")
+    p.add_argument("--name", action="append",
+                   help="output name per model (default: model file name)")
+    p.add_argument("--chart", action="append", choices=["roas", "contribution"])
+    p.add_argument("--out-dir", default="reports/figures")
+    p.add_argument("--n-jobs", type=int, default=1)
+
+    p = add("batch", "run the jobs listed in a config file")
+    p.add_argument("file")
+
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    argv = sys.argv[1:] if argv is None else list(argv)
+
+    # --config can also supply required options, so splice those in first
+    if "--config" in argv:
+        i = argv.index("--config")
+        if i + 1 == len(argv):
+            parser.error("--config needs a FILE (JSON or TOML)")
+        config = _load_config(argv[i + 1])
+        command = next((a for a in argv if a in COMMANDS), None)
+        given = {a.lstrip("-").replace("-", "_") for a in argv if a.startswith("--")}
+        missing = {k: v for k, v in config.items() if k not in given}
+        argv += _required_args(command, missing)
+
+    args = parser.parse_args(argv)
+    if args.config:
+        _apply_config(parser, args, _load_config(args.config))
+
+    args.func(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,120 +1,330 @@
 """
 Synthetic data generator for MMM.
 Creates weekly spend/sales data with seasonality, promos, and other noise.
+
+generate_weekly_data is the small single-series dataset used everywhere.
+For load testing, generate_panel_chunks scales the same simulation to any
+number of channels, daily or weekly periods and many titles x geos,
+yielding the panel in chunks so tens of millions of rows never have to
+sit in memory at once (write_chunks streams them to CSV/Parquet).
 """
 
+import itertools
+import os
+
 import numpy as np
 import pandas as pd
 
+# The six real channels: (name, weekly spend low, weekly spend high, true
+# coefficient on sqrt(spend)). Coefficients reflect relative effectiveness:
+# Meta/Google strongest, niche channels weaker.
+# Twitch = paid creator activations (influencer spend, not platform ads)
+CHANNELS = [
+    ("meta", 15000, 80000, 1.2),
+    ("google", 10000, 60000, 1.0),
+    ("tiktok", 5000, 40000, 0.7),
+    ("reddit", 2000, 15000, 0.3),
+    ("x", 3000, 20000, 0.2),
+    ("twitch", 5000, 35000, 0.5),
+]
 
-def generate_weekly_data(n_weeks=104, seed=42):
+BASE_SALES = 50000
+PROMO_RATE, PROMO_LIFT = 0.08, 0.20
+COMPETITOR_RATE, COMPETITOR_HIT = 0.05, -0.10
+LAUNCH_SPEND = [3.0, 2.5, 1.8, 1.3]
+LAUNCH_SALES = [80000, 50000, 30000, 15000]
+
+# period length / seasonal peak offset / within-week cycle, per granularity
+FREQS = {
+    "W": {"periods_per_week": 1, "year": 52, "peak": 48},
+    "D": {"periods_per_week": 7, "year": 365.25, "peak": 48 * 7},
+}
+WEEKDAY_AMPLITUDE = 0.08
+
+
+def channel_specs(n_channels=6, seed=42):
     """
-    Generates synthetic marketing mix data
+    (name, low, high, coef) for n_channels channels.
 
-    Simulates ~2 years of weekly data for a game with:
-    - 6 marketing channels (Meta, Google Ads, TikTok, Reddit, X, Twitch)
-      - Seasonal patterns (holiday bumps, summer lulls)
-      - Occasional promos and competitor launches
-      - A launch spike in the first few weeks
+    The first six are CHANNELS; extra ones get spend ranges and
+    coefficients drawn from seed, so they're the same on every call.
     """
-    rng = np.random.default_rng(seed)
+    specs = CHANNELS[:n_channels]
+    extra = n_channels - len(specs)
+    if extra > 0:
+        rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(0,)))
+        low = rng.uniform(2000, 15000, extra).round(-3)
+        high = low * rng.uniform(2, 6, extra).round(1)
+        coef = rng.uniform(0.1, 1.0, extra).round(2)
+        specs = specs + [
+            (f"ch{k}", float(lo), float(hi), float(c))
+            for k, lo, hi, c in zip(range(6, n_channels), low, high, coef)
+        ]
+    return specs
 
-    weeks = np.arange(n_weeks)
-    start_date = pd.Timestamp("2023-01-01")
-    dates = [start_date + pd.Timedelta(weeks=int(w)) for w in weeks]
 
-    # Channel spend
-    # Base spend patterns with some correlation (campaigns often run together)
-    base_activity = rng.uniform(0.5, 1.5, n_weeks)  # shared marketing "intensity"
+def ground_truth(n_channels=6, freq="W", seed=42):
+    """
+    The parameters the generator simulates with, for checking recovery:
 
-    # Major paid channels
-    spend_meta = base_activity * rng.uniform(15000, 80000, n_weeks)
-    spend_google = base_activity * rng.uniform(10000, 60000, n_weeks)
-    spend_tiktok = base_activity * rng.uniform(5000, 40000, n_weeks)
+        sales = (base + sum(coef * sqrt(spend)) + launch)
+                * seasonality * weekday * (1 + promo_lift + competitor_hit)
+                * noise
+
+    with base, spend and launch scaled by each series' size (1 for
+    generate_weekly_data).
+    """
+    f = FREQS[freq]
+    specs = channel_specs(n_channels, seed)
+    return {
+        "coefficients": {f"spend_{name}": coef for name, _, _, coef in specs},
+        "saturation": "sqrt",
+        "base_sales": BASE_SALES / f["periods_per_week"],
+        "promo_lift": PROMO_LIFT,
+        "competitor_hit": COMPETITOR_HIT,
+        "seasonality_amplitude": 0.15,
+        "seasonality_period": f["year"],
+        "weekday_amplitude": WEEKDAY_AMPLITUDE if freq == "D" else 0.0,
+        "noise_cv": 0.05,
+    }
 
-    # Smaller/niche channels
-    spend_reddit = base_activity * rng.uniform(2000, 15000, n_weeks)
-    spend_x = base_activity * rng.uniform(3000, 20000, n_weeks)
 
-    # Twitch = paid creator activations (influencer spend, not platform ads)
-    spend_twitch = base_activity * rng.uniform(5000, 35000, n_weeks)
+def _launch(values, launch_week, fill):
+    """Per-period launch profile: values[week] for the first weeks, else fill."""
+    values = np.asarray(values, dtype=float)
+    out = np.full(len(launch_week), float(fill))
+    early = launch_week < len(values)
+    out[early] = values[launch_week[early]]
+    return out
 
-    # Launch spike: heavy spend in first 4 weeks
-    launch_multiplier = np.array([3.0, 2.5, 1.8, 1.3] + [1.0] * (n_weeks - 4))
-    spend_meta *= launch_multiplier
-    spend_google *= launch_multiplier
-    spend_tiktok *= launch_multiplier
-    spend_reddit *= launch_multiplier
-    spend_x *= launch_multiplier
-    spend_twitch *= launch_multiplier
+
+def _simulate(rng, t, specs, freq="W", size=1.0):
+    """
+    One series over period indices t. Returns (spend, promo, competitor,
+    sales) with spend as a (channel x period) array.
+    """
+    f = FREQS[freq]
+    per_week = f["periods_per_week"]
+    n = len(t)
+    low = np.array([s[1] for s in specs], dtype=float)[:, None] * size / per_week
+    high = np.array([s[2] for s in specs], dtype=float)[:, None] * size / per_week
+    coef = np.array([s[3] for s in specs], dtype=float)[:, None]
+
+    # Channel spend
+    # Base spend patterns with some correlation (campaigns often run together)
+    base_activity = rng.uniform(0.5, 1.5, n)  # shared marketing "intensity"
+    spend = base_activity * rng.uniform(low, high, (len(specs), n))
+
+    # Launch spike: heavy spend in the first 4 weeks
+    launch_week = t // per_week
+    spend *= _launch(LAUNCH_SPEND, launch_week, 1.0)
 
     # Events
-    # Promos: ~8% of weeks have a sale/promo
-    promo = rng.random(n_weeks) < 0.08
+    # Promos: ~8% of periods have a sale/promo
+    promo = rng.random(n) < PROMO_RATE
 
-    # Competitor launches: ~5% of weeks, tends to hurt sales
-    competitor_launch = rng.random(n_weeks) < 0.05
+    # Competitor launches: ~5% of periods, tends to hurt sales
+    competitor_launch = rng.random(n) < COMPETITOR_RATE
 
     # Seasonality
     # Annual cycle: peak around holidays (week ~48-52), dip in summer
-    seasonality = 1 + 0.15 * np.sin(2 * np.pi * (weeks - 48) / 52)
-
-    # Sales generation
-    base_sales = 50000
+    seasonality = 1 + 0.15 * np.sin(2 * np.pi * (t - f["peak"]) / f["year"])
+    if per_week > 1:
+        seasonality = seasonality * (1 + WEEKDAY_AMPLITUDE * np.sin(2 * np.pi * t / 7))
 
     # Channel contributions (these are the "true" effects we'll try to recover)
     # Diminishing returns baked in via sqrt
-    # Coefficients reflect relative effectiveness: Meta/Google strongest, niche channels weaker
-    channel_effect = (
-        1.2 * np.sqrt(spend_meta) +
-        1.0 * np.sqrt(spend_google) +
-        0.7 * np.sqrt(spend_tiktok) +
-        0.3 * np.sqrt(spend_reddit) +
-        0.2 * np.sqrt(spend_x) +
-        0.5 * np.sqrt(spend_twitch)
-    )
+    channel_effect = (coef * np.sqrt(spend)).sum(axis=0)
 
     # Launch spike for sales too
-    launch_sales_boost = np.array([80000, 50000, 30000, 15000] + [0] * (n_weeks - 4))
+    launch_sales_boost = _launch(LAUNCH_SALES, launch_week, 0) * size / per_week
 
     # Promo lift: +20% when active
-    promo_lift = np.where(promo, 0.20, 0.0)
+    promo_lift = np.where(promo, PROMO_LIFT, 0.0)
 
     # Competitor hit: -10% when they launch
-    competitor_hit = np.where(competitor_launch, -0.10, 0.0)
+    competitor_hit = np.where(competitor_launch, COMPETITOR_HIT, 0.0)
 
     # Combine everything
     sales = (
-        (base_sales + channel_effect + launch_sales_boost) *
+        (BASE_SALES * size / per_week + channel_effect + launch_sales_boost) *
         seasonality *
         (1 + promo_lift + competitor_hit)
     )
 
     # Add noise (~5% CV)
-    noise = rng.normal(1.0, 0.05, n_weeks)
+    noise = rng.normal(1.0, 0.05, n)
     sales = sales * noise
     sales = np.maximum(sales, 0).round().astype(int)
 
-    df = pd.DataFrame({
-        "week": weeks,
-        "date": dates,
-        "spend_meta": spend_meta.round(2),
-        "spend_google": spend_google.round(2),
-        "spend_tiktok": spend_tiktok.round(2),
-        "spend_reddit": spend_reddit.round(2),
-        "spend_x": spend_x.round(2),
-        "spend_twitch": spend_twitch.round(2),  # paid creator activations
-        "promo": promo.astype(int),
-        "competitor_launch": competitor_launch.astype(int),
-        "sales": sales,
-    })
+    return spend, promo, competitor_launch, sales
+
+
+def generate_weekly_data(n_weeks=104, seed=42):
+    """
+    Generates synthetic marketing mix data
+
+    Simulates ~2 years of weekly data for a game with:
+    - 6 marketing channels (Meta, Google Ads, TikTok, Reddit, X, Twitch)
+      - Seasonal patterns (holiday bumps, summer lulls)
+      - Occasional promos and competitor launches
+      - A launch spike in the first few weeks
+    """
+    rng = np.random.default_rng(seed)
+
+    weeks = np.arange(n_weeks)
+    dates = pd.date_range("2023-01-01", periods=n_weeks, freq="7D")
+
+    spend, promo, competitor_launch, sales = _simulate(rng, weeks, CHANNELS)
+
+    df = pd.DataFrame({"week": weeks, "date": dates})
+    for (name, *_), values in zip(CHANNELS, spend):
+        df[f"spend_{name}"] = values.round(2)
+    df["promo"] = promo.astype(int)
+    df["competitor_launch"] = competitor_launch.astype(int)
+    df["sales"] = sales
 
     return df
 
 
-if __name__ == "__main__":
-    import os
+def _names(value, prefix):
+    """titles/geos argument: a count or a list of names."""
+    if isinstance(value, int):
+        return [f"{prefix}_{i}" for i in range(value)]
+    return list(value)
+
+
+def generate_panel_chunks(
+    n_periods=104,
+    n_channels=6,
+    freq="W",
+    titles=1,
+    geos=1,
+    chunk_rows=1_000_000,
+    seed=42,
+    start_date="2023-01-01",
+):
+    """
+    Yield a titles x geos panel as DataFrames of about chunk_rows rows.
+
+    n_periods: weeks (freq="W") or days (freq="D") per series
+    n_channels: spend columns; the first six are the usual channels
+    titles, geos: how many (or a list of names)
+    chunk_rows: rows per chunk, rounded to whole series
+
+    Each series (title x geo) has its own seed derived from seed and its
+    position, so the data is the same whatever chunk_rows is, and any
+    chunk can be regenerated on its own. Series differ in size (base
+    sales and spend levels); the true coefficients are shared and given
+    by ground_truth().
+
+    Columns: title, geo, week (and day for daily data), date, spend_*,
+    promo, competitor_launch, sales. Daily rows have week = day // 7 so
+    weekly code can still run on them.
+    """
+    if freq not in FREQS:
+        raise ValueError(f"Unknown freq: {freq}. Use 'W' or 'D'.")
+
+    specs = channel_specs(n_channels, seed)
+    titles = _names(titles, "title")
+    geos = _names(geos, "geo")
+    series = list(itertools.product(range(len(titles)), range(len(geos))))
+
+    t = np.arange(n_periods)
+    step = "7D" if freq == "W" else "D"
+    dates = pd.date_range(start_date, periods=n_periods, freq=step)
+    title_type = pd.CategoricalDtype(titles)
+    geo_type = pd.CategoricalDtype(geos)
+
+    per_chunk = max(1, chunk_rows // max(n_periods, 1))
+    for first in range(0, len(series), per_chunk):
+        block = series[first:first + per_chunk]
+        n_rows = len(block) * n_periods
 
+        spend = np.empty((len(specs), n_rows))
+        promo = np.empty(n_rows, dtype=np.int8)
+        competitor = np.empty(n_rows, dtype=np.int8)
+        sales = np.empty(n_rows, dtype=np.int64)
+
+        for j, position in enumerate(range(first, first + len(block))):
+            rng = np.random.default_rng(
+                np.random.SeedSequence(seed, spawn_key=(1, position))
+            )
+            size = rng.lognormal(0.0, 0.5)
+            rows = slice(j * n_periods, (j + 1) * n_periods)
+            spend[:, rows], promo[rows], competitor[rows], sales[rows] = _simulate(
+                rng, t, specs, freq, size
+            )
+
+        title_idx = np.repeat([ti for ti, _ in block], n_periods)
+        geo_idx = np.repeat([gi for _, gi in block], n_periods)
+        period = np.tile(t, len(block))
+
+        columns = {
+            "title": pd.Categorical.from_codes(title_idx, dtype=title_type),
+            "geo": pd.Categorical.from_codes(geo_idx, dtype=geo_type),
+        }
+        if freq == "D":
+            columns["day"] = period
+        columns["week"] = period // FREQS[freq]["periods_per_week"]
+        columns["date"] = np.tile(dates.values, len(block))
+        for (name, *_), values in zip(specs, spend):
+            columns[f"spend_{name}"] = values.round(2)
+        columns["promo"] = promo
+        columns["competitor_launch"] = competitor
+        columns["sales"] = sales
+
+        yield pd.DataFrame(columns)
+
+
+def generate_panel_data(**kwargs):
+    """generate_panel_chunks collected into one DataFrame (for small panels)."""
+    return pd.concat(generate_panel_chunks(**kwargs), ignore_index=True)
+
+
+def write_chunks(chunks, path, fmt=None):
+    """
+    Stream DataFrame chunks to one CSV or Parquet file; returns rows written.
+
+    fmt: "csv" or "parquet" (default: from the file extension). Parquet
+    needs pyarrow.
+    """
+    fmt = fmt or ("parquet" if path.endswith((".parquet", ".pq")) else "csv")
+    if fmt not in ("csv", "parquet"):
+        raise ValueError(f"Unknown format: {fmt}. Use 'csv' or 'parquet'.")
+
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+
+    n_rows = 0
+    if fmt == "csv":
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+            n_rows += len(chunk)
+        return n_rows
+
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Parquet output needs pyarrow: pip install pyarrow") from e
+
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+            n_rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return n_rows
+
+
+if __name__ == "__main__":
     # Make sure data dir exists
     os.makedirs("data", exist_ok=True)
 
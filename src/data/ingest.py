@@ -0,0 +1,329 @@
+"""
+Load raw long-format spend/sales exports into the wide MMM layout.
+
+Exports are long tables (one row per date x geo x campaign with a spend
+value, and date x geo rows of sales) that can be many times bigger than
+memory. They're read a chunk at a time: CSV with pandas' chunked reader,
+Parquet and Arrow/Feather files memory-mapped and read batch by batch.
+Each chunk is checked, downcast (labels to category, values to float32)
+and summed per (group, day, channel), so only the aggregated panel is ever
+held. Groups are then pivoted to the usual week / spend_* / sales frame
+one at a time:
+
+    groups = iter_groups("spend.parquet", "sales.csv", group_cols="geo",
+                         channel_col="campaign", channel_map=CAMPAIGNS)
+    PanelMMM("geo").fit_groups(groups)
+
+Parquet and Arrow files need pyarrow.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+CHUNK_ROWS = 1_000_000
+ARROW_SUFFIXES = (".arrow", ".feather", ".ipc")
+PARQUET_SUFFIXES = (".parquet", ".pq")
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise ImportError(
+            "Parquet/Arrow input needs pyarrow: pip install pyarrow"
+        ) from e
+    return pa
+
+
+def read_chunks(source, columns, chunk_rows=CHUNK_ROWS, labels=()):
+    """
+    Yield DataFrames of about chunk_rows rows holding just columns.
+
+    source: a DataFrame, or the path of a CSV, Parquet (.parquet / .pq)
+        or Arrow IPC / Feather (.arrow / .feather / .ipc) file. Columnar
+        files are memory-mapped, so only the batch being read is in memory.
+    labels: columns to read as categories (group / channel names)
+    """
+    columns = list(columns)
+    labels = [c for c in labels if c in columns]
+
+    if isinstance(source, pd.DataFrame):
+        _check_columns(source.columns, columns, "data")
+        for start in range(0, len(source), chunk_rows):
+            yield source.iloc[start:start + chunk_rows][columns]
+        return
+
+    path = str(source)
+    if path.endswith(PARQUET_SUFFIXES):
+        pa = _pyarrow()
+        import pyarrow.parquet as pq
+
+        f = pq.ParquetFile(path, memory_map=True, read_dictionary=labels)
+        _check_columns(f.schema_arrow.names, columns, path)
+        for batch in f.iter_batches(batch_size=chunk_rows, columns=columns):
+            yield pa.Table.from_batches([batch]).to_pandas()
+
+    elif path.endswith(ARROW_SUFFIXES):
+        pa = _pyarrow()
+        with pa.memory_map(path) as source_file:
+            reader = pa.ipc.open_file(source_file)
+            _check_columns(reader.schema.names, columns, path)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i).select(columns)
+                for start in range(0, batch.num_rows, chunk_rows):
+                    yield batch.slice(start, chunk_rows).to_pandas()
+
+    else:
+        header = pd.read_csv(path, nrows=0).columns
+        _check_columns(header, columns, path)
+        yield from pd.read_csv(
+            path,
+            usecols=columns,
+            dtype={c: "category" for c in labels},
+            chunksize=chunk_rows,
+        )
+
+
+def _check_columns(available, columns, what):
+    missing = [c for c in columns if c not in set(available)]
+    if missing:
+        raise ValueError(f"{what} is missing columns {missing}")
+
+
+def _values(chunk, col, dtype):
+    """Numeric, non-negative values; blanks count as 0."""
+    values = pd.to_numeric(chunk[col], errors="coerce")
+    bad = values.isna() & chunk[col].notna()
+    if bad.any():
+        raise ValueError(
+            f"{col} has non-numeric values, e.g. {chunk[col][bad].iloc[0]!r}"
+        )
+    values = values.fillna(0).to_numpy(dtype=dtype)
+    if (values < 0).any():
+        raise ValueError(f"{col} has negative values ({(values < 0).sum()} rows)")
+    return values
+
+
+def _days(chunk, date_col):
+    """Dates as whole days since 1970-01-01 (int32)."""
+    dates = pd.to_datetime(chunk[date_col], errors="coerce")
+    if dates.isna().any():
+        raise ValueError(f"{date_col} has missing or unparseable dates")
+    return dates.to_numpy(dtype="datetime64[D]").astype(np.int32)
+
+
+def _compact(parts, keys, value_col):
+    """Sum partial aggregates into one frame (labels back to categories)."""
+    df = pd.concat(parts, ignore_index=True)
+    for col in keys:
+        if df[col].dtype == object:
+            df[col] = df[col].astype("category")
+    return df.groupby(keys, observed=True, sort=False)[value_col].sum().reset_index()
+
+
+def aggregate_long(
+    source,
+    value_col,
+    date_col="date",
+    group_cols=("geo",),
+    channel_col=None,
+    channel_map=None,
+    chunk_rows=CHUNK_ROWS,
+    value_dtype="float32",
+):
+    """
+    Stream a long table and sum value_col per (group_cols, day[, channel]).
+
+    channel_col: column naming the channel (or campaign) of each row;
+        None for tables without one, e.g. sales
+    channel_map: optional dict mapping channel_col values (campaigns) to
+        channel names; values it doesn't cover are an error
+    value_dtype: dtype values are read as. float32 halves memory per chunk;
+        sums are always float64.
+
+    Returns a DataFrame with group_cols, day (days since 1970-01-01),
+    channel (if channel_col) and value_col.
+    """
+    group_cols = [group_cols] if isinstance(group_cols, str) else list(group_cols)
+    labels = group_cols + ([channel_col] if channel_col else [])
+    keys = group_cols + ["day"] + (["channel"] if channel_col else [])
+
+    parts, pending = [], 0
+    for chunk in read_chunks(
+        source, [date_col, *labels, value_col], chunk_rows, labels=labels
+    ):
+        if chunk[labels].isna().any().any():
+            raise ValueError(f"{source!r}: missing values in {labels}")
+
+        out = chunk[group_cols].copy()
+        out["day"] = _days(chunk, date_col)
+        if channel_col:
+            channel = chunk[channel_col]
+            if channel_map is not None:
+                unmapped = set(channel.unique()) - set(channel_map)
+                if unmapped:
+                    raise ValueError(
+                        f"channel_map doesn't cover {sorted(map(str, unmapped))[:5]}"
+                    )
+                channel = channel.map(channel_map)
+            out["channel"] = channel.astype("category")
+        out[value_col] = _values(chunk, value_col, value_dtype).astype(float)
+
+        parts.append(
+            out.groupby(keys, observed=True, sort=False)[value_col].sum().reset_index()
+        )
+        pending += len(parts[-1])
+        # keep the partial sums from outgrowing one chunk
+        if pending > chunk_rows and len(parts) > 1:
+            parts = [_compact(parts, keys, value_col)]
+            pending = len(parts[0])
+
+    if not parts:
+        return pd.DataFrame(columns=keys + [value_col])
+    return _compact(parts, keys, value_col)
+
+
+def _spend_name(channel):
+    """spend_ column name for a channel label: lowercase, [a-z0-9_] only."""
+    name = re.sub(r"[^0-9a-z]+", "_", str(channel).lower()).strip("_")
+    return "spend_" + name.removeprefix("spend_")
+
+
+def _group_rows(df, group_cols):
+    """(key, row positions) per group, keys as in PanelMMM."""
+    for key, idx in df.groupby(group_cols, observed=True, sort=True).indices.items():
+        if len(group_cols) == 1 and isinstance(key, tuple):
+            key = key[0]
+        yield key, idx
+
+
+def iter_groups(
+    spend,
+    sales=None,
+    date_col="date",
+    group_cols=("geo",),
+    channel_col="channel",
+    spend_col="spend",
+    sales_col="sales",
+    channel_map=None,
+    freq="W",
+    start=None,
+    chunk_rows=CHUNK_ROWS,
+    value_dtype="float32",
+):
+    """
+    Yield (group key, wide DataFrame) for each group of long exports.
+
+    spend: long spend table (date, group_cols, channel_col, spend_col),
+        as a path or DataFrame (see read_chunks)
+    sales: long sales table (date, group_cols, sales_col), or None to
+        produce spend-only frames (e.g. for predict)
+    channel_map: campaign -> channel dict, if channel_col holds campaigns
+    freq: "W" sums days into weeks counted from start, "D" keeps days
+    start: first date of week / day 0 (default: the earliest date seen)
+    value_dtype: dtype spend is read as (float32 keeps ~7 significant
+        digits); sales are always read as float64
+
+    Every frame has the same spend columns (spend_<channel>, sorted, zero where
+    a group had no rows) over that group's weeks, in order, with columns
+    group_cols, week (plus day for daily data), date, spend_*, sales.
+    Weeks run from the group's first to last period with sales. A period
+    with no sales row in between is an error, and so is spend that would
+    be dropped: a group with spend but no sales, or spend outside the
+    group's sales periods.
+    """
+    if freq not in ("W", "D"):
+        raise ValueError(f"Unknown freq: {freq}. Use 'W' or 'D'.")
+    group_cols = [group_cols] if isinstance(group_cols, str) else list(group_cols)
+    common = dict(date_col=date_col, group_cols=group_cols, chunk_rows=chunk_rows)
+
+    spend_agg = aggregate_long(
+        spend, spend_col, channel_col=channel_col, channel_map=channel_map,
+        value_dtype=value_dtype, **common
+    )
+    # sales stay float64: rounding the target isn't worth the memory
+    sales_agg = None if sales is None else aggregate_long(
+        sales, sales_col, value_dtype="float64", **common
+    )
+
+    if start is None:
+        days = [spend_agg["day"].min()]
+        if sales_agg is not None:
+            days.append(sales_agg["day"].min())
+        first_day = int(np.nanmin(np.array(days, dtype=float)))
+    else:
+        first_day = int(np.datetime64(pd.Timestamp(start).date(), "D").astype(int))
+    width = 7 if freq == "W" else 1
+
+    channels = sorted(spend_agg["channel"].astype(str).unique())
+    spend_cols = [_spend_name(ch) for ch in channels]
+    if len(set(spend_cols)) != len(spend_cols):
+        raise ValueError(f"channel names collide as columns: {channels}")
+    channel_pos = {ch: j for j, ch in enumerate(channels)}
+
+    spend_groups = dict(_group_rows(spend_agg, group_cols))
+    sales_groups = {} if sales_agg is None else dict(_group_rows(sales_agg, group_cols))
+    keys = sales_groups if sales_agg is not None else spend_groups
+    unsold = [key for key in spend_groups if key not in keys]
+    if unsold:
+        raise ValueError(f"groups {unsold[:5]} have spend but no sales rows")
+
+    for key in keys:
+        if sales_agg is not None:
+            rows = sales_agg.iloc[sales_groups[key]]
+            sales_period = (rows["day"].to_numpy() - first_day) // width
+            periods = np.arange(sales_period.min(), sales_period.max() + 1)
+            observed = np.zeros(len(periods), dtype=bool)
+            observed[sales_period - periods[0]] = True
+            if not observed.all():
+                raise ValueError(
+                    f"group {key!r} has no sales for periods "
+                    f"{periods[~observed][:5].tolist()}"
+                )
+        else:
+            rows = spend_agg.iloc[spend_groups[key]]
+            spend_period = (rows["day"].to_numpy() - first_day) // width
+            periods = np.arange(spend_period.min(), spend_period.max() + 1)
+
+        values = np.zeros((len(periods), len(channels)))
+        if key in spend_groups:
+            rows_s = spend_agg.iloc[spend_groups[key]]
+            p = (rows_s["day"].to_numpy() - first_day) // width - periods[0]
+            c = rows_s["channel"].astype(str).map(channel_pos).to_numpy()
+            inside = (p >= 0) & (p < len(periods))
+            if not inside.all():
+                raise ValueError(
+                    f"group {key!r} has spend outside its sales periods "
+                    f"({(~inside).sum()} rows)"
+                )
+            np.add.at(values, (p, c), rows_s[spend_col].to_numpy())
+
+        columns = {}
+        for col, value in zip(group_cols, key if len(group_cols) > 1 else [key]):
+            columns[col] = np.repeat(value, len(periods))
+        if freq == "D":
+            columns["day"] = periods
+            columns["week"] = periods // 7
+        else:
+            columns["week"] = periods
+        columns["date"] = (
+            np.datetime64(first_day, "D") + periods * width
+        ).astype("datetime64[ns]")
+        for j, col in enumerate(spend_cols):
+            columns[col] = values[:, j]
+        if sales_agg is not None:
+            target = np.zeros(len(periods))
+            np.add.at(target, sales_period - periods[0], rows[sales_col].to_numpy())
+            columns[sales_col] = target
+
+        yield key, pd.DataFrame(columns)
+
+
+def load_panel(spend, sales=None, **kwargs):
+    """iter_groups collected into one long panel (for data that fits in memory)."""
+    frames = [frame for _, frame in iter_groups(spend, sales, **kwargs)]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
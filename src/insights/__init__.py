@@ -1,12 +1,29 @@
-from src.insights.decompose import decompose_sales, contribution_summary
+from src.insights.bootstrap import bootstrap_intervals
+from src.insights.decompose import (
+    contribution_summary,
+    decompose_batch,
+    decompose_sales,
+)
+from src.insights.response import ResponseCurves, response_curves
 from src.insights.roas import calculate_roas, roas_summary
-from src.insights.scenarios import budget_scenario, optimize_reallocation
+from src.insights.scenarios import (
+    budget_scenario,
+    budget_scenarios,
+    optimize_budget,
+    optimize_reallocation,
+)
 
 __all__ = [
     "decompose_sales",
+    "decompose_batch",
     "contribution_summary",
     "calculate_roas",
     "roas_summary",
     "budget_scenario",
+    "budget_scenarios",
     "optimize_reallocation",
+    "optimize_budget",
+    "bootstrap_intervals",
+    "response_curves",
+    "ResponseCurves",
 ]
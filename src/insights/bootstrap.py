@@ -0,0 +1,140 @@
+"""
+Bootstrap confidence intervals for channel contributions and ROAS.
+
+Attribution under correlated channels is unstable, so a single point
+estimate can be misleading. A moving block bootstrap resamples contiguous
+runs of weeks (keeping short-range time dependence intact), refits the
+model on each resample, and reports percentile intervals.
+
+Features are built once on the original series; replicates only resample
+rows of that matrix and refit the Elastic Net, so nothing goes back
+through _build_features.
+"""
+
+import numpy as np
+import pandas as pd
+from src.model import MMM
+from src.utils import attach_arrays, parallel_map, shared_arrays
+from src.utils.parallel import n_workers
+
+
+def _block_indices(rng, n, block_size):
+    """Row indices for one moving block bootstrap sample of length n."""
+    block_size = min(block_size, n)
+    n_blocks = -(-n // block_size)
+    starts = rng.integers(0, n - block_size + 1, size=n_blocks)
+    return (starts[:, None] + np.arange(block_size)).ravel()[:n]
+
+
+def _bootstrap_task(task):
+    """
+    Worker: refit on a batch of resamples.
+
+    Returns (contributions, totals): per-replicate channel contribution
+    sums over the original data, and per-replicate total predicted sales.
+    """
+    data, seeds, block_size, n_spend, params = task
+    arrays = data if isinstance(data, dict) else attach_arrays(data)
+    X, y = arrays["X"], arrays["y"]
+    X_sums = X.sum(axis=0)
+
+    contributions = np.empty((len(seeds), n_spend))
+    totals = np.empty(len(seeds))
+    for i, seed in enumerate(seeds):
+        idx = _block_indices(np.random.default_rng(seed), len(y), block_size)
+        model = MMM(**params)
+        model._fit_matrix(X[idx], y[idx])
+
+        coefs_unscaled = model.model.coef_ / model.scaler.scale_
+        contributions[i] = X_sums[:n_spend] * coefs_unscaled[:n_spend]
+        totals[i] = model._predict_matrix(X).sum()
+
+    return contributions, totals
+
+
+def bootstrap_intervals(
+    model,
+    df,
+    n_boot=1000,
+    block_size=8,
+    ci=0.95,
+    seed=42,
+    n_jobs=1,
+    target_col="sales",
+):
+    """
+    Percentile intervals for each channel's contribution, share of
+    predicted sales, and ROAS.
+
+    Arguments:
+        model: fitted MMM; replicates are refit with the same settings
+        df: the data the model was fit on
+        n_boot: number of bootstrap replicates
+        block_size: weeks per resampled block
+        ci: interval width (0.95 = 2.5th to 97.5th percentile)
+        seed: replicates get independent child seeds of this, so results
+            don't depend on n_jobs
+        n_jobs: worker processes (-1 = all cores); the feature matrix is
+            shared with workers through shared memory
+
+    Returns DataFrame with one row per channel: channel, spend,
+    contribution / pct_of_total / roas point estimates (from the fitted
+    model) and a _lower and _upper column for each. Sorted by ROAS.
+    """
+    if model.model is None:
+        raise ValueError("Model not fitted yet")
+
+    arrays = {
+        "X": model._build_matrix(df),
+        "y": df[target_col].to_numpy(dtype=float),
+    }
+    n_spend = len(model.spend_cols_)
+    params = model.get_params()
+    seeds = np.random.SeedSequence(seed).spawn(n_boot)
+
+    workers = n_workers(n_jobs)
+    # a few batches per worker keeps them busy without per-replicate overhead
+    batches = np.array_split(np.arange(n_boot), max(1, min(n_boot, workers * 4)))
+    batches = [[seeds[i] for i in batch] for batch in batches if len(batch)]
+
+    if workers > 1 and len(batches) > 1:
+        with shared_arrays(arrays) as handle:
+            tasks = [(handle, b, block_size, n_spend, params) for b in batches]
+            results = parallel_map(_bootstrap_task, tasks, n_jobs)
+    else:
+        tasks = [(arrays, b, block_size, n_spend, params) for b in batches]
+        results = [_bootstrap_task(task) for task in tasks]
+
+    contributions = np.vstack([r[0] for r in results])
+    totals = np.concatenate([r[1] for r in results])
+
+    # point estimates from the model as fitted
+    coefs_unscaled = model.model.coef_ / model.scaler.scale_
+    point_contrib = arrays["X"].sum(axis=0)[:n_spend] * coefs_unscaled[:n_spend]
+    point_total = model._predict_matrix(arrays["X"]).sum()
+
+    spend = df[model.spend_cols_].to_numpy(dtype=float).sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        point = {
+            "contribution": point_contrib,
+            "pct_of_total": point_contrib / point_total,
+            "roas": np.where(spend > 0, point_contrib / spend, 0.0),
+        }
+        replicates = {
+            "contribution": contributions,
+            "pct_of_total": contributions / totals[:, None],
+            "roas": np.where(spend > 0, contributions / spend, 0.0),
+        }
+
+    tail = (1 - ci) / 2 * 100
+    summary = pd.DataFrame({
+        "channel": [col.replace("spend_", "") for col in model.spend_cols_],
+        "spend": spend,
+    })
+    for name, values in replicates.items():
+        summary[name] = point[name]
+        summary[f"{name}_lower"] = np.nanpercentile(values, tail, axis=0)
+        summary[f"{name}_upper"] = np.nanpercentile(values, 100 - tail, axis=0)
+
+    summary = summary.sort_values("roas", ascending=False)
+    return summary.reset_index(drop=True)
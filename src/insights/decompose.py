@@ -7,6 +7,98 @@ them to get real dollar contributions per channel.
 
 import numpy as np
 import pandas as pd
+from src.utils.profiling import span
+
+
+def _group_weights(model):
+    """
+    Output columns and the (n_features x n_columns - 1) weight matrix that
+    maps the feature matrix to every column but base.
+
+    Get coefficients in original (unscaled) space
+    scaled prediction: y = X_scaled @ coef + intercept
+    where X_scaled = (X - mean) / scale
+    so: y = (X - mean) / scale @ coef + intercept
+          = X @ (coef / scale) - mean @ (coef / scale) + intercept
+    The per-feature contribution is: X[feature] * (coef / scale)
+    The intercept absorbs the mean correction
+    """
+    coefs_scaled = model.model.coef_
+    scale = model.scaler.scale_
+    coefs_unscaled = coefs_scaled / scale
+
+    # Base = intercept + mean correction term
+    mean_correction = np.sum(model.scaler.mean_ * coefs_scaled / scale)
+    base = model.model.intercept_ - mean_correction
+
+    # which output column each feature adds into: its channel, the combined
+    # fourier terms, or the control itself
+    groups = []
+    for name in model.feature_names_:
+        if name.endswith("_transformed"):
+            groups.append(name[: -len("_transformed")])
+        elif name.startswith("sin_") or name.startswith("cos_"):
+            groups.append("seasonality")
+        else:
+            groups.append(name)
+
+    channels = [col.replace("spend_", "") for col in model.spend_cols_]
+    controls = [g for g in groups if g not in channels and g != "seasonality"]
+    columns = ["base"] + channels + ["seasonality"] + controls + ["predicted"]
+
+    # elementwise X * coef followed by a grouped column sum is the same as
+    # one product with a weight matrix holding each coef in its group's column
+    position = {name: j for j, name in enumerate(columns[1:-1])}
+    W = np.zeros((len(groups), len(position)))
+    W[np.arange(len(groups)), [position[g] for g in groups]] = coefs_unscaled
+
+    return columns, W, base
+
+
+def _decompositions(model, frames):
+    """
+    (columns, values) for each frame, values a read-only array with one
+    column per output column.
+
+    Memoized on the model per frame content (same keys as the feature
+    cache) and cleared on refit. Frames missing from the cache go through
+    a single matrix product.
+    """
+    if model.model is None:
+        raise ValueError("Model not fitted yet")
+
+    cache = model._decomposition_cache
+    keys = [model._matrix_key(df) for df in frames]
+
+    missing = {}
+    for key, df in zip(keys, frames):
+        if key not in cache and key not in missing:
+            missing[key] = df
+
+    if missing:
+        with span("decompose", rows=sum(len(df) for df in missing.values())):
+            columns, W, base = _group_weights(model)
+            Xs = [model._build_matrix(df, key=key) for key, df in missing.items()]
+            parts = np.vstack(Xs) @ W if len(Xs) > 1 else Xs[0] @ W
+            offsets = np.cumsum([len(X) for X in Xs])[:-1]
+
+            for key, part in zip(missing, np.split(parts, offsets)):
+                values = np.empty((len(part), len(columns)))
+                values[:, 0] = base
+                values[:, 1:-1] = part
+                # Total should match model.predict()
+                values[:, -1] = values[:, :-1].sum(axis=1)
+                values.flags.writeable = False
+                cache[key] = (columns, values)
+
+    results = []
+    for key in keys:
+        cache.move_to_end(key)
+        results.append(cache[key])
+    while len(cache) > model.feature_cache_size:
+        cache.popitem(last=False)
+
+    return results
 
 
 def decompose_sales(model, df):
@@ -21,58 +113,45 @@ def decompose_sales(model, df):
     - {channel}: contribution from each marketing channel
     - seasonality: combined fourier term effects
     - predicted: total (should match model.predict)
-    """
-    if model.model is None:
-        raise ValueError("Model not fitted yet")
-
-    # Build features the same way the model does
-    X = model._build_features(df)
 
-    # Get coefficients in original (unscaled) space
-    # scaled prediction: y = X_scaled @ coef + intercept
-    # where X_scaled = (X - mean) / scale
-    # so: y = (X - mean) / scale @ coef + intercept
-    #       = X @ (coef / scale) - mean @ (coef / scale) + intercept
-    # The per-feature contribution is: X[feature] * (coef / scale)
-    # The intercept absorbs the mean correction
-
-    coefs_scaled = model.model.coef_
-    scale = model.scaler.scale_
+    Repeat calls on the same data (e.g. from calculate_roas and
+    contribution_summary) reuse one computation.
+    """
+    return decompose_batch(model, [df])[0]
 
-    # Unscale coefficients
-    coefs_unscaled = coefs_scaled / scale
 
-    result = pd.DataFrame(index=df.index)
+def decompose_batch(model, frames):
+    """
+    decompose_sales for many frames in one call, e.g. every title of a panel.
 
-    # Base = intercept + mean correction term
-    mean_correction = np.sum(model.scaler.mean_ * coefs_scaled / scale)
-    result["base"] = model.model.intercept_ - mean_correction
+    model: one fitted MMM used for every frame, or a list with one model
+        per frame. Frames that share a model are decomposed together.
+    Returns a list of DataFrames in frames order.
+    """
+    frames = list(frames)
+    models = model if isinstance(model, (list, tuple)) else [model] * len(frames)
+    if len(models) != len(frames):
+        raise ValueError(f"got {len(models)} models for {len(frames)} frames")
 
-    # Channel contributions
-    for col in model.spend_cols_:
-        channel = col.replace("spend_", "")
-        feature_name = f"{channel}_transformed"
-        idx = model.feature_names_.index(feature_name)
-        result[channel] = X[feature_name].values * coefs_unscaled[idx]
+    by_model = {}
+    for i, m in enumerate(models):
+        by_model.setdefault(id(m), (m, []))[1].append(i)
 
-    # Seasonality (combine all fourier terms)
-    seasonality = np.zeros(len(df))
-    for feature_name in model.feature_names_:
-        if feature_name.startswith("sin_") or feature_name.startswith("cos_"):
-            idx = model.feature_names_.index(feature_name)
-            seasonality += X[feature_name].values * coefs_unscaled[idx]
-    result["seasonality"] = seasonality
+    results = [None] * len(frames)
+    for m, positions in by_model.values():
+        parts = _decompositions(m, [frames[i] for i in positions])
+        for i, (columns, values) in zip(positions, parts):
+            results[i] = pd.DataFrame(
+                values, index=frames[i].index, columns=columns, copy=True
+            )
 
-    # Control variables if present
-    for control in ["promo", "competitor_launch"]:
-        if control in model.feature_names_:
-            idx = model.feature_names_.index(control)
-            result[control] = X[control].values * coefs_unscaled[idx]
+    return results
 
-    # Total should match model.predict()
-    result["predicted"] = result.drop(columns=["predicted"], errors="ignore").sum(axis=1)
 
-    return result
+def _totals(model, df):
+    """Decomposition summed over the period, as {column: total}."""
+    columns, values = _decompositions(model, [df])[0]
+    return dict(zip(columns, values.sum(axis=0)))
 
 
 def contribution_summary(model, df):
@@ -81,24 +160,21 @@ def contribution_summary(model, df):
 
     Returns dict with total contribution per channel and percentages.
     """
-    decomp = decompose_sales(model, df)
-
-    # Get channel columns (exclude base, seasonality, predicted, controls)
-    exclude = {"base", "seasonality", "predicted", "promo", "competitor_launch"}
-    channels = [c for c in decomp.columns if c not in exclude]
+    totals = _totals(model, df)
+    channels = [col.replace("spend_", "") for col in model.spend_cols_]
 
-    total_sales = decomp["predicted"].sum()
+    total_sales = totals["predicted"]
 
     summary = {
         "total_sales": total_sales,
-        "base": decomp["base"].sum(),
-        "base_pct": decomp["base"].sum() / total_sales,
-        "seasonality": decomp["seasonality"].sum(),
+        "base": totals["base"],
+        "base_pct": totals["base"] / total_sales,
+        "seasonality": totals["seasonality"],
         "channels": {},
     }
 
     for channel in channels:
-        contrib = decomp[channel].sum()
+        contrib = totals[channel]
         summary["channels"][channel] = {
             "contribution": contrib,
             "pct_of_total": contrib / total_sales,
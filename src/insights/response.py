@@ -0,0 +1,183 @@
+"""
+Response curves: weekly contribution vs weekly spend, per channel.
+
+Scenarios rebuild features and predict over a whole DataFrame, which is
+far too slow behind an interactive slider. A response curve answers
+"what does this channel return at X a week?" from a table built once per
+fitted model, assuming spend held at X long enough for adstock to settle:
+
+    adstocked = X * carryover      (1 / (1 - decay), or the kernel's sum)
+    contribution = coef * saturation(adstocked)
+    marginal = coef * carryover * saturation'(adstocked)
+
+with coef the channel's unscaled coefficient. Lookups inside the table
+are a linear np.interp (microseconds); spend past the table is computed
+exactly. Tables are rebuilt automatically after the model is refit or
+updated.
+"""
+
+import numpy as np
+import pandas as pd
+
+# table points per channel, spaced quadratically (denser near zero spend,
+# where saturation curves bend the most)
+N_POINTS = 512
+# tables run to HEADROOM x the largest training spend by default
+HEADROOM = 2.0
+
+
+def _carryover(model):
+    """Steady-state adstock per unit of constant spend, per spend column."""
+    geometric, decays, kernel_cols, kernels = model._adstock_config()
+    decays = np.asarray(decays, dtype=float)
+    if (decays >= 1).any():
+        # adstock never settles, so there is no steady-state response
+        stuck = [
+            model.spend_cols_[j].replace("spend_", "")
+            for j, d in zip(geometric, decays) if d >= 1
+        ]
+        raise ValueError(
+            f"No response curve for decay rate 1 (channels {stuck}); "
+            "use decay < 1"
+        )
+    out = np.empty(len(model.spend_cols_))
+    out[geometric] = 1.0 / (1.0 - decays)
+    out[kernel_cols] = [kernel.sum() for kernel in kernels]
+    return out
+
+
+class ResponseCurves:
+    """
+    Tabulated response curves for a fitted MMM; see response_curves().
+
+    spend, contributions and marginals are (n_points x channel) tables,
+    columns in channels order.
+    """
+
+    def __init__(self, model, max_spend=None, n_points=N_POINTS, headroom=HEADROOM):
+        if model.model is None:
+            raise ValueError("Model not fitted yet")
+        self.model = model
+        self.max_spend = max_spend
+        self.n_points = n_points
+        self.headroom = headroom
+        self._build()
+
+    def _build(self):
+        model = self.model
+        self.channels = [col.replace("spend_", "") for col in model.spend_cols_]
+        self._index = {ch: j for j, ch in enumerate(self.channels)}
+
+        top = self._top()
+        self.spend = np.linspace(0.0, 1.0, self.n_points)[:, None] ** 2 * top
+
+        j = [model.feature_index_[f"{ch}_transformed"] for ch in self.channels]
+        self.coef = model.model.coef_[j] / model.scaler.scale_[j]
+        self.carryover = _carryover(model)
+        self.contributions, self.marginals = self._exact(self.spend)
+
+        self.fit_count = model._fit_count
+
+    def _top(self):
+        """Per-channel spend the tables run up to."""
+        if self.max_spend is None:
+            if self.model.spend_max_ is None:
+                raise ValueError("model has no training spend range; pass max_spend")
+            top = self.headroom * np.asarray(self.model.spend_max_, dtype=float)
+        elif isinstance(self.max_spend, dict):
+            top = np.array([float(self.max_spend[ch]) for ch in self.channels])
+        else:
+            top = np.full(len(self.channels), float(self.max_spend))
+        # a channel that never spent still gets a usable table
+        return np.where(top > 0, top, 1.0)
+
+    def _exact(self, spend, columns=None):
+        """(contribution, marginal) computed directly, channels on the last axis."""
+        columns = slice(None) if columns is None else columns
+        carryover = self.carryover[columns]
+        coef = self.coef[columns]
+        idx = None if isinstance(columns, slice) else np.atleast_1d(columns)
+
+        adstocked = spend * carryover
+        contribution = coef * self.model._saturate(adstocked, idx)
+        marginal = coef * carryover * self.model._saturate_derivative(adstocked, idx)
+        return contribution, marginal
+
+    def _column(self, channel):
+        if self.model._fit_count != self.fit_count:
+            self._build()
+        channel = channel.removeprefix("spend_")
+        if channel not in self._index:
+            raise ValueError(f"Unknown channel: {channel}. Use one of {self.channels}.")
+        return self._index[channel]
+
+    def _lookup(self, which, channel, spend):
+        j = self._column(channel)
+        # after _column, which may have rebuilt the tables
+        table = (self.contributions, self.marginals)[which]
+        spend = np.asarray(spend, dtype=float)
+        flat = np.atleast_1d(spend)
+        out = np.interp(flat, self.spend[:, j], table[:, j])
+
+        # np.interp would clamp past the table
+        beyond = flat > self.spend[-1, j]
+        if beyond.any():
+            out[beyond] = self._exact(flat[beyond][:, None], [j])[which][:, 0]
+        return out.reshape(spend.shape) if spend.ndim else float(out[0])
+
+    def contribution(self, channel, spend):
+        """Weekly sales from channel at a steady weekly spend (scalar or array)."""
+        return self._lookup(0, channel, spend)
+
+    def marginal(self, channel, spend):
+        """Extra weekly sales per extra unit of weekly spend at that level."""
+        return self._lookup(1, channel, spend)
+
+    def roas(self, channel, spend):
+        """Average return, contribution / spend (0 where spend is 0)."""
+        spend = np.asarray(spend, dtype=float)
+        contribution = np.asarray(self.contribution(channel, spend))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out = np.where(spend > 0, contribution / spend, 0.0)
+        return out if out.ndim else float(out)
+
+    def total(self, spend):
+        """Summed weekly contribution for a dict of channel -> weekly spend."""
+        return sum(self.contribution(ch, value) for ch, value in spend.items())
+
+    def to_frame(self):
+        """Tables as a long DataFrame (channel, spend, contribution, marginal)."""
+        if self.model._fit_count != self.fit_count:
+            self._build()
+        n = len(self.spend)
+        return pd.DataFrame({
+            "channel": np.repeat(self.channels, n),
+            "spend": self.spend.T.ravel(),
+            "contribution": self.contributions.T.ravel(),
+            "marginal": self.marginals.T.ravel(),
+        })
+
+
+def response_curves(model, max_spend=None, n_points=N_POINTS, headroom=HEADROOM):
+    """
+    The model's ResponseCurves, built on first use and kept on the model.
+
+    max_spend: weekly spend to tabulate up to, one value or a dict per
+        channel. Default: headroom x the largest weekly spend seen in
+        training (spend_max_).
+    n_points: table size per channel
+
+    Calling again with the same arguments returns the same object; it
+    rebuilds its tables itself whenever the model has been refit.
+    """
+    curves = model._response_curves
+    key = (
+        tuple(sorted(max_spend.items())) if isinstance(max_spend, dict) else max_spend,
+        n_points,
+        headroom,
+    )
+    if curves is None or curves[0] != key:
+        model._response_curves = curves = (
+            key, ResponseCurves(model, max_spend, n_points, headroom)
+        )
+    return curves[1]
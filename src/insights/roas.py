@@ -9,7 +9,7 @@ ROAS over the observed data period.
 """
 
 import pandas as pd
-from src.insights.decompose import decompose_sales
+from src.insights.decompose import _totals
 
 
 def calculate_roas(model, df):
@@ -21,13 +21,13 @@ def calculate_roas(model, df):
     - total_contribution: sum of attributed sales
     - roas: contribution / spend
     """
-    decomp = decompose_sales(model, df)
+    totals = _totals(model, df)
 
     results = {}
     for col in model.spend_cols_:
         channel = col.replace("spend_", "")
         total_spend = df[col].sum()
-        total_contribution = decomp[channel].sum()
+        total_contribution = totals[channel]
 
         results[channel] = {
             "total_spend": total_spend,
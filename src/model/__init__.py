@@ -1,3 +1,5 @@
+from .artifact import load_model, save_model
 from .mmm import MMM
+from .panel import PanelMMM
 
-__all__ = ["MMM"]
+__all__ = ["MMM", "PanelMMM", "save_model", "load_model"]
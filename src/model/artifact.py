@@ -0,0 +1,169 @@
+"""
+Save and load fitted MMMs as compact, versioned array files.
+
+The artifact is an uncompressed .npz of plain numpy arrays (no pickled
+objects): coefficients, intercept, scaler mean/scale, decay rates (kernel
+adstock specs as JSON strings) and the spend history they continue from, the
+saturation method and its per-channel curve parameters, the Fourier
+setup (seasonal periods and time column), the last adstock state and
+the largest training spend per channel. Loading rebuilds a predict-ready
+MMM without importing sklearn, which keeps cold starts fast for scoring
+workers.
+
+A loaded model can predict, decompose, run scenarios, etc. It has no
+training data attached, so update() needs a fresh fit() first.
+"""
+
+import json
+
+import numpy as np
+from src.model.mmm import MMM
+
+FORMAT_VERSION = 1
+
+
+class _ArrayScaler:
+    """Stand-in for a fitted StandardScaler: just mean_ and scale_."""
+
+    def __init__(self, mean, scale):
+        self.mean_ = mean
+        self.scale_ = scale
+
+    def transform(self, X):
+        return (np.asarray(X, dtype=float) - self.mean_) / self.scale_
+
+
+class _ArrayLinearModel:
+    """Stand-in for a fitted ElasticNet: just coef_ and intercept_."""
+
+    def __init__(self, coef, intercept):
+        self.coef_ = coef
+        self.intercept_ = intercept
+
+    def predict(self, X):
+        return np.asarray(X, dtype=float) @ self.coef_ + self.intercept_
+
+
+def save_model(model, path):
+    """
+    Write a fitted MMM to path (written exactly there, no suffix added).
+    """
+    if model.model is None:
+        raise ValueError("Model not fitted yet")
+
+    state = model.adstock_state_
+    seasonalities = model.seasonalities or []
+    saturation_kwargs = model._saturation_kwargs()
+    saturation_names = sorted(saturation_kwargs)
+    geometric = {
+        ch: rate for ch, rate in model.decay_rates.items() if not isinstance(rate, dict)
+    }
+    kernels = {
+        ch: rate for ch, rate in model.decay_rates.items() if isinstance(rate, dict)
+    }
+    history = model.spend_history_
+    arrays = {
+        "format_version": np.array(FORMAT_VERSION),
+        "saturation_method": np.array(model.saturation_method),
+        "n_fourier_terms": np.array(model.n_fourier_terms),
+        # empty + has_seasonalities=False means the default annual cycle
+        "has_seasonalities": np.array(model.seasonalities is not None),
+        "seasonality_periods": np.array([p for p, _ in seasonalities], dtype=float),
+        "seasonality_orders": np.array([k for _, k in seasonalities], dtype=int),
+        "time_col": np.array(model.time_col),
+        # one row per parameter, one column per spend column
+        "saturation_param_names": np.array(saturation_names, dtype=str),
+        "saturation_param_values": np.array(
+            [saturation_kwargs[name] for name in saturation_names], dtype=float
+        ).reshape(len(saturation_names), len(model.spend_cols_)),
+        "alpha": np.array(model.alpha, dtype=float),
+        "l1_ratio": np.array(model.l1_ratio, dtype=float),
+        "decay_channels": np.array(list(geometric), dtype=str),
+        "decay_values": np.array(list(geometric.values()), dtype=float),
+        "kernel_channels": np.array(list(kernels), dtype=str),
+        "kernel_specs": np.array(
+            [json.dumps(spec, sort_keys=True) for spec in kernels.values()], dtype=str
+        ),
+        "spend_history": np.asarray(
+            history if history is not None else np.empty((0, len(model.spend_cols_))),
+            dtype=float,
+        ),
+        "spend_cols": np.array(model.spend_cols_, dtype=str),
+        "feature_names": np.array(model.feature_names_, dtype=str),
+        "coef": np.asarray(model.model.coef_, dtype=float),
+        "intercept": np.array(model.model.intercept_, dtype=float),
+        "scaler_mean": np.asarray(model.scaler.mean_, dtype=float),
+        "scaler_scale": np.asarray(model.scaler.scale_, dtype=float),
+        "adstock_state": np.asarray(state if state is not None else [], dtype=float),
+        "spend_max": np.asarray(
+            model.spend_max_ if model.spend_max_ is not None else [], dtype=float
+        ),
+    }
+
+    with open(path, "wb") as f:
+        np.savez(f, **arrays)
+
+
+def _seasonalities(data):
+    if not bool(data["has_seasonalities"]):
+        return None
+    return list(zip(
+        data["seasonality_periods"].tolist(), data["seasonality_orders"].tolist()
+    ))
+
+
+def _saturation_params(data):
+    channels = [col.replace("spend_", "") for col in data["spend_cols"].tolist()]
+    return {
+        name: dict(zip(channels, values))
+        for name, values in zip(
+            data["saturation_param_names"].tolist(),
+            data["saturation_param_values"].tolist(),
+        )
+    }
+
+
+def load_model(path):
+    """Rebuild a predict-ready MMM from a save_model() artifact."""
+    with np.load(path, allow_pickle=False) as data:
+        version = int(data["format_version"])
+        if version > FORMAT_VERSION:
+            raise ValueError(
+                f"{path} is format version {version}; this code reads up to "
+                f"{FORMAT_VERSION}"
+            )
+
+        decay_rates = dict(
+            zip(data["decay_channels"].tolist(), data["decay_values"].tolist())
+        )
+        for channel, spec in zip(
+            data["kernel_channels"].tolist(), data["kernel_specs"].tolist()
+        ):
+            decay_rates[channel] = json.loads(spec)
+
+        model = MMM(
+            decay_rates=decay_rates,
+            saturation_method=str(data["saturation_method"]),
+            n_fourier_terms=int(data["n_fourier_terms"]),
+            alpha=float(data["alpha"]),
+            l1_ratio=float(data["l1_ratio"]),
+            seasonalities=_seasonalities(data),
+            time_col=str(data["time_col"]),
+            saturation_params=_saturation_params(data),
+        )
+        model.spend_cols_ = data["spend_cols"].tolist()
+        model.feature_names_ = data["feature_names"].tolist()
+        model.feature_index_ = {
+            name: j for j, name in enumerate(model.feature_names_)
+        }
+        model.scaler = _ArrayScaler(data["scaler_mean"], data["scaler_scale"])
+        model.model = _ArrayLinearModel(data["coef"], float(data["intercept"]))
+
+        state = data["adstock_state"]
+        model.adstock_state_ = state if len(state) else None
+        if len(data["spend_history"]):
+            model.spend_history_ = data["spend_history"]
+        if len(data["spend_max"]):
+            model.spend_max_ = data["spend_max"]
+
+    return model
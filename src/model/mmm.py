@@ -3,12 +3,24 @@ Marketing Mix Model using Elastic Net regression. This model fits
 transformed media spend to sales with seasonality controls.
 """
 
+from collections import OrderedDict
+
 import numpy as np
 import pandas as pd
-from sklearn.linear_model import ElasticNet
-from sklearn.preprocessing import StandardScaler
 
-from src.transforms import adstock, saturation
+from src.transforms import (
+    adstock_kernel,
+    adstock_matrix,
+    convolve_adstock,
+    fourier_features,
+    saturation,
+    saturation_derivative,
+)
+from src.transforms.saturation import PARAM_DEFAULTS
+from src.utils.hashing import frame_fingerprint
+from src.utils.profiling import span
+
+CONTROL_COLS = ["promo", "competitor_launch"]
 
 
 class MMM:
@@ -27,103 +39,453 @@ class MMM:
             n_fourier_terms=2,
             alpha=1.0,
             l1_ratio=0.5,
+            seasonalities=None,
+            time_col="week",
+            saturation_params=None,
             ):
         """
         decay_rates: dict mapping channel name -> decay rate (0-1)
-                    if None, uses 0.5 for all channels
-        saturation_method: "sqrt" or "log"
+                    if None, uses 0.5 for all channels. A channel can
+                    instead map to a lag kernel spec for delayed effects,
+                    e.g. {"type": "weibull", "shape": 2, "scale": 10,
+                    "max_lag": 90} (see transforms.adstock_kernel)
+        saturation_method: "sqrt", "log", "hill" or "logistic"
         n_fourier_terms: number of sin/cos pairs for annual seasonality
         alpha: regularization strength
         l1_ratio: balance between L1 and L2 (1.0 = lasso, 0.0 = ridge)
+        seasonalities: list of (period, order) pairs, e.g. [(7, 3), (365.25, 10)]
+                    for weekly + annual cycles in daily data. If None, one
+                    annual cycle (period 52) with n_fourier_terms harmonics.
+        time_col: column holding the time index the periods are measured in
+        saturation_params: curve parameters for parametric saturation, each
+                    one value for all channels or a dict channel -> value,
+                    e.g. {"half_saturation": {"meta": 60000, ...}, "slope": 1.5}
+                    (in units of adstocked spend)
         """
         self.decay_rates = decay_rates or {}
         self.saturation_method = saturation_method
         self.n_fourier_terms = n_fourier_terms
         self.alpha = alpha
         self.l1_ratio = l1_ratio
+        self.seasonalities = (
+            None if seasonalities is None
+            else [(float(p), int(k)) for p, k in seasonalities]
+        )
+        self.time_col = time_col
+        self.saturation_params = {
+            name: dict(value) if isinstance(value, dict) else value
+            for name, value in (saturation_params or {}).items()
+        }
 
+        # sklearn objects, created in fit(). sklearn is imported there
+        # rather than at module level so scoring-only code (e.g. models
+        # loaded with load_model) never pays for the import.
         self.model = None
-        self.scaler = StandardScaler()
+        self.scaler = None
         self.feature_names_ = None
+        self.feature_index_ = None
         self.spend_cols_ = None
+        # adstocked spend per channel at the last training week; update()
+        # continues the carryover from here
+        self.adstock_state_ = None
+        # kernel adstock needs raw spend instead: the last max_lag - 1 weeks
+        self.spend_history_ = None
+        # largest weekly spend per channel seen in training; response
+        # curves are tabulated out past it
+        self.spend_max_ = None
+        self._train_X = None
+        self._train_y = None
+
+        # fingerprint of input frame -> feature matrix, most recent last
+        self._feature_cache = OrderedDict()
+        # same keys -> decomposition (see insights.decompose); depends on
+        # the coefficients, so it's cleared whenever the model is refitted
+        self._decomposition_cache = OrderedDict()
+        # bumped by every (re)fit so anything derived from the coefficients
+        # (e.g. insights.response curves) can tell it's stale
+        self._fit_count = 0
+        self._response_curves = None
+
+    # how many input frames' features to keep around between calls
+    feature_cache_size = 8
+
+    def __getstate__(self):
+        # don't ship cached matrices to worker processes / pickles
+        state = self.__dict__.copy()
+        state["_feature_cache"] = OrderedDict()
+        state["_decomposition_cache"] = OrderedDict()
+        state["_response_curves"] = None
+        return state
+
+    def get_params(self):
+        """Constructor arguments; MMM(**model.get_params()) is an unfitted copy."""
+        return {
+            "decay_rates": dict(self.decay_rates),
+            "saturation_method": self.saturation_method,
+            "n_fourier_terms": self.n_fourier_terms,
+            "alpha": self.alpha,
+            "l1_ratio": self.l1_ratio,
+            "seasonalities": (
+                None if self.seasonalities is None else list(self.seasonalities)
+            ),
+            "time_col": self.time_col,
+            "saturation_params": {
+                name: dict(value) if isinstance(value, dict) else value
+                for name, value in self.saturation_params.items()
+            },
+        }
 
     def _get_spend_cols(self, df):
         """Find columns that look like spend data"""
         return [c for c in df.columns if c.startswith("spend_")]
 
-    def _add_fourier_terms(self, df, period=52):
-        """Add sin/cos terms for annual seasonality."""
-        week = df["week"].values
-        fourier_df = pd.DataFrame(index=df.index)
+    def _seasonalities(self):
+        """(period, order) pairs actually used."""
+        if self.seasonalities is None:
+            return [(52, self.n_fourier_terms)]
+        return self.seasonalities
 
-        for k in range(1, self.n_fourier_terms + 1):
-            fourier_df[f"sin_{k}"] = np.sin(2 * np.pi * k * week / period)
-            fourier_df[f"cos_{k}"] = np.cos(2 * np.pi * k * week / period)
+    def _add_fourier_terms(self, df):
+        """Add sin/cos terms for every seasonal cycle."""
+        return pd.DataFrame(
+            self._fourier_matrix(df[self.time_col].to_numpy(dtype=float)),
+            index=df.index,
+            columns=self._fourier_names(),
+        )
 
-        return fourier_df
+    def _fourier_names(self):
+        # the default single annual cycle keeps the plain sin_k / cos_k names
+        if self.seasonalities is None:
+            return [
+                f"{fn}_{k}"
+                for k in range(1, self.n_fourier_terms + 1)
+                for fn in ("sin", "cos")
+            ]
+        return [
+            f"{fn}_{period:g}_{k}"
+            for period, order in self.seasonalities
+            for k in range(1, order + 1)
+            for fn in ("sin", "cos")
+        ]
+
+    def _fourier_matrix(self, t):
+        """
+        sin/cos columns for each cycle, interleaved as sin_1, cos_1, sin_2, ...
+        Bases are cached per (time index, period, order), see transforms.fourier.
+        """
+        return fourier_features(t, self._seasonalities())
 
     def _transform_spend(self, df):
         """Apply adstock and saturation to our spend columns"""
-        transformed = pd.DataFrame(index=df.index)
+        channels = [col.replace("spend_", "") for col in self.spend_cols_]
+        saturated = self._transform_spend_matrix(
+            df[self.spend_cols_].to_numpy(dtype=float)
+        )
 
-        for col in self.spend_cols_:
-            channel = col.replace("spend_", "")
-            decay = self.decay_rates.get(channel, 0.5)
+        return pd.DataFrame(
+            saturated,
+            index=df.index,
+            columns=[f"{channel}_transformed" for channel in channels],
+        )
 
-            # Adstock first, then saturation
-            adstocked = adstock(df[col].values, decay)
-            saturated = saturation(adstocked, method=self.saturation_method)
+    def _transform_spend_matrix(self, spend):
+        """Adstock + saturation on a (time x channel) array of spend_cols_."""
+        with span("mmm.adstock", rows=len(spend)):
+            adstocked = self._adstock(spend)
+        with span("mmm.saturation", rows=len(spend)):
+            return self._saturate(adstocked)
 
-            transformed[f"{channel}_transformed"] = saturated
+    def _adstock_config(self):
+        """
+        Split spend_cols_ positions into geometric and kernel adstock:
+        (geometric positions, decays, kernel positions, kernels)
+        """
+        geometric, decays, kernel_cols, kernels = [], [], [], []
+        for j, col in enumerate(self.spend_cols_):
+            rate = self.decay_rates.get(col.replace("spend_", ""), 0.5)
+            if isinstance(rate, dict):
+                kernel_cols.append(j)
+                kernels.append(adstock_kernel(rate))
+            else:
+                geometric.append(j)
+                decays.append(rate)
+        return geometric, decays, kernel_cols, kernels
 
-        return transformed
+    def _history_length(self):
+        """Rows of past spend kernel adstock needs to continue a series."""
+        kernels = self._adstock_config()[3]
+        return max([len(k) - 1 for k in kernels] + [0])
+
+    def _adstock(self, spend, initial=None, history=None):
+        """
+        Adstock all channels in one pass. Linear in spend.
+        initial: adstock state to continue from (see adstock_state_)
+        history: raw spend rows before spend, for kernel channels
+            (see spend_history_)
+        """
+        geometric, decays, kernel_cols, kernels = self._adstock_config()
+        if not kernel_cols:
+            return adstock_matrix(spend, decays, initial=initial)
+
+        # lagged kernels are convolved together; geometric ones stay a filter
+        out = np.empty_like(spend, dtype=float)
+        if geometric:
+            out[:, geometric] = adstock_matrix(
+                spend[:, geometric],
+                decays,
+                initial=None if initial is None else np.asarray(initial)[geometric],
+            )
+        out[:, kernel_cols] = convolve_adstock(
+            spend[:, kernel_cols],
+            kernels,
+            history=None if history is None else history[:, kernel_cols],
+        )
+        return out
+
+    def _saturation_kwargs(self, columns=None):
+        """
+        saturation_params as arrays over the channel axis.
+        columns: positions in spend_cols_ the last axis holds (default all)
+        """
+        channels = [col.replace("spend_", "") for col in self.spend_cols_]
+        if columns is not None:
+            channels = [channels[j] for j in columns]
+
+        kwargs = {}
+        for name, value in self.saturation_params.items():
+            if not isinstance(value, dict):
+                kwargs[name] = np.full(len(channels), float(value))
+                continue
+            missing = [ch for ch in channels if ch not in value]
+            if missing and name not in PARAM_DEFAULTS:
+                raise ValueError(f"saturation_params[{name!r}] is missing {missing}")
+            kwargs[name] = np.array(
+                [value.get(ch, PARAM_DEFAULTS.get(name)) for ch in channels],
+                dtype=float,
+            )
+        return kwargs
+
+    def _saturate(self, adstocked, columns=None):
+        """
+        Saturation curve applied elementwise to adstocked spend, with the
+        channels on the last axis (columns: which ones, default all).
+        """
+        return saturation(
+            adstocked, self.saturation_method, **self._saturation_kwargs(columns)
+        )
+
+    def _saturate_derivative(self, adstocked, columns=None):
+        """Slope of _saturate at each adstocked value."""
+        return saturation_derivative(
+            adstocked, self.saturation_method, **self._saturation_kwargs(columns)
+        )
 
     def _build_features(self, df):
         """Combine transformed spend, fourier terms, and control variables."""
-        features = self._transform_spend(df)
+        return pd.DataFrame(
+            self._build_matrix(df), index=df.index, columns=self._feature_names(df)
+        )
+
+    def _feature_names(self, df):
+        channels = [col.replace("spend_", "") for col in self.spend_cols_]
+        return (
+            [f"{channel}_transformed" for channel in channels]
+            + self._fourier_names()
+            + [c for c in CONTROL_COLS if c in df.columns]
+        )
 
-        # Add seasonality
-        fourier = self._add_fourier_terms(df)
-        features = pd.concat([features, fourier], axis=1)
+    def _matrix_key(self, df):
+        """Cache key for df: fingerprint of the columns features are built from."""
+        controls = [c for c in CONTROL_COLS if c in df.columns]
+        return frame_fingerprint(df, self.spend_cols_ + [self.time_col] + controls)
 
-        # Add control variables if present
-        if "promo" in df.columns:
-            features["promo"] = df["promo"].values
-        if "competitor_launch" in df.columns:
-            features["competitor_launch"] = df["competitor_launch"].values
+    def _build_matrix(self, df, key=None):
+        """
+        Feature matrix as one contiguous float array, columns in
+        _feature_names() order: transformed spend, fourier, controls.
+
+        Results are cached by the content of the columns they're built
+        from, so repeated predict/decompose calls on the same data skip
+        the rebuild. The returned array is read-only because it's shared.
+
+        key: _matrix_key(df), if the caller already has it
+        """
+        if key is None:
+            key = self._matrix_key(df)
 
-        return features
+        if key in self._feature_cache:
+            self._feature_cache.move_to_end(key)
+            return self._feature_cache[key]
+
+        with span("mmm.features", rows=len(df)):
+            spend = df[self.spend_cols_].to_numpy(dtype=float)
+            X = self._assemble(df, self._transform_spend_matrix(spend))
+        X.flags.writeable = False
+
+        self._feature_cache[key] = X
+        if len(self._feature_cache) > self.feature_cache_size:
+            self._feature_cache.popitem(last=False)
+
+        return X
+
+    def _assemble(self, df, spend_features):
+        """Feature matrix from already-transformed spend plus df's other columns."""
+        controls = [c for c in CONTROL_COLS if c in df.columns]
+        n_spend = len(self.spend_cols_)
+        n_fourier = sum(2 * order for _, order in self._seasonalities())
+
+        X = np.empty((len(df), n_spend + n_fourier + len(controls)))
+        X[:, :n_spend] = spend_features
+        with span("mmm.fourier", rows=len(df)):
+            X[:, n_spend:n_spend + n_fourier] = self._fourier_matrix(
+                df[self.time_col].to_numpy(dtype=float)
+            )
+        if controls:
+            X[:, n_spend + n_fourier:] = df[controls].to_numpy(dtype=float)
+
+        return X
 
     def fit(self, df, target_col="sales"):
         """
         Fit the model to data.
 
-        df should have: week, spend_* columns, and target
+        df should have: time_col (week), spend_* columns, and target
+        """
+        with span("mmm.fit", rows=len(df)):
+            self.spend_cols_ = self._get_spend_cols(df)
+            self._feature_cache.clear()
+            X = self._build_matrix(df)
+            y = df[target_col].values
+
+            self.feature_names_ = self._feature_names(df)
+            self.feature_index_ = {
+                name: j for j, name in enumerate(self.feature_names_)
+            }
+
+            spend = df[self.spend_cols_].to_numpy(dtype=float)
+            self.adstock_state_ = self._adstock(spend)[-1] if len(df) else None
+            n_history = self._history_length()
+            self.spend_history_ = spend[len(spend) - n_history:] if n_history else None
+            self.spend_max_ = spend.max(axis=0) if len(df) else None
+
+            return self._fit_matrix(X, y)
+
+    def update(self, new_rows, target_col="sales"):
+        """
+        Add weeks that follow the training data without a full refit.
+
+        new_rows: DataFrame with the same columns as the training data,
+            covering the weeks right after the last training week
+
+        - adstock continues from adstock_state_ (and kernel adstock from
+          spend_history_) instead of from week 0
+        - scaler mean/variance are updated with the new rows only
+        - the Elastic Net warm-starts from the current coefficients
+
+        The result matches fit() on the full history to within solver
+        tolerance.
+        """
+        if self.model is None or self._train_X is None:
+            raise ValueError("update() needs a model fitted with fit()")
+
+        names = self._feature_names(new_rows)
+        if names != self.feature_names_:
+            raise ValueError(
+                f"new_rows features {names} don't match the fitted model's "
+                f"{self.feature_names_}"
+            )
+        if len(new_rows) == 0:
+            return self
+
+        with span("mmm.update", rows=len(new_rows)):
+            # Features for the new weeks only, with carryover from training
+            new_spend = new_rows[self.spend_cols_].to_numpy(dtype=float)
+            adstocked = self._adstock(
+                new_spend, initial=self.adstock_state_, history=self.spend_history_
+            )
+            X_new = self._assemble(new_rows, self._saturate(adstocked))
+
+            # Keep unscaled coefficients fixed while the scaler moves, so the
+            # warm start is as close as possible to the new solution
+            old_scale = self.scaler.scale_.copy()
+            self.scaler.partial_fit(X_new)
+            coef_init = self.model.coef_ * self.scaler.scale_ / old_scale
+
+            X = np.vstack([self._train_X, X_new])
+            y = np.concatenate([self._train_y, new_rows[target_col].to_numpy()])
+            self._fit_scaled(self.scaler.transform(X), y, coef_init)
+
+            self._train_X, self._train_y = X, y
+            self.adstock_state_ = adstocked[-1]
+            new_max = new_spend.max(axis=0)
+            self.spend_max_ = (
+                new_max if self.spend_max_ is None
+                else np.maximum(self.spend_max_, new_max)
+            )
+            if self.spend_history_ is not None:
+                n_history = self._history_length()
+                history = np.vstack([self.spend_history_, new_spend])
+                self.spend_history_ = history[len(history) - n_history:]
+
+            return self
+
+    def _fit_matrix(self, X, y, coef_init=None):
         """
-        self.spend_cols_ = self._get_spend_cols(df)
-        X = self._build_features(df)
-        y = df[target_col].values
+        Scale an already-built feature matrix and fit the Elastic Net.
 
-        self.feature_names_ = X.columns.tolist()
+        Split out of fit() so CV and tuning code can reuse one feature
+        matrix across many fits instead of rebuilding it from a DataFrame.
+
+        coef_init: optional starting coefficients (scaled space), e.g. from
+            a fit on nearly the same data. Warm-starting converges to the
+            same solution in fewer coordinate descent passes.
+        """
+        from sklearn.preprocessing import StandardScaler
 
         # Scale features for better regularization
-        X_scaled = self.scaler.fit_transform(X)
+        with span("mmm.scale", rows=len(X)):
+            self.scaler = StandardScaler()
+            X_scaled = self.scaler.fit_transform(X)
+        self._fit_scaled(X_scaled, y, coef_init)
+
+        # kept so update() can extend the training set
+        self._train_X, self._train_y = X, y
+
+        return self
+
+    def _fit_scaled(self, X_scaled, y, coef_init=None):
+        """Fit the Elastic Net on already-scaled features."""
+        from sklearn.linear_model import ElasticNet
+
+        self._decomposition_cache.clear()
+        self._fit_count += 1
 
         self.model = ElasticNet(
             alpha=self.alpha,
             l1_ratio=self.l1_ratio,
             max_iter=10000,
             random_state=42,
+            warm_start=coef_init is not None,
         )
-        self.model.fit(X_scaled, y)
-
-        return self
+        if coef_init is not None:
+            self.model.coef_ = np.array(coef_init, dtype=float)
+        with span("mmm.solve", rows=len(X_scaled), warm=coef_init is not None):
+            self.model.fit(X_scaled, y)
 
     def predict(self, df):
         """Generate predictions for new data"""
-        X = self._build_features(df)
-        X_scaled = self.scaler.transform(X)
-        return self.model.predict(X_scaled)
+        with span("mmm.predict", rows=len(df)):
+            return self._predict_matrix(self._build_matrix(df))
+
+    def _predict_matrix(self, X):
+        """
+        Predict from an already-built feature matrix.
+
+        Same arithmetic as scaler.transform + model.predict, done directly
+        in numpy to skip sklearn's per-call input validation.
+        """
+        X_scaled = (X - self.scaler.mean_) / self.scaler.scale_
+        return X_scaled @ self.model.coef_ + self.model.intercept_
 
     def get_coefficients(self):
         """Return coefficients with feature names"""
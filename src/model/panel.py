@@ -0,0 +1,162 @@
+"""
+Fit one MMM per group of a long panel (e.g. title x country x week).
+
+Groups are independent, so they're fitted on a process pool. Only one
+group's rows are sent to a worker at a time and the number of groups in
+flight is capped, so memory stays bounded however many groups there are.
+A group that fails to fit is recorded in errors_ instead of stopping the run.
+"""
+
+import numpy as np
+import pandas as pd
+from src.model.mmm import MMM
+from src.utils import parallel_imap
+from src.utils.profiling import span
+
+
+def _fit_group(task):
+    """Worker: fit one group's model, returning the error instead of raising."""
+    key, group_df, target_col, params = task
+    try:
+        with span("panel.group", group=key, rows=len(group_df)):
+            model = MMM(**params).fit(group_df, target_col=target_col)
+        return key, model, None
+    except Exception as e:
+        return key, None, f"{type(e).__name__}: {e}"
+
+
+class PanelMMM:
+    """
+    A collection of MMMs, one per group of a long-format panel.
+
+    The panel has the usual week (time_col) / spend_* / target columns plus one or
+    more group_cols identifying each series. Rows within a group don't
+    need to be sorted; each group is put in week order before fitting.
+    """
+
+    def __init__(self, group_cols, n_jobs=1, max_pending=None, **mmm_kwargs):
+        """
+        group_cols: column name or list of column names identifying a series
+        n_jobs: worker processes for fitting (-1 = all cores)
+        max_pending: cap on groups submitted but not yet collected
+                     (default 2 per worker)
+        **mmm_kwargs: passed to every group's MMM
+        """
+        if isinstance(group_cols, str):
+            group_cols = [group_cols]
+        self.group_cols = list(group_cols)
+        self.n_jobs = n_jobs
+        self.max_pending = max_pending
+        self.mmm_kwargs = mmm_kwargs
+
+        self.models_ = None
+        self.errors_ = None
+
+    def _groups(self, df):
+        """(key, row positions in week order) for each group, in first-seen order."""
+        week = df[self.mmm_kwargs.get("time_col", "week")].to_numpy()
+        grouped = df.groupby(self.group_cols, sort=False).indices
+
+        for key, idx in grouped.items():
+            if len(self.group_cols) == 1 and isinstance(key, tuple):
+                key = key[0]
+            yield key, idx[np.argsort(week[idx], kind="stable")]
+
+    def fit(self, df, target_col="sales"):
+        """Fit every group. Failed groups end up in errors_ (key -> message)."""
+        groups = ((key, df.iloc[idx]) for key, idx in self._groups(df))
+        with span("panel.fit", rows=len(df), n_jobs=self.n_jobs):
+            return self._fit_groups(groups, target_col)
+
+    def fit_groups(self, groups, target_col="sales"):
+        """
+        Fit from an iterable of (key, group DataFrame in week order), e.g.
+        data.ingest.iter_groups, so the whole panel never has to be built.
+        Groups are pulled only as workers free up (see max_pending).
+        """
+        with span("panel.fit", n_jobs=self.n_jobs):
+            return self._fit_groups(groups, target_col)
+
+    def _fit_groups(self, groups, target_col):
+        params = MMM(**self.mmm_kwargs).get_params()
+        tasks = ((key, group_df, target_col, params) for key, group_df in groups)
+
+        self.models_ = {}
+        self.errors_ = {}
+        for key, model, error in parallel_imap(
+            _fit_group, tasks, self.n_jobs, self.max_pending
+        ):
+            if error is None:
+                self.models_[key] = model
+            else:
+                self.errors_[key] = error
+
+        return self
+
+    def _check_fitted(self):
+        if self.models_ is None:
+            raise ValueError("Model not fitted yet")
+
+    def predict(self, df):
+        """
+        Predictions for every row of a panel, aligned with df's rows.
+        Rows from groups with no fitted model get NaN.
+
+        Each group's features are built by its own model (decays and
+        curves differ per group), but the linear part is batched: groups
+        with the same features are stacked and scored in one pass, with
+        every row using its group's unscaled coefficients.
+        """
+        self._check_fitted()
+        preds = np.full(len(df), np.nan)
+
+        batches = {}
+        for key, idx in self._groups(df):
+            model = self.models_.get(key)
+            if model is not None:
+                batches.setdefault(tuple(model.feature_names_), []).append(
+                    (model, idx)
+                )
+
+        for batch in batches.values():
+            Xs = [model._build_matrix(df.iloc[idx]) for model, idx in batch]
+            # y = (X - mean) / scale @ coef + intercept = X @ w + b
+            w = np.array([m.model.coef_ / m.scaler.scale_ for m, _ in batch])
+            b = np.array([
+                m.model.intercept_ - m.scaler.mean_ @ w_m
+                for (m, _), w_m in zip(batch, w)
+            ])
+            rows = np.repeat(np.arange(len(batch)), [len(X) for X in Xs])
+            X = np.vstack(Xs) if len(Xs) > 1 else Xs[0]
+            positions = np.concatenate([idx for _, idx in batch])
+            preds[positions] = np.einsum("ij,ij->i", X, w[rows]) + b[rows]
+
+        return preds
+
+    def decompose_sales(self, df):
+        """
+        decompose_sales for every group, stacked and aligned with df's rows.
+
+        Includes the group columns; channels a group doesn't have are NaN.
+        Rows from groups with no fitted model are left out.
+        """
+        from src.insights.decompose import decompose_batch
+
+        self._check_fitted()
+        fitted = [
+            (key, idx) for key, idx in self._groups(df) if key in self.models_
+        ]
+        if not fitted:
+            return pd.DataFrame(columns=self.group_cols)
+
+        frames = [df.iloc[idx] for _, idx in fitted]
+        decomps = decompose_batch([self.models_[key] for key, _ in fitted], frames)
+        parts = [
+            pd.concat([frame[self.group_cols], decomp], axis=1)
+            for frame, decomp in zip(frames, decomps)
+        ]
+
+        # back to the caller's row order
+        positions = np.concatenate([idx for _, idx in fitted])
+        order = np.argsort(positions, kind="stable")
+        return pd.concat(parts).iloc[order]
@@ -0,0 +1,4 @@
+from .cache import SizedLRU
+from .server import ScoringService, serve
+
+__all__ = ["ScoringService", "SizedLRU", "serve"]
@@ -0,0 +1,113 @@
+"""
+In-memory caches for the scoring service.
+"""
+
+import asyncio
+from collections import OrderedDict
+
+
+class SizedLRU:
+    """
+    Least-recently-used cache bounded by total size rather than entry count.
+
+    sizeof(value) gives each entry's size in bytes; the oldest entries are
+    evicted until the total fits in max_bytes. An entry bigger than
+    max_bytes on its own is still returned but never kept.
+
+    Values that grow after they're cached (e.g. models filling their own
+    caches) can be re-measured with resize(). on_evict(key) is called for
+    every entry dropped to make room.
+    """
+
+    def __init__(self, max_bytes, sizeof, on_evict=None):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.on_evict = on_evict
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._loading = {}  # key -> future for loads in flight
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        return self._entries[key][0]
+
+    def put(self, key, value):
+        size = self.sizeof(value)
+        if key in self._entries:
+            self.total_bytes -= self._entries.pop(key)[1]
+        if size > self.max_bytes:
+            return
+
+        self._entries[key] = (value, size)
+        self.total_bytes += size
+        self._evict()
+
+    def resize(self, key, size=None):
+        """Re-measure key's value (or set its size), evicting to fit."""
+        if key not in self._entries:
+            return
+        value, old = self._entries[key]
+        size = self.sizeof(value) if size is None else size
+        self._entries[key] = (value, size)
+        self.total_bytes += size - old
+        self._evict()
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes:
+            key, (_, evicted) = self._entries.popitem(last=False)
+            self.total_bytes -= evicted
+            self.evictions += 1
+            if self.on_evict is not None:
+                self.on_evict(key)
+
+    async def get_or_load(self, key, load):
+        """
+        Cached value for key, or await load() (a coroutine function) once.
+        Concurrent callers asking for the same missing key share one load.
+        """
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        if key in self._loading:
+            self.hits += 1
+            return await self._loading[key]
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        try:
+            value = await load()
+        except Exception as e:
+            future.set_exception(e)
+            # mark retrieved so an unawaited failure doesn't warn
+            future.exception()
+            raise
+        else:
+            self.put(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            del self._loading[key]
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
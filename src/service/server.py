@@ -0,0 +1,336 @@
+"""
+Local HTTP service for scenario, ROAS and decomposition queries.
+
+Loads fitted models (save_model artifacts) and data files on first use and
+keeps them in size-bounded LRU caches, so bursts of what-if queries never
+refit or reload anything. Identical requests that arrive while one is
+already being computed wait for that result instead of recomputing it.
+Standard library only (asyncio + a minimal HTTP/1.1 parser).
+
+Endpoints (JSON in, JSON out):
+    POST /scenario   {"model", "data" | "rows", "reallocations"}
+                     or {"model", "data" | "rows", "multipliers", "spend_cols"}
+    POST /roas       {"model", "data" | "rows"}
+    POST /decompose  {"model", "data" | "rows", "summary": false}
+    POST /response   {"model", "spend": {channel: weekly spend}} (no data;
+                     answered from the model's response curves)
+    GET  /stats      per-endpoint latency percentiles and cache stats
+    GET  /health
+
+"model" is the path of a save_model() file; "data" the path of a CSV with
+the usual week / spend_* / control columns, or "rows" the same as a list
+of records. Run with: python -m src.service.server --port 8080
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import numpy as np
+import pandas as pd
+from src.insights import (
+    budget_scenario,
+    budget_scenarios,
+    contribution_summary,
+    decompose_sales,
+    response_curves,
+    roas_summary,
+)
+from src.model import load_model
+from src.service.cache import SizedLRU
+from src.utils import to_jsonable
+
+# latency samples kept per endpoint for the percentiles in /stats
+LATENCY_WINDOW = 10_000
+ENDPOINTS = ("scenario", "roas", "decompose", "response")
+# stats key for requests to paths that aren't endpoints
+OTHER_PATHS = "other"
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def _model_nbytes(model):
+    """Coefficients plus everything the model has cached since loading."""
+    arrays = [model.model.coef_, model.scaler.mean_, model.scaler.scale_]
+    arrays += list(model._feature_cache.values())
+    arrays += [values for _, values in model._decomposition_cache.values()]
+    if model._response_curves is not None:
+        curves = model._response_curves[1]
+        arrays += [curves.spend, curves.contributions, curves.marginals]
+    return sum(np.asarray(a).nbytes for a in arrays)
+
+
+def _frame_nbytes(df):
+    return int(df.memory_usage(deep=True).sum())
+
+
+def _file_key(path):
+    """Cache key that changes when the file on disk does."""
+    stat = os.stat(path)
+    return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+class ScoringService:
+    """
+    Query handling, caches and stats; the HTTP layer calls query().
+
+    max_cache_bytes is split evenly between loaded models and data frames.
+    Queries run on a thread pool; queries against the same model run one
+    at a time because a model's feature cache isn't thread-safe. A model's
+    size is re-measured after each query, since its caches grow as it
+    serves.
+    """
+
+    def __init__(self, max_cache_bytes=256 * 2**20, max_workers=None):
+        self.models = SizedLRU(
+            max_cache_bytes // 2, _model_nbytes, on_evict=self._drop_lock
+        )
+        self.frames = SizedLRU(max_cache_bytes // 2, _frame_nbytes)
+        self.latencies = defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))
+        self.requests = defaultdict(int)
+        self.coalesced = 0
+
+        self._inflight = {}
+        self._executor = ThreadPoolExecutor(max_workers)
+        self._model_locks = defaultdict(threading.Lock)
+
+    def _drop_lock(self, model_key):
+        self._model_locks.pop(model_key, None)
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def _model(self, body):
+        if "model" not in body:
+            raise BadRequest("missing 'model' (path to a saved model)")
+        key = _file_key(body["model"])
+        model = await self.models.get_or_load(
+            key, lambda: self._run(load_model, body["model"])
+        )
+        return key, model
+
+    async def _data(self, body):
+        if "rows" in body:
+            return pd.DataFrame.from_records(body["rows"])
+        if "data" not in body:
+            raise BadRequest("missing 'data' (CSV path) or 'rows'")
+        return await self.frames.get_or_load(
+            _file_key(body["data"]), lambda: self._run(pd.read_csv, body["data"])
+        )
+
+    def _compute(self, endpoint, model_key, model, df, body):
+        """(result, model size afterwards), measured under the model's lock."""
+        with self._model_locks[model_key]:
+            return self._answer(endpoint, model, df, body), _model_nbytes(model)
+
+    def _answer(self, endpoint, model, df, body):
+        if endpoint == "scenario":
+            if "multipliers" in body:
+                return budget_scenarios(
+                    model, df, body["multipliers"], body.get("spend_cols")
+                )
+            if "reallocations" not in body:
+                raise BadRequest("missing 'reallocations' or 'multipliers'")
+            return budget_scenario(model, df, body["reallocations"])
+
+        if endpoint == "roas":
+            return roas_summary(model, df)
+
+        if endpoint == "response":
+            if "spend" not in body:
+                raise BadRequest("missing 'spend' (channel -> weekly spend)")
+            curves = response_curves(model)
+            channels = {
+                ch: {
+                    "contribution": curves.contribution(ch, spend),
+                    "marginal": curves.marginal(ch, spend),
+                }
+                for ch, spend in body["spend"].items()
+            }
+            total = sum(c["contribution"] for c in channels.values())
+            return {"channels": channels, "total_contribution": total}
+
+        if body.get("summary"):
+            return contribution_summary(model, df)
+        decomp = decompose_sales(model, df)
+        if model.time_col in df.columns:
+            decomp.insert(0, model.time_col, df[model.time_col].to_numpy())
+        return decomp
+
+    async def query(self, endpoint, body):
+        """
+        Answer one query. Identical concurrent queries are coalesced:
+        only the first computes, the rest await its result.
+        """
+        key = (endpoint, json.dumps(body, sort_keys=True))
+        if key in self._inflight:
+            self.coalesced += 1
+            return await asyncio.shield(self._inflight[key])
+
+        task = asyncio.ensure_future(self._query(endpoint, body))
+        self._inflight[key] = task
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _query(self, endpoint, body):
+        model_key, model = await self._model(body)
+        df = None if endpoint == "response" else await self._data(body)
+        result, nbytes = await self._run(
+            self._compute, endpoint, model_key, model, df, body
+        )
+        self.models.resize(model_key, nbytes)
+        if model_key not in self.models:
+            # too big to keep (or just evicted): nothing shares its lock
+            self._drop_lock(model_key)
+        return to_jsonable(result)
+
+    def stats(self):
+        endpoints = {}
+        for path, samples in self.latencies.items():
+            ms = np.array(samples) * 1e3
+            endpoints[path] = {
+                "requests": self.requests[path],
+                "p50_ms": float(np.percentile(ms, 50)),
+                "p90_ms": float(np.percentile(ms, 90)),
+                "p99_ms": float(np.percentile(ms, 99)),
+                "max_ms": float(ms.max()),
+            }
+        return {
+            "endpoints": endpoints,
+            "coalesced": self.coalesced,
+            "model_cache": self.models.stats(),
+            "data_cache": self.frames.stats(),
+        }
+
+    async def dispatch(self, method, path, body_bytes):
+        """Route one HTTP request; returns (status, payload)."""
+        start = time.perf_counter()
+        try:
+            if method == "GET" and path == "/health":
+                return HTTPStatus.OK, {"status": "ok"}
+            if method == "GET" and path == "/stats":
+                return HTTPStatus.OK, self.stats()
+
+            endpoint = path.strip("/")
+            if endpoint not in ENDPOINTS:
+                return HTTPStatus.NOT_FOUND, {"error": f"no endpoint {path}"}
+            if method != "POST":
+                return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "use POST"}
+
+            try:
+                body = json.loads(body_bytes or b"{}")
+            except json.JSONDecodeError as e:
+                raise BadRequest(f"invalid JSON: {e}")
+            if not isinstance(body, dict):
+                raise BadRequest("request body must be a JSON object")
+
+            return HTTPStatus.OK, await self.query(endpoint, body)
+        except (BadRequest, FileNotFoundError, KeyError, ValueError) as e:
+            return HTTPStatus.BAD_REQUEST, {"error": f"{type(e).__name__}: {e}"}
+        except Exception as e:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {
+                "error": f"{type(e).__name__}: {e}"
+            }
+        finally:
+            if path != "/stats":
+                # one bucket for unknown paths, so stray requests can't
+                # grow the stats without bound
+                known = path == "/health" or path.strip("/") in ENDPOINTS
+                name = path if known else OTHER_PATHS
+                self.requests[name] += 1
+                self.latencies[name].append(time.perf_counter() - start)
+
+    async def handle_connection(self, reader, writer):
+        """Minimal HTTP/1.1: Content-Length bodies, keep-alive by default."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                    length = int(headers.get("content-length", 0))
+                except ValueError:
+                    _write_response(
+                        writer, HTTPStatus.BAD_REQUEST, {"error": "bad request"}, False
+                    )
+                    break
+
+                body = await reader.readexactly(length)
+                status, payload = await self.dispatch(
+                    method, target.split("?")[0], body
+                )
+
+                keep_alive = (
+                    version == "HTTP/1.1"
+                    and headers.get("connection", "").lower() != "close"
+                )
+                _write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=8080):
+        """Start listening; returns the asyncio Server (port=0 picks a free one)."""
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+
+def _write_response(writer, status, payload, keep_alive):
+    body = json.dumps(payload).encode()
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+
+
+def serve(host="127.0.0.1", port=8080, max_cache_mb=256, max_workers=None):
+    """Run the service until interrupted."""
+    service = ScoringService(max_cache_mb * 2**20, max_workers)
+
+    async def main():
+        server = await service.start(host, port)
+        print(f"Serving on http://{host}:{server.sockets[0].getsockname()[1]}")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MMM scoring service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-cache-mb", type=int, default=256)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    serve(args.host, args.port, args.max_cache_mb, args.workers)
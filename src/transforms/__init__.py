@@ -1,4 +1,30 @@
-from .adstock import adstock
-from .saturation import saturation
+from .adstock import (
+    adstock,
+    adstock_kernel,
+    adstock_matrix,
+    convolve_adstock,
+    delayed_kernel,
+    weibull_kernel,
+)
+from .fourier import fourier_basis, fourier_features
+from .saturation import (
+    saturation,
+    saturation_derivative,
+    saturation_grid,
+    saturation_grid_derivative,
+)
 
-__all__ = ["adstock", "saturation"]
+__all__ = [
+    "adstock",
+    "adstock_matrix",
+    "adstock_kernel",
+    "convolve_adstock",
+    "weibull_kernel",
+    "delayed_kernel",
+    "fourier_basis",
+    "fourier_features",
+    "saturation",
+    "saturation_derivative",
+    "saturation_grid",
+    "saturation_grid_derivative",
+]
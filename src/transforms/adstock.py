@@ -9,6 +9,13 @@ Adstock transformation for marketing spend.
 import numpy as np
 
 
+def _check_decay(decay_rates):
+    decay_rates = np.asarray(decay_rates, dtype=float)
+    if np.any((decay_rates < 0) | (decay_rates > 1)):
+        raise ValueError("decay_rate must be between 0 and 1")
+    return decay_rates
+
+
 def adstock(x, decay_rate):
     """
     Apply geometric adstock decay to a spend series.
@@ -23,14 +30,160 @@ def adstock(x, decay_rate):
         adstock(spend, 0.5) -> [100, 50, 25, 12.5]
     """
     x = np.asarray(x, dtype=float)
+    return adstock_matrix(x[:, None], [decay_rate])[:, 0]
 
-    if not 0 <= decay_rate <= 1:
-        raise ValueError("decay_rate must be between 0 and 1")
 
-    result = np.zeros_like(x)
-    result[0] = x[0]
+def adstock_matrix(X, decay_rates, initial=None):
+    """
+    Apply geometric adstock to every channel of a spend matrix at once.
+    - X: 2-D array of spend, shape (time, channel)
+    - decay_rates: one decay rate per channel (or a single rate for all)
+    - initial: optional adstocked value per channel for the period just
+        before X (e.g. the last row of an earlier call), to continue a
+        series where it left off. Default: start from zero.
+
+    Same recursion as adstock(), result[t] = x[t] + decay * result[t - 1],
+    but run as a linear filter in compiled code instead of a Python loop.
+    Channels that share a decay rate are filtered together in one call.
+    """
+    # scipy.signal is slow to import, so only load it once adstock actually runs
+    from scipy.signal import lfilter
+
+    X = np.asarray(X, dtype=float)
+    if X.ndim != 2:
+        raise ValueError("X must be 2-D (time x channel)")
 
-    for t in range(1, len(x)):
-        result[t] = x[t] + decay_rate * result[t - 1]
+    decay_rates = _check_decay(np.broadcast_to(decay_rates, X.shape[1:]))
+
+    result = np.empty_like(X)
+    for decay in np.unique(decay_rates):
+        cols = np.flatnonzero(decay_rates == decay)
+        # y[t] = x[t] + decay * y[t-1]  <=>  IIR filter b=[1], a=[1, -decay]
+        if initial is None:
+            result[:, cols] = lfilter([1.0], [1.0, -decay], X[:, cols], axis=0)
+        else:
+            # filter state carries decay * (previous adstocked value)
+            zi = decay * np.asarray(initial, dtype=float)[cols][None, :]
+            result[:, cols], _ = lfilter(
+                [1.0], [1.0, -decay], X[:, cols], axis=0, zi=zi
+            )
 
     return result
+
+
+# Kernel adstock: effect spread over a finite window of lags, e.g. spend
+# whose impact peaks a few periods later (creator activations, brand video).
+# Kernels are 1-D weight arrays indexed by lag (0 = same period) with a peak
+# weight of 1, like geometric adstock's weight on the current period.
+
+# kernels longer than this are convolved with FFT, shorter ones directly
+FFT_MIN_LAGS = 64
+
+
+def weibull_kernel(shape, scale, max_lag, kind="pdf"):
+    """
+    Weibull-shaped lag weights over max_lag periods.
+    - kind="pdf": weights follow the Weibull density at lags 1..max_lag,
+      so shape > 1 gives an effect that builds up, peaks, then fades
+    - kind="cdf": weights follow the survival curve exp(-(lag/scale)^shape),
+      a decay that can be slower or faster than geometric (shape=1 is
+      geometric with decay exp(-1/scale))
+    scale is in periods.
+    """
+    if shape <= 0 or scale <= 0 or max_lag < 1:
+        raise ValueError("weibull kernel needs shape > 0, scale > 0, max_lag >= 1")
+
+    lags = np.arange(max_lag, dtype=float)
+    if kind == "pdf":
+        z = (lags + 1) / scale
+        weights = (shape / scale) * z ** (shape - 1) * np.exp(-(z ** shape))
+    elif kind == "cdf":
+        weights = np.exp(-((lags / scale) ** shape))
+    else:
+        raise ValueError(f"Unknown kind: {kind}. Use 'pdf' or 'cdf'.")
+
+    return weights / weights.max()
+
+
+def delayed_kernel(decay, delay, max_lag):
+    """
+    Delayed adstock weights decay^((lag - delay)^2): the effect peaks
+    delay periods after spend and decays on either side.
+    """
+    _check_decay(decay)
+    if max_lag < 1:
+        raise ValueError("max_lag must be at least 1")
+    lags = np.arange(max_lag, dtype=float)
+    return float(decay) ** ((lags - delay) ** 2)
+
+
+ADSTOCK_KERNELS = {"weibull": weibull_kernel, "delayed": delayed_kernel}
+
+
+def adstock_kernel(spec):
+    """
+    Lag weights from a config dict, e.g.
+        {"type": "weibull", "shape": 2.0, "scale": 10, "max_lag": 90}
+        {"type": "delayed", "decay": 0.6, "delay": 3, "max_lag": 13}
+    """
+    spec = dict(spec)
+    kind = spec.pop("type", None)
+    if kind not in ADSTOCK_KERNELS:
+        raise ValueError(
+            f"Unknown adstock type: {kind}. Use one of {list(ADSTOCK_KERNELS)}."
+        )
+    return ADSTOCK_KERNELS[kind](**spec)
+
+
+def convolve_adstock(X, kernels, history=None, method="auto"):
+    """
+    Apply kernel adstock to every channel of a spend matrix at once.
+    - X: 2-D array of spend, shape (time, channel)
+    - kernels: list of one weight array per channel (lengths may differ),
+        or a single 1-D numpy array used for every channel
+    - history: optional spend rows from just before X (oldest first), so
+        lagged effects of earlier spend carry into X. Default: none.
+    - method: "direct" (one vectorized multiply-add per lag), "fft"
+        (one batched real FFT for all channels), or "auto" to pick FFT for
+        kernels longer than FFT_MIN_LAGS
+
+    result[t, c] = sum over lag l of kernels[c][l] * X[t - l, c]
+    """
+    X = np.asarray(X, dtype=float)
+    if X.ndim != 2:
+        raise ValueError("X must be 2-D (time x channel)")
+
+    if isinstance(kernels, np.ndarray) and kernels.ndim == 1:
+        kernels = [kernels] * X.shape[1]
+    n_lags = max([len(k) for k in kernels] + [1])
+    # channels' kernels stacked (lag x channel), zero-padded to one length
+    W = np.zeros((n_lags, X.shape[1]))
+    for c, kernel in enumerate(kernels):
+        W[: len(kernel), c] = kernel
+
+    n_history = 0
+    if history is not None and n_lags > 1:
+        # only the last n_lags - 1 rows can still reach X
+        history = np.asarray(history, dtype=float).reshape(-1, X.shape[1])
+        history = history[-(n_lags - 1):]
+        n_history = len(history)
+        X = np.vstack([history, X])
+
+    if method == "auto":
+        method = "fft" if n_lags > FFT_MIN_LAGS else "direct"
+
+    n = len(X)
+    if method == "direct":
+        result = X * W[0]
+        for lag in range(1, min(n_lags, n)):
+            result[lag:] += X[:-lag] * W[lag]
+    elif method == "fft":
+        from scipy.fft import irfft, next_fast_len, rfft
+
+        size = next_fast_len(n + n_lags - 1, real=True)
+        spectrum = rfft(X, size, axis=0) * rfft(W, size, axis=0)
+        result = irfft(spectrum, size, axis=0)[:n]
+    else:
+        raise ValueError(f"Unknown method: {method}. Use 'auto', 'direct' or 'fft'.")
+
+    return result[n_history:]
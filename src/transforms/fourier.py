@@ -0,0 +1,79 @@
+"""
+Fourier seasonality terms.
+
+A basis is a set of sin/cos columns for one seasonal period, e.g. weekly
+(7) and annual (365.25) cycles for daily data. Bases are cached by
+(time index, period, order), so fits, CV folds and scenario predictions
+over the same dates share one computation.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# (time index hash, period, order) -> basis, most recent last
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+CACHE_SIZE = 32
+
+
+def _compute_basis(t, period, order):
+    """sin/cos columns, interleaved as sin_1, cos_1, sin_2, ..."""
+    k = np.arange(1, order + 1)
+    angles = (2 * np.pi * k)[None, :] * t[:, None] / period
+
+    out = np.empty((len(t), 2 * order))
+    out[:, 0::2] = np.sin(angles)
+    out[:, 1::2] = np.cos(angles)
+    return out
+
+
+def fourier_basis(t, period, order):
+    """
+    (len(t) x 2*order) sin/cos basis for one period, cached.
+    Takes as arguments, t: time index (e.g. week or day number),
+    period: cycle length in units of t, and order: number of harmonics.
+
+    The returned array is shared between callers, so it's read-only.
+    """
+    t = np.ascontiguousarray(t, dtype=float)
+    key = (
+        hashlib.blake2b(t.view(np.uint8), digest_size=16).hexdigest(),
+        len(t),
+        float(period),
+        int(order),
+    )
+
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    basis = _compute_basis(t, period, order)
+    basis.flags.writeable = False
+
+    with _cache_lock:
+        _cache[key] = basis
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+    return basis
+
+
+def fourier_features(t, seasonalities):
+    """
+    Bases for several (period, order) pairs side by side, in that order.
+    """
+    bases = [fourier_basis(t, period, order) for period, order in seasonalities]
+    if len(bases) == 1:
+        return bases[0]
+    if not bases:
+        return np.empty((len(t), 0))
+    return np.hstack(bases)
+
+
+def clear_fourier_cache():
+    with _cache_lock:
+        _cache.clear()
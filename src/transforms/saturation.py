@@ -2,27 +2,139 @@
 Saturation transformation for marketing spend.
 
 Models diminishing returns - doubling spend doesn't double impact.
+
+Fixed shapes ("sqrt", "log") have no parameters. Parametric curves let
+each channel saturate at its own rate:
+    - "hill": x^S / (x^S + K^S), K = half_saturation (spend level giving
+      half the maximum effect), S = slope (>1 gives an S-shape)
+    - "logistic": (1 - exp(-lam x)) / (1 + exp(-lam x)), lam = rate
+Parameters broadcast against x, so per-channel values are just arrays
+over the last (channel) axis. saturation_grid evaluates a whole grid of
+parameter settings in one call.
 """
 
 import numpy as np
 
+# parameters each method takes, and defaults for the optional ones
+SATURATION_PARAMS = {
+    "sqrt": (),
+    "log": (),
+    "hill": ("half_saturation", "slope"),
+    "logistic": ("lam",),
+}
+PARAM_DEFAULTS = {"slope": 1.0}
+
+
+def _check_params(method, params):
+    """Known method, known params; returns params with defaults filled in."""
+    if method not in SATURATION_PARAMS:
+        raise ValueError(
+            f"Unknown method: {method}. Use one of {list(SATURATION_PARAMS)}."
+        )
+    names = SATURATION_PARAMS[method]
+    unknown = set(params) - set(names)
+    if unknown:
+        raise ValueError(
+            f"{method} saturation takes {list(names)}, got {sorted(unknown)}"
+        )
+
+    out = {}
+    for name in names:
+        if name in params and params[name] is not None:
+            out[name] = np.asarray(params[name], dtype=float)
+        elif name in PARAM_DEFAULTS:
+            out[name] = np.asarray(PARAM_DEFAULTS[name])
+        else:
+            raise ValueError(f"{method} saturation needs {name}")
+    return out
 
-def saturation(x, method="sqrt"):
+
+def saturation(x, method="sqrt", **params):
     """
     Apply saturation curve to capture diminishing returns.
     Takes as arguments, x: array of spend values
     and method: transformation type
         - "sqrt": square root (moderate saturation)
         - "log": natural log (aggressive saturation, requires x > 0)
+        - "hill": needs half_saturation, optional slope (default 1)
+        - "logistic": needs lam
+    and any curve parameters, broadcast against x.
 
     Returns a transformed array with diminishing returns applied
     """
     x = np.asarray(x, dtype=float)
+    params = _check_params(method, params)
 
     if method == "sqrt":
         return np.sqrt(np.maximum(x, 0))
     elif method == "log":
         # log1p handles x=0 gracefully: log(1+x)
         return np.log1p(np.maximum(x, 0))
+    elif method == "hill":
+        # x^S / (x^S + K^S) == r / (1 + r), one power instead of two
+        r = (np.maximum(x, 0) / params["half_saturation"]) ** params["slope"]
+        return r / (1 + r)
+    else:
+        return np.tanh(0.5 * params["lam"] * np.maximum(x, 0))
+
+
+def saturation_derivative(x, method="sqrt", **params):
+    """
+    Slope of the saturation curve at x, i.e. d saturation(x) / dx.
+    Used for analytic gradients (e.g. budget optimization).
+
+    The sqrt slope is infinite at 0 (and so is hill's for slope < 1), so x
+    is floored at a tiny positive value.
+    """
+    x = np.asarray(x, dtype=float)
+    params = _check_params(method, params)
+
+    if method == "sqrt":
+        return 0.5 / np.sqrt(np.maximum(x, 1e-12))
+    elif method == "log":
+        return 1.0 / (1.0 + np.maximum(x, 0))
+    elif method == "hill":
+        x = np.maximum(x, 1e-12)
+        slope = params["slope"]
+        r = (x / params["half_saturation"]) ** slope
+        return slope * r / (x * (1 + r) ** 2)
     else:
-        raise ValueError(f"Unknown method: {method}. Use 'sqrt' or 'log'.")
+        lam = params["lam"]
+        t = np.tanh(0.5 * lam * np.maximum(x, 0))
+        return 0.5 * lam * (1 - t * t)
+
+
+def _grid(params):
+    """(n_settings,) or (n_settings x channel) params -> (n_settings x 1 x channel)."""
+    out = {}
+    for name, values in params.items():
+        values = np.asarray(values, dtype=float)
+        if values.ndim == 1:
+            values = values[:, None]
+        out[name] = values[:, None, :]
+    return out
+
+
+def saturation_grid(x, method, **params):
+    """
+    Evaluate many parameter settings for every channel in one vectorized call.
+
+    x: (time x channel) adstocked spend
+    params: one array per curve parameter, either (n_settings,) to use the
+        same value for every channel or (n_settings x channel)
+
+    Returns an (n_settings x time x channel) array; [i] is the curve with
+    the i-th setting. E.g. hill over a 50 x 40 grid of K and S:
+
+        K, S = np.meshgrid(k_values, s_values)
+        curves = saturation_grid(x, "hill", half_saturation=K.ravel(),
+                                 slope=S.ravel())
+    """
+    return saturation(np.asarray(x, dtype=float)[None], method, **_grid(params))
+
+
+def saturation_grid_derivative(x, method, **params):
+    """saturation_derivative for a grid of settings, shaped like saturation_grid."""
+    return saturation_derivative(
+        np.asarray(x, dtype=float)[None], method, **_grid(params)
+    )
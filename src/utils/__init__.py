@@ -0,0 +1,15 @@
+from .hashing import frame_fingerprint
+from .parallel import attach_arrays, parallel_imap, parallel_map, shared_arrays
+from .profiling import profile, span
+from .serialize import to_jsonable
+
+__all__ = [
+    "frame_fingerprint",
+    "parallel_map",
+    "parallel_imap",
+    "shared_arrays",
+    "attach_arrays",
+    "profile",
+    "span",
+    "to_jsonable",
+]
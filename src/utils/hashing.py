@@ -0,0 +1,32 @@
+"""
+Content fingerprints for DataFrames, used as cache keys.
+"""
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+
+def frame_fingerprint(df, columns=None):
+    """
+    Hash the contents of df (or just `columns` of it) into a hex string.
+
+    Numeric columns are hashed from their raw bytes, so this is cheap
+    compared to rebuilding anything from the frame. Column names, dtypes
+    and row count are part of the key.
+    """
+    columns = list(df.columns) if columns is None else list(columns)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(str(len(df)).encode())
+
+    for col in columns:
+        values = df[col].to_numpy()
+        h.update(f"{col}:{values.dtype.str}".encode())
+        if values.dtype.kind in "biufcmM":
+            h.update(np.ascontiguousarray(values).view(np.uint8))
+        else:
+            hashed = pd.util.hash_pandas_object(df[col], index=False).to_numpy()
+            h.update(hashed.view(np.uint8))
+
+    return h.hexdigest()
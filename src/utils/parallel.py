@@ -0,0 +1,150 @@
+"""
+Small helpers for fanning work out over a process or thread pool.
+
+Kept deliberately thin: results always come back in task order so
+callers stay deterministic regardless of how many workers ran.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from multiprocessing import shared_memory
+
+import numpy as np
+from src.utils import profiling
+
+BACKENDS = {"process": ProcessPoolExecutor, "thread": ThreadPoolExecutor}
+
+# Shared memory blocks this worker process has already mapped, by name
+_attached = {}
+
+
+def n_workers(n_jobs):
+    """Resolve n_jobs (None/1 = serial, -1 = all cores) to a worker count."""
+    if n_jobs is None:
+        return 1
+    if n_jobs < 0:
+        return max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+    return max(1, n_jobs)
+
+
+def _traced(func, backend):
+    """
+    func as submitted to the pool, plus the profile that worker spans
+    should be grafted into (process backend only; results come back as
+    (result, spans) pairs then).
+    """
+    prof = profiling.active()
+    if prof is None:
+        return func, None
+    if backend == "thread":
+        return prof.wrap_thread(func), None
+    return partial(profiling._traced_call, func, prof.memory), prof
+
+
+def _untraced(result, prof):
+    if prof is None:
+        return result
+    result, spans = result
+    prof.graft(spans)
+    return result
+
+
+def parallel_map(func, tasks, n_jobs=1, backend="process"):
+    """
+    Apply func to every task and return results in task order.
+    - func: must be a module-level function for the process backend
+    - tasks: list of arguments, one per call
+    - n_jobs: number of workers; 1 runs inline with no pool at all
+    - backend: "process" or "thread". Threads only help when func spends
+      its time in code that releases the GIL (numpy, sklearn solvers).
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend: {backend}. Use 'process' or 'thread'.")
+
+    tasks = list(tasks)
+    workers = min(n_workers(n_jobs), len(tasks))
+
+    if workers <= 1:
+        return [func(task) for task in tasks]
+
+    func, prof = _traced(func, backend)
+    with BACKENDS[backend](max_workers=workers) as pool:
+        return [_untraced(result, prof) for result in pool.map(func, tasks)]
+
+
+def parallel_imap(func, tasks, n_jobs=1, max_pending=None, backend="process"):
+    """
+    Lazy, ordered version of parallel_map for large or expensive task lists.
+
+    tasks can be any iterable (e.g. a generator slicing one group at a
+    time); at most max_pending tasks (default 2 per worker) are submitted
+    and not yet consumed, so only that many inputs/results sit in memory.
+    Yields results in task order.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend: {backend}. Use 'process' or 'thread'.")
+
+    workers = n_workers(n_jobs)
+    if workers <= 1:
+        for task in tasks:
+            yield func(task)
+        return
+
+    max_pending = max_pending or 2 * workers
+    func, prof = _traced(func, backend)
+    with BACKENDS[backend](max_workers=workers) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(func, task))
+            if len(pending) >= max_pending:
+                yield _untraced(pending.popleft().result(), prof)
+        while pending:
+            yield _untraced(pending.popleft().result(), prof)
+
+
+@contextmanager
+def shared_arrays(arrays):
+    """
+    Copy a dict of numpy arrays into one shared memory block.
+
+    Yields a small picklable handle; workers call attach_arrays(handle)
+    to get read-only views without the arrays being pickled per task.
+    The block is released when the with-block exits.
+    """
+    layout = []
+    size = 0
+    for key, arr in arrays.items():
+        arr = np.asarray(arr)
+        layout.append((key, arr.shape, arr.dtype.str, size))
+        # keep every array 64-byte aligned
+        size += -(-arr.nbytes // 64) * 64
+
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    try:
+        for (key, shape, dtype, offset), arr in zip(layout, arrays.values()):
+            view = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+            view[...] = arr
+            del view
+        yield (shm.name, layout)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def attach_arrays(handle):
+    """Map a shared_arrays() block in a worker; returns dict of read-only views."""
+    name, layout = handle
+
+    if name not in _attached:
+        shm = shared_memory.SharedMemory(name=name)
+        views = {}
+        for key, shape, dtype, offset in layout:
+            view = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+            view.flags.writeable = False
+            views[key] = view
+        _attached[name] = (shm, views)
+
+    return _attached[name][1]
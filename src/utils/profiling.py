@@ -0,0 +1,328 @@
+"""
+Opt-in timing spans for the pipeline stages.
+
+Library code wraps its stages in span():
+
+    with span("mmm.solve", rows=len(X)):
+        ...
+
+which costs a function call and a global lookup when profiling is off.
+To record, run the code under profile():
+
+    with profile(memory=True) as prof:
+        PanelMMM("title").fit(panel)
+    prof.summary()                        # time per stage
+    prof.summary(group_by="group")        # ... and per panel group
+    prof.to_chrome_trace("fit.trace.json")  # chrome://tracing or Perfetto
+
+- spans nest per thread; pool workers started through parallel_map /
+  parallel_imap are attached under the span that submitted them, and
+  process workers send their spans back along with their results
+- memory=True also traces allocations with tracemalloc (net and peak
+  bytes per span). It slows everything down noticeably, and the numbers
+  only make sense when one thread is working at a time
+"""
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# the Profile currently recording, or None
+_active = None
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("prof", "name", "attrs", "index", "depth", "start_mem", "max_peak")
+
+    def __init__(self, prof, name, attrs):
+        self.prof = prof
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.prof._open(self)
+        return self
+
+    def __exit__(self, *exc):
+        self.prof._close(self)
+        return False
+
+
+def span(name, **attrs):
+    """Context manager timing one stage; a shared no-op unless profiling."""
+    prof = _active
+    if prof is None:
+        return _NULL_SPAN
+    return _Span(prof, name, attrs)
+
+
+def active():
+    """The Profile currently recording, or None."""
+    return _active
+
+
+@contextmanager
+def profile(memory=False):
+    """Record every span() entered inside the block into a new Profile."""
+    global _active
+    prof = Profile(memory=memory)
+    previous = _active
+    started_tracing = memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+
+    _active = prof
+    try:
+        yield prof
+    finally:
+        _active = previous
+        if started_tracing:
+            tracemalloc.stop()
+
+
+def _traced_call(func, memory, task):
+    """Process worker: run func under its own profile and return its spans."""
+    with profile(memory=memory) as prof:
+        result = func(task)
+    return result, prof.records
+
+
+class Profile:
+    """
+    Spans recorded by profile(), as a flat list of dicts in start order.
+
+    Each record has name, attrs, start_ns / duration_ns (perf_counter),
+    pid, tid, depth and parent (index into records, None for roots);
+    with memory=True also net_bytes and peak_bytes.
+    """
+
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.records = []
+        self.start_ns = time.perf_counter_ns()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _open(self, s):
+        stack = self._stack()
+        parent = stack[-1] if stack else None
+
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if parent is not None:
+                parent.max_peak = max(parent.max_peak, peak)
+            tracemalloc.reset_peak()
+            s.start_mem = s.max_peak = current
+
+        s.depth = 0 if parent is None else parent.depth + 1
+        record = {
+            "name": s.name,
+            "attrs": s.attrs,
+            "start_ns": 0,
+            "duration_ns": 0,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "depth": s.depth,
+            "parent": None if parent is None else parent.index,
+        }
+        with self._lock:
+            s.index = len(self.records)
+            self.records.append(record)
+
+        stack.append(s)
+        record["start_ns"] = time.perf_counter_ns()
+
+    def _close(self, s):
+        end = time.perf_counter_ns()
+        record = self.records[s.index]
+        record["duration_ns"] = end - record["start_ns"]
+
+        stack = self._stack()
+        stack.pop()
+
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            s.max_peak = max(s.max_peak, peak)
+            record["net_bytes"] = current - s.start_mem
+            record["peak_bytes"] = s.max_peak - s.start_mem
+            if stack:
+                stack[-1].max_peak = max(stack[-1].max_peak, s.max_peak)
+
+    def graft(self, records):
+        """Attach spans recorded elsewhere (a worker) under the current span."""
+        stack = self._stack()
+        parent = stack[-1] if stack else None
+        base_depth = 0 if parent is None else parent.depth + 1
+
+        with self._lock:
+            offset = len(self.records)
+            for r in records:
+                r = dict(r)
+                if r["parent"] is None:
+                    r["parent"] = None if parent is None else parent.index
+                else:
+                    r["parent"] += offset
+                r["depth"] += base_depth
+                self.records.append(r)
+
+    def wrap_thread(self, func):
+        """func for a pool thread, with the caller's current span as its parent."""
+        stack = self._stack()
+        parent = stack[-1] if stack else None
+
+        def run(task):
+            worker_stack = self._stack()
+            pushed = parent is not None and not worker_stack
+            if pushed:
+                worker_stack.append(parent)
+            try:
+                return func(task)
+            finally:
+                if pushed:
+                    worker_stack.pop()
+
+        return run
+
+    def _self_ns(self):
+        """Duration of each record minus the time spent in its children."""
+        self_ns = [r["duration_ns"] for r in self.records]
+        for r in self.records:
+            # children on other threads/processes may overlap the parent's
+            # own work, so they don't count against it
+            parent = r["parent"]
+            if parent is not None and (
+                self.records[parent]["tid"] == r["tid"]
+                and self.records[parent]["pid"] == r["pid"]
+            ):
+                self_ns[parent] -= r["duration_ns"]
+        return self_ns
+
+    def to_dict(self):
+        """Spans as a tree: {"memory": bool, "spans": [{..., "children": []}]}."""
+        nodes = []
+        for r in self.records:
+            node = {
+                "name": r["name"],
+                "attrs": r["attrs"],
+                "start_ms": (r["start_ns"] - self.start_ns) / 1e6,
+                "duration_ms": r["duration_ns"] / 1e6,
+                "pid": r["pid"],
+                "tid": r["tid"],
+                "children": [],
+            }
+            if "net_bytes" in r:
+                node["net_bytes"] = r["net_bytes"]
+                node["peak_bytes"] = r["peak_bytes"]
+            nodes.append(node)
+
+        roots = []
+        for r, node in zip(self.records, nodes):
+            if r["parent"] is None:
+                roots.append(node)
+            else:
+                nodes[r["parent"]]["children"].append(node)
+
+        return {"memory": self.memory, "spans": roots}
+
+    def to_json(self, path=None):
+        """to_dict() as JSON; written to path if given, else returned."""
+        text = json.dumps(self.to_dict(), indent=2, default=str)
+        if path is None:
+            return text
+        with open(path, "w") as f:
+            f.write(text)
+
+    def to_chrome_trace(self, path=None):
+        """
+        Chrome trace-event format ("X" complete events, microseconds).
+        Written to path if given, else returned as a dict.
+        """
+        events = []
+        for r in self.records:
+            args = {k: str(v) for k, v in r["attrs"].items()}
+            if "net_bytes" in r:
+                args["net_bytes"] = r["net_bytes"]
+                args["peak_bytes"] = r["peak_bytes"]
+            events.append({
+                "name": r["name"],
+                "ph": "X",
+                "ts": (r["start_ns"] - self.start_ns) / 1e3,
+                "dur": r["duration_ns"] / 1e3,
+                "pid": r["pid"],
+                "tid": r["tid"],
+                "args": args,
+            })
+
+        trace = {"traceEvents": events, "displayTimeUnit": "ms"}
+        if path is None:
+            return trace
+        with open(path, "w") as f:
+            json.dump(trace, f)
+
+    def summary(self, group_by=None):
+        """
+        Per-stage totals as a DataFrame, slowest first:
+        calls, total_ms, self_ms (excluding child spans), mean_ms, max_ms
+        and, with memory=True, peak_bytes (largest peak of any call).
+
+        group_by: attr name(s) to break stages down by, e.g. "group" for
+            panel groups or "fold" for CV folds
+        """
+        import pandas as pd
+
+        if isinstance(group_by, str):
+            group_by = [group_by]
+        group_by = list(group_by or [])
+
+        rows = []
+        for r, self_ns in zip(self.records, self._self_ns()):
+            row = {"name": r["name"]}
+            for attr in group_by:
+                row[attr] = r["attrs"].get(attr)
+            row["total_ms"] = r["duration_ns"] / 1e6
+            row["self_ms"] = self_ns / 1e6
+            if self.memory:
+                row["peak_bytes"] = r.get("peak_bytes", 0)
+            rows.append(row)
+
+        columns = ["name", *group_by, "calls", "total_ms", "self_ms",
+                   "mean_ms", "max_ms"] + (["peak_bytes"] if self.memory else [])
+        if not rows:
+            return pd.DataFrame(columns=columns)
+
+        df = pd.DataFrame(rows)
+        keys = ["name", *group_by]
+        agg = {
+            "calls": ("total_ms", "size"),
+            "total_ms": ("total_ms", "sum"),
+            "self_ms": ("self_ms", "sum"),
+            "mean_ms": ("total_ms", "mean"),
+            "max_ms": ("total_ms", "max"),
+        }
+        if self.memory:
+            agg["peak_bytes"] = ("peak_bytes", "max")
+
+        out = df.groupby(keys, sort=False, dropna=False).agg(**agg).reset_index()
+        return out.sort_values("total_ms", ascending=False, ignore_index=True)[columns]
@@ -0,0 +1,23 @@
+"""
+Plain-JSON conversion for results that hold numpy / pandas values.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def to_jsonable(obj):
+    """numpy / pandas values -> plain JSON types (non-finite floats -> None)."""
+    if isinstance(obj, dict):
+        return {str(k): to_jsonable(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [to_jsonable(v) for v in obj]
+    if isinstance(obj, np.ndarray):
+        return to_jsonable(obj.tolist())
+    if isinstance(obj, pd.DataFrame):
+        return to_jsonable(obj.to_dict(orient="records"))
+    if isinstance(obj, np.generic):
+        obj = obj.item()
+    if isinstance(obj, float) and not np.isfinite(obj):
+        return None
+    return obj
@@ -1,4 +1,16 @@
 from .cv import rolling_origin_cv
 from .metrics import mae, mape, r_squared
+from .path import alpha_grid, regularization_path
+from .search import grid_search, random_search, successive_halving
 
-__all__ = ["rolling_origin_cv", "mae", "mape", "r_squared"]
+__all__ = [
+    "rolling_origin_cv",
+    "mae",
+    "mape",
+    "r_squared",
+    "grid_search",
+    "random_search",
+    "successive_halving",
+    "regularization_path",
+    "alpha_grid",
+]
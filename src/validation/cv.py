@@ -7,15 +7,111 @@ Rolling-origin cross-validation for time series:
 
 import numpy as np
 from src.model import MMM
+from src.utils import attach_arrays, parallel_map, shared_arrays
+from src.utils.parallel import n_workers
+from src.utils.profiling import span
 from src.validation.metrics import mae, mape, r_squared
 
 
+def _fold_bounds(n, min_train_weeks, test_weeks, step):
+    """List of (fold, train_end, test_end) row positions for each fold."""
+    bounds = []
+    train_end = min_train_weeks
+
+    while train_end + test_weeks <= n:
+        bounds.append((len(bounds), train_end, train_end + test_weeks))
+        train_end += step
+
+    return bounds
+
+
+def _fold_result(fold, train_end, test_end, actuals, preds):
+    return {
+        "fold": fold,
+        "train_weeks": train_end,
+        "test_start": train_end,
+        "test_end": test_end,
+        "mae": mae(actuals, preds),
+        "mape": mape(actuals, preds),
+        "r2": r_squared(actuals, preds),
+    }
+
+
+def _summarize(results):
+    """Aggregate fold-level results into the dict rolling_origin_cv returns."""
+    if results:
+        avg_mae = np.mean([r["mae"] for r in results])
+        avg_mape = np.mean([r["mape"] for r in results])
+        avg_r2 = np.mean([r["r2"] for r in results])
+    else:
+        avg_mae = avg_mape = avg_r2 = np.nan
+
+    return {
+        "folds": results,
+        "n_folds": len(results),
+        "avg_mae": avg_mae,
+        "avg_mape": avg_mape,
+        "avg_r2": avg_r2,
+    }
+
+
+def _cv_on_matrix(X, spend, y, folds, spend_cols, warm_start=False, **mmm_kwargs):
+    """
+    Run CV folds on a prebuilt full-series feature matrix.
+
+    Adstock is causal and Fourier/control columns are row-wise, so the
+    first train_end rows of the full matrix are exactly the features a
+    model fitted on df.iloc[:train_end] would build. The test window is
+    predicted from a test-only frame in rolling_origin_cv, which restarts
+    adstock at the first test week, so its spend columns are rebuilt from
+    the raw spend to keep fold metrics identical.
+
+    X: full-series features (transformed spend columns first)
+    spend: raw spend matrix for spend_cols
+    folds: list of (fold_id, train_end, test_end)
+    warm_start: start each fold's solve from the previous fold's coefficients
+    """
+    results = []
+    coef = None
+    for fold, train_end, test_end in folds:
+        with span("cv.fold", fold=fold, train_weeks=train_end):
+            model = MMM(**mmm_kwargs)
+            model.spend_cols_ = spend_cols
+            model._fit_matrix(X[:train_end], y[:train_end], coef_init=coef)
+            if warm_start:
+                coef = model.model.coef_
+
+            X_test = X[train_end:test_end].copy()
+            X_test[:, : len(spend_cols)] = model._transform_spend_matrix(
+                spend[train_end:test_end]
+            )
+            preds = model._predict_matrix(X_test)
+            results.append(
+                _fold_result(fold, train_end, test_end, y[train_end:test_end], preds)
+            )
+
+    return results
+
+
+def _fold_task(task):
+    """Worker: run one CV fold against shared (or in-process) arrays."""
+    data, fold, spend_cols, mmm_kwargs = task
+    arrays = data if isinstance(data, dict) else attach_arrays(data)
+    return _cv_on_matrix(
+        arrays["X"], arrays["spend"], arrays["y"], [fold], spend_cols, **mmm_kwargs
+    )[0]
+
+
 def rolling_origin_cv(
     df,
     min_train_weeks=52,
     test_weeks=4,
     step=4,
     target_col="sales",
+    reuse_features=False,
+    warm_start=False,
+    n_jobs=1,
+    backend="process",
     **mmm_kwargs,
 ):
     """
@@ -29,53 +125,80 @@ def rolling_origin_cv(
         test_weeks: how many weeks to predict at each fold
         step: how far to roll forward between folds
         target_col: column to predict
+        reuse_features: build the feature matrix once on the full series
+            and slice it per fold instead of rebuilding it for every fold.
+            Fold metrics are the same as the default path.
+        warm_start: (needs reuse_features) start each fold's Elastic Net
+            from the previous fold's coefficients. Consecutive folds only
+            differ by step weeks, so this converges much faster; metrics
+            match the cold-start fit to within solver tolerance.
+        n_jobs: run folds concurrently on this many workers (-1 = all
+            cores). Implies reuse_features; the feature matrix goes to
+            process workers through shared memory. Folds come back in
+            order and match the serial result.
+        backend: "process" or "thread" pool for n_jobs > 1
         **mmm_kwargs: passed to MMM constructor
 
     Returns:
         dict with fold-level and aggregate metrics
     """
-    n = len(df)
-    results = []
+    if warm_start and not reuse_features:
+        raise ValueError("warm_start requires reuse_features=True")
 
-    fold = 0
-    train_end = min_train_weeks
+    with span("cv", rows=len(df), n_jobs=n_jobs):
+        return _rolling_origin_cv(
+            df, min_train_weeks, test_weeks, step, target_col,
+            reuse_features, warm_start, n_jobs, backend, mmm_kwargs,
+        )
 
-    while train_end + test_weeks <= n:
-        train_df = df.iloc[:train_end].copy()
-        test_df = df.iloc[train_end : train_end + test_weeks].copy()
 
-        # Fit on train, predict on test
+def _rolling_origin_cv(
+    df, min_train_weeks, test_weeks, step, target_col,
+    reuse_features, warm_start, n_jobs, backend, mmm_kwargs,
+):
+    bounds = _fold_bounds(len(df), min_train_weeks, test_weeks, step)
+    parallel = n_workers(n_jobs) > 1 and len(bounds) > 1
+    if warm_start and parallel:
+        raise ValueError("warm_start chains folds in order; use n_jobs=1")
+
+    if reuse_features or parallel:
         model = MMM(**mmm_kwargs)
-        model.fit(train_df, target_col=target_col)
-        preds = model.predict(test_df)
-        actuals = test_df[target_col].values
-
-        fold_result = {
-            "fold": fold,
-            "train_weeks": train_end,
-            "test_start": train_end,
-            "test_end": train_end + test_weeks,
-            "mae": mae(actuals, preds),
-            "mape": mape(actuals, preds),
-            "r2": r_squared(actuals, preds),
+        model.spend_cols_ = model._get_spend_cols(df)
+        arrays = {
+            "X": model._build_matrix(df),
+            "spend": df[model.spend_cols_].to_numpy(dtype=float),
+            "y": df[target_col].to_numpy(dtype=float),
         }
-        results.append(fold_result)
 
-        fold += 1
-        train_end += step
+        if not parallel:
+            results = _cv_on_matrix(
+                arrays["X"], arrays["spend"], arrays["y"], bounds,
+                model.spend_cols_, warm_start=warm_start, **mmm_kwargs,
+            )
+        elif backend == "thread":
+            tasks = [(arrays, fold, model.spend_cols_, mmm_kwargs) for fold in bounds]
+            results = parallel_map(_fold_task, tasks, n_jobs, backend="thread")
+        else:
+            with shared_arrays(arrays) as handle:
+                tasks = [
+                    (handle, fold, model.spend_cols_, mmm_kwargs) for fold in bounds
+                ]
+                results = parallel_map(_fold_task, tasks, n_jobs, backend=backend)
 
-    # Aggregate across folds
-    if results:
-        avg_mae = np.mean([r["mae"] for r in results])
-        avg_mape = np.mean([r["mape"] for r in results])
-        avg_r2 = np.mean([r["r2"] for r in results])
-    else:
-        avg_mae = avg_mape = avg_r2 = np.nan
+        return _summarize(results)
 
-    return {
-        "folds": results,
-        "n_folds": len(results),
-        "avg_mae": avg_mae,
-        "avg_mape": avg_mape,
-        "avg_r2": avg_r2,
-    }
+    results = []
+    for fold, train_end, test_end in bounds:
+        train_df = df.iloc[:train_end].copy()
+        test_df = df.iloc[train_end:test_end].copy()
+
+        # Fit on train, predict on test
+        with span("cv.fold", fold=fold, train_weeks=train_end):
+            model = MMM(**mmm_kwargs)
+            model.fit(train_df, target_col=target_col)
+            preds = model.predict(test_df)
+            actuals = test_df[target_col].values
+
+            results.append(_fold_result(fold, train_end, test_end, actuals, preds))
+
+    return _summarize(results)
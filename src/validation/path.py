@@ -0,0 +1,205 @@
+"""
+Regularization path: choose alpha (and l1_ratio) for MMM in one pass.
+
+Instead of calling fit() once per alpha, the feature matrix is built once
+and the Elastic Net is solved along a whole descending alpha grid with
+sklearn's enet_path, each solve warm-started from the previous one. Every
+rolling-origin fold does this on its own training rows, so picking alpha
+by CV error costs about as much as a few ordinary fits.
+
+The coefficient path on the full series comes back too, for checking how
+stable each channel's coefficient is as the penalty changes.
+"""
+
+import numpy as np
+from src.model import MMM
+from src.utils import parallel_map
+from src.utils.profiling import span
+from src.validation.cv import _fold_bounds
+from src.validation.metrics import mae, mape, r_squared
+from src.validation.search import SCORING, _check_scoring
+
+METRICS = {"mae": mae, "mape": mape, "r2": r_squared}
+
+
+def _scaled(X, y):
+    """
+    Standardize X like MMM._fit_matrix and center both X and y, since
+    enet_path has no intercept. Returns (scaler, Xc, yc, X_offset, y_offset).
+    """
+    from sklearn.preprocessing import StandardScaler
+
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+    X_offset = X_scaled.mean(axis=0)
+    y_offset = y.mean()
+    return scaler, X_scaled - X_offset, y - y_offset, X_offset, y_offset
+
+
+def alpha_grid(X, y, l1_ratio, n_alphas=50, eps=1e-3):
+    """
+    Descending alphas from the smallest one that zeroes every coefficient
+    down to eps times that, log-spaced (same grid ElasticNetCV uses).
+    """
+    if l1_ratio <= 0:
+        raise ValueError("l1_ratio must be > 0 for an automatic alpha grid")
+    _, Xc, yc, _, _ = _scaled(np.asarray(X, dtype=float), np.asarray(y, dtype=float))
+    alpha_max = np.abs(Xc.T @ yc).max() / (len(yc) * l1_ratio)
+    if alpha_max == 0:
+        alpha_max = np.finfo(float).resolution
+    return np.geomspace(alpha_max, alpha_max * eps, n_alphas)
+
+
+def _solve_path(X, y, l1_ratio, alphas):
+    """
+    Coefficients (scaled space) for every alpha, warm-started along the
+    path. Returns (scaler, coefs as features x alphas, intercepts).
+    """
+    from sklearn.linear_model import enet_path
+
+    scaler, Xc, yc, X_offset, y_offset = _scaled(X, y)
+    # enet_path solves alphas in the order given; descending keeps each
+    # warm start close to the next solution
+    order = np.argsort(alphas)[::-1]
+    # Gram matrix is shared by every alpha; inputs are already clean arrays
+    # so sklearn's per-alpha validation is skipped
+    Xc = np.asfortranarray(Xc)
+    _, coefs, _ = enet_path(
+        Xc, yc, l1_ratio=l1_ratio, alphas=alphas[order], max_iter=10000,
+        precompute=Xc.T @ Xc, Xy=Xc.T @ yc, check_input=False,
+    )
+    out = np.empty_like(coefs)
+    out[:, order] = coefs
+    return scaler, out, y_offset - X_offset @ out
+
+
+def _fold_task(task):
+    """Worker: CV error of every (l1_ratio, alpha) on one fold."""
+    X, spend, y, (fold, train_end, test_end), l1_ratios, alphas, scoring, \
+        template = task
+
+    with span("path.fold", fold=fold, train_weeks=train_end):
+        # the test window restarts adstock, like rolling_origin_cv
+        X_test = X[train_end:test_end].copy()
+        n_spend = len(template.spend_cols_)
+        X_test[:, :n_spend] = template._transform_spend_matrix(
+            spend[train_end:test_end]
+        )
+        actuals = y[train_end:test_end]
+
+        scores = np.empty((len(l1_ratios), alphas.shape[1]))
+        for i, l1_ratio in enumerate(l1_ratios):
+            scaler, coefs, intercepts = _solve_path(
+                X[:train_end], y[:train_end], l1_ratio, alphas[i]
+            )
+            X_scaled = (X_test - scaler.mean_) / scaler.scale_
+            preds = X_scaled @ coefs + intercepts
+            scores[i] = [
+                METRICS[scoring](actuals, preds[:, k]) for k in range(preds.shape[1])
+            ]
+    return scores
+
+
+def regularization_path(
+    df,
+    l1_ratios=(0.1, 0.5, 0.9),
+    n_alphas=50,
+    alphas=None,
+    eps=1e-3,
+    scoring="mae",
+    min_train_weeks=52,
+    test_weeks=4,
+    step=4,
+    target_col="sales",
+    n_jobs=1,
+    **mmm_kwargs,
+):
+    """
+    Pick alpha and l1_ratio by rolling-origin CV over full Elastic Net paths.
+
+    Arguments:
+        df: DataFrame with week column and spend/sales data
+        l1_ratios: mixing values to try; each gets its own alpha path
+        n_alphas, eps: size and depth of the automatic alpha grid (see
+            alpha_grid), computed from the full series per l1_ratio
+        alphas: explicit alphas to use for every l1_ratio instead
+        scoring: "mae", "mape" or "r2" (averaged across folds)
+        min_train_weeks, test_weeks, step, target_col: as rolling_origin_cv
+        n_jobs: run folds on this many worker processes (-1 = all cores)
+        **mmm_kwargs: the other MMM settings (not alpha / l1_ratio)
+
+    Returns:
+        dict with
+        - best_alpha, best_l1_ratio, best_score, scoring
+        - model: MMM fitted on df with the best alpha / l1_ratio
+        - l1_ratios (L,), alphas (L x A), scores (L x A, mean over folds)
+          and fold_scores (folds x L x A)
+        - feature_names and coef_path (L x features x A): full-series
+          coefficients (scaled, like get_coefficients) along each path
+        - coefficients: coef_path as a long DataFrame (l1_ratio, alpha,
+          feature, coef), handy for stability plots
+    """
+    import pandas as pd
+
+    _check_scoring(scoring)
+    fixed = {"alpha", "l1_ratio"} & set(mmm_kwargs)
+    if fixed:
+        raise ValueError(f"{sorted(fixed)} are chosen by the path; don't pass them")
+
+    with span("path", rows=len(df), n_jobs=n_jobs):
+        template = MMM(**mmm_kwargs)
+        template.spend_cols_ = template._get_spend_cols(df)
+        X = np.array(template._build_matrix(df))
+        spend = df[template.spend_cols_].to_numpy(dtype=float)
+        y = df[target_col].to_numpy(dtype=float)
+
+        l1_ratios = np.atleast_1d(np.asarray(l1_ratios, dtype=float))
+        if alphas is None:
+            alphas = np.array([alpha_grid(X, y, r, n_alphas, eps) for r in l1_ratios])
+        else:
+            alphas = np.tile(np.asarray(alphas, dtype=float), (len(l1_ratios), 1))
+
+        folds = _fold_bounds(len(df), min_train_weeks, test_weeks, step)
+        if not folds:
+            raise ValueError("Not enough rows for one fold; lower min_train_weeks")
+        tasks = [
+            (X, spend, y, fold, l1_ratios, alphas, scoring, template)
+            for fold in folds
+        ]
+        fold_scores = np.array(parallel_map(_fold_task, tasks, n_jobs))
+        scores = fold_scores.mean(axis=0)
+
+        # NaN scores lose; higher is better only for r2
+        ranked = np.where(np.isnan(scores), np.inf,
+                          -scores if SCORING[scoring] else scores)
+        i, k = np.unravel_index(np.argmin(ranked), scores.shape)
+
+        coef_path = np.array(
+            [_solve_path(X, y, r, a)[1] for r, a in zip(l1_ratios, alphas)]
+        )
+        model = MMM(alpha=alphas[i, k], l1_ratio=l1_ratios[i], **mmm_kwargs)
+        model.fit(df, target_col=target_col)
+
+    names = model.feature_names_
+    L, F, A = coef_path.shape
+    coefficients = pd.DataFrame({
+        "l1_ratio": np.repeat(l1_ratios, F * A),
+        "alpha": np.repeat(alphas, F, axis=0).ravel(),
+        "feature": np.tile(np.repeat(names, A), L),
+        "coef": coef_path.ravel(),
+    })
+
+    return {
+        "best_alpha": float(alphas[i, k]),
+        "best_l1_ratio": float(l1_ratios[i]),
+        "best_score": scores[i, k],
+        "scoring": scoring,
+        "model": model,
+        "l1_ratios": l1_ratios,
+        "alphas": alphas,
+        "scores": scores,
+        "fold_scores": fold_scores,
+        "feature_names": names,
+        "coef_path": coef_path,
+        "coefficients": coefficients,
+    }
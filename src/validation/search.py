@@ -0,0 +1,362 @@
+"""
+Hyperparameter search for MMM, scored with rolling-origin CV.
+
+Searches decay_rates, saturation_method, saturation_params, alpha and l1_ratio:
+- grid_search: every combination
+- random_search: a random sample of combinations
+- successive_halving: score everything on a few folds, keep the best
+  1/factor, repeat with more folds
+
+Transformed spend is computed once per (channel, decay, curve) and shared
+by every candidate. Candidates that end up with the same feature matrix
+are scored together in one task, so each matrix is only sent to a worker
+process once.
+"""
+
+import itertools
+import math
+
+import numpy as np
+from src.model import MMM
+from src.transforms import saturation
+from src.transforms.saturation import SATURATION_PARAMS
+from src.utils import parallel_map
+from src.validation.cv import _cv_on_matrix, _fold_bounds, _summarize
+
+SEARCH_PARAMS = (
+    "decay_rates", "saturation_method", "saturation_params", "alpha", "l1_ratio"
+)
+
+# metric -> whether higher is better
+SCORING = {"mae": False, "mape": False, "r2": True}
+
+
+class _FeatureCache:
+    """
+    Full-series feature matrices for candidate settings.
+
+    Fourier and control columns don't depend on the searched params, so
+    they're built once. Each transformed spend column is cached under
+    (channel, decay, method, curve params) the first time a candidate
+    needs it. Kernel adstock specs (dicts) are keyed as sorted item tuples.
+    """
+
+    def __init__(self, df, **mmm_kwargs):
+        template = MMM(**mmm_kwargs)
+        template.spend_cols_ = template._get_spend_cols(df)
+        # spend columns are filled in per candidate; only the rest is kept
+        n_spend = len(template.spend_cols_)
+        features = template._assemble(df, np.zeros((len(df), n_spend)))
+
+        self.spend_cols = template.spend_cols_
+        self.channels = [c.replace("spend_", "") for c in self.spend_cols]
+        self.spend = df[template.spend_cols_].to_numpy(dtype=float)
+        self.base = features[:, len(self.channels):]
+        self.columns = {}
+
+    def decays_for(self, decay_rates):
+        """Per-channel decay tuple from a dict (missing -> 0.5) or one float."""
+        if isinstance(decay_rates, dict) or decay_rates is None:
+            decay_rates = decay_rates or {}
+            return tuple(_decay_key(decay_rates.get(ch, 0.5)) for ch in self.channels)
+        return tuple(_decay_key(decay_rates) for _ in self.channels)
+
+    def decay_rates(self, decays):
+        """decays_for() output back to a decay_rates dict."""
+        return {
+            ch: dict(decay) if isinstance(decay, tuple) else decay
+            for ch, decay in zip(self.channels, decays)
+        }
+
+    def curves_for(self, method, saturation_params):
+        """
+        Per-channel ((param, value), ...) tuples, resolved like MMM does.
+        Params that belong to other methods are dropped, so one search can
+        mix e.g. "sqrt" and "hill" candidates under the same params.
+        """
+        other = {
+            name for m, names in SATURATION_PARAMS.items() if m != method
+            for name in names
+        } - set(SATURATION_PARAMS.get(method, ()))
+        saturation_params = {
+            name: value for name, value in (saturation_params or {}).items()
+            if name not in other
+        }
+        model = MMM(saturation_method=method, saturation_params=saturation_params)
+        model.spend_cols_ = self.spend_cols
+        kwargs = model._saturation_kwargs()
+        return tuple(
+            tuple((name, float(kwargs[name][j])) for name in sorted(kwargs))
+            for j in range(len(self.channels))
+        )
+
+    def curve_params(self, curves):
+        """curves_for() output back to a saturation_params dict."""
+        params = {}
+        for channel, curve in zip(self.channels, curves):
+            for name, value in curve:
+                params.setdefault(name, {})[channel] = value
+        return params
+
+    def matrix(self, decays, method, curves):
+        keys = [
+            (ch, decay, method, curve)
+            for ch, decay, curve in zip(self.channels, decays, curves)
+        ]
+        missing = [j for j, key in enumerate(keys) if key not in self.columns]
+
+        if missing:
+            # MMM._adstock handles geometric and kernel channels alike
+            template = MMM(decay_rates=self.decay_rates(decays))
+            template.spend_cols_ = [self.spend_cols[j] for j in missing]
+            adstocked = template._adstock(self.spend[:, missing])
+            params = self.curve_params([curves[j] for j in missing])
+            saturated = saturation(
+                adstocked, method, **{
+                    name: [values[self.channels[j]] for j in missing]
+                    for name, values in params.items()
+                }
+            )
+            for k, j in enumerate(missing):
+                self.columns[keys[j]] = saturated[:, k]
+
+        spend_block = np.column_stack([self.columns[key] for key in keys])
+        return np.hstack([spend_block, self.base])
+
+
+def _decay_key(rate):
+    """Hashable form of a decay rate or kernel spec dict."""
+    if isinstance(rate, dict):
+        return tuple(sorted(rate.items()))
+    return float(rate)
+
+
+def _check_params(params):
+    unknown = set(params) - set(SEARCH_PARAMS)
+    if unknown:
+        raise ValueError(
+            f"Can't search {sorted(unknown)}. Searchable: {list(SEARCH_PARAMS)}"
+        )
+
+
+def _check_scoring(scoring):
+    if scoring not in SCORING:
+        raise ValueError(f"Unknown scoring: {scoring}. Use one of {list(SCORING)}.")
+
+
+def _expand_grid(param_grid):
+    _check_params(param_grid)
+    names = list(param_grid)
+    return [
+        dict(zip(names, values))
+        for values in itertools.product(*(param_grid[name] for name in names))
+    ]
+
+
+def _sample(values, rng):
+    """Draw one value from a list or a scipy.stats-style distribution."""
+    if hasattr(values, "rvs"):
+        return values.rvs(random_state=rng)
+    return values[rng.integers(len(values))]
+
+
+def _score_task(task):
+    """Worker: score several (alpha, l1_ratio) settings on one feature matrix."""
+    X, spend, y, folds, spend_cols, fit_kwargs = task
+    return [
+        _cv_on_matrix(X, spend, y, folds, spend_cols, **kwargs)
+        for kwargs in fit_kwargs
+    ]
+
+
+def _score_candidates(cache, y, candidates, folds, defaults, n_jobs):
+    """Score each candidate on the given folds; one result dict per candidate."""
+    groups = {}
+    for i, params in enumerate(candidates):
+        decays = cache.decays_for(params.get("decay_rates", defaults.decay_rates))
+        method = params.get("saturation_method", defaults.saturation_method)
+        curves = cache.curves_for(
+            method, params.get("saturation_params", defaults.saturation_params)
+        )
+        groups.setdefault((decays, method, curves), []).append(i)
+
+    tasks = []
+    for (decays, method, curves), idx in groups.items():
+        fit_kwargs = [
+            {
+                "decay_rates": cache.decay_rates(decays),
+                "saturation_method": method,
+                "saturation_params": cache.curve_params(curves),
+                "alpha": candidates[i].get("alpha", defaults.alpha),
+                "l1_ratio": candidates[i].get("l1_ratio", defaults.l1_ratio),
+            }
+            for i in idx
+        ]
+        X = cache.matrix(decays, method, curves)
+        tasks.append((X, cache.spend, y, folds, cache.spend_cols, fit_kwargs))
+
+    results = [None] * len(candidates)
+    scored = parallel_map(_score_task, tasks, n_jobs)
+    for idx, fold_results in zip(groups.values(), scored):
+        for i, folds_i in zip(idx, fold_results):
+            results[i] = {"params": candidates[i], **_summarize(folds_i)}
+
+    return results
+
+
+def _rank(results, scoring):
+    key = f"avg_{scoring}"
+    sign = -1 if SCORING[scoring] else 1
+    # NaN scores (e.g. no folds) go last
+    return sorted(
+        results,
+        key=lambda r: (np.isnan(r[key]), sign * np.nan_to_num(r[key])),
+    )
+
+
+def _search(df, candidates, scoring, n_jobs, min_train_weeks, test_weeks, step,
+            target_col, mmm_kwargs):
+    _check_scoring(scoring)
+    cache = _FeatureCache(df, **mmm_kwargs)
+    y = df[target_col].to_numpy(dtype=float)
+    folds = _fold_bounds(len(df), min_train_weeks, test_weeks, step)
+
+    results = _score_candidates(
+        cache, y, candidates, folds, MMM(**mmm_kwargs), n_jobs
+    )
+    return _report(_rank(results, scoring), scoring)
+
+
+def _report(ranked, scoring):
+    return {
+        "best_params": ranked[0]["params"] if ranked else None,
+        "best_score": ranked[0][f"avg_{scoring}"] if ranked else np.nan,
+        "scoring": scoring,
+        "results": ranked,
+    }
+
+
+def grid_search(
+    df,
+    param_grid,
+    scoring="mae",
+    n_jobs=1,
+    min_train_weeks=52,
+    test_weeks=4,
+    step=4,
+    target_col="sales",
+    **mmm_kwargs,
+):
+    """
+    Score every combination in param_grid with rolling-origin CV.
+
+    Arguments:
+        df: DataFrame with week column and spend/sales data
+        param_grid: dict of MMM param -> list of values to try. Keys can be
+            decay_rates, saturation_method, saturation_params, alpha,
+            l1_ratio. A decay_rates value is either a channel -> decay dict
+            or one decay for all.
+            e.g. {"decay_rates": [0.3, 0.5, 0.7], "alpha": [0.1, 1.0]}
+        scoring: "mae", "mape" or "r2" (averaged across folds)
+        n_jobs: worker processes (1 = serial, -1 = all cores)
+        min_train_weeks, test_weeks, step, target_col: as rolling_origin_cv
+        **mmm_kwargs: fixed MMM settings for params not being searched
+
+    Returns:
+        dict with best_params, best_score and results (best first; each
+        has params plus the usual rolling_origin_cv output)
+    """
+    return _search(
+        df, _expand_grid(param_grid), scoring, n_jobs,
+        min_train_weeks, test_weeks, step, target_col, mmm_kwargs,
+    )
+
+
+def random_search(
+    df,
+    param_distributions,
+    n_iter=20,
+    seed=42,
+    scoring="mae",
+    n_jobs=1,
+    min_train_weeks=52,
+    test_weeks=4,
+    step=4,
+    target_col="sales",
+    **mmm_kwargs,
+):
+    """
+    Score n_iter random draws from param_distributions.
+
+    param_distributions: dict of MMM param -> list of values (picked
+        uniformly) or a scipy.stats distribution (anything with .rvs)
+
+    Other arguments and the return value match grid_search.
+    """
+    _check_params(param_distributions)
+    rng = np.random.default_rng(seed)
+    candidates = [
+        {name: _sample(values, rng) for name, values in param_distributions.items()}
+        for _ in range(n_iter)
+    ]
+    return _search(
+        df, candidates, scoring, n_jobs,
+        min_train_weeks, test_weeks, step, target_col, mmm_kwargs,
+    )
+
+
+def successive_halving(
+    df,
+    param_grid,
+    factor=3,
+    scoring="mae",
+    n_jobs=1,
+    min_train_weeks=52,
+    test_weeks=4,
+    step=4,
+    target_col="sales",
+    **mmm_kwargs,
+):
+    """
+    Grid search that spends fewer CV folds on bad candidates.
+
+    Round 1 scores every combination on the most recent few folds; each
+    round keeps the best 1/factor of candidates and multiplies the number
+    of folds by factor. The last round uses all folds.
+
+    Results carry a "round" key: the last round each candidate reached.
+    Survivors of the final round come first, then earlier eliminations.
+    Other arguments and the return value match grid_search.
+    """
+    _check_scoring(scoring)
+    if factor < 2:
+        raise ValueError("factor must be at least 2")
+
+    candidates = _expand_grid(param_grid)
+    cache = _FeatureCache(df, **mmm_kwargs)
+    defaults = MMM(**mmm_kwargs)
+    y = df[target_col].to_numpy(dtype=float)
+    folds = _fold_bounds(len(df), min_train_weeks, test_weeks, step)
+
+    n_rounds = max(1, math.ceil(math.log(max(len(candidates), 1), factor)))
+    n_folds = max(1, len(folds) // factor ** (n_rounds - 1))
+
+    eliminated = []
+    for round_ in range(n_rounds):
+        last = round_ == n_rounds - 1
+        use = folds if last else folds[-n_folds:]
+
+        scored = _score_candidates(cache, y, candidates, use, defaults, n_jobs)
+        for r in scored:
+            r["round"] = round_
+        ranked = _rank(scored, scoring)
+
+        if last:
+            break
+
+        keep = max(1, math.ceil(len(ranked) / factor))
+        eliminated = ranked[keep:] + eliminated
+        candidates = [r["params"] for r in ranked[:keep]]
+        n_folds = min(len(folds), n_folds * factor)
+
+    return _report(ranked + eliminated, scoring)
@@ -1,4 +1,31 @@
-from src.viz.export_data import export_decomposition
-from src.viz.roas_chart import plot_roas
+# Submodules are imported on first attribute access so `import src.viz`
+# (or anything that imports it) doesn't pull in matplotlib up front.
+import importlib
 
-__all__ = ["export_decomposition", "plot_roas"]
+_EXPORTS = {
+    "export_decomposition": "src.viz.export_data",
+    "export_models": "src.viz.export_data",
+    "plot_contribution": "src.viz.charts",
+    "plot_roas": "src.viz.roas_chart",
+    "render_charts": "src.viz.charts",
+}
+
+__all__ = [
+    "export_decomposition",
+    "export_models",
+    "plot_contribution",
+    "plot_roas",
+    "render_charts",
+]
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,271 @@
+"""
+ROAS and contribution-over-time charts, rendered in bulk.
+
+Charts are drawn on matplotlib Figure objects with an Agg canvas (no
+pyplot, so no GUI backend or global figure state is involved). Each
+process keeps one figure per chart type as a template: axes, labels and
+styling are set up once, and each render only swaps the data artists
+before saving. render_charts spreads titles across a process pool:
+
+    tables = {name: export_tables(model, df) for name, (model, df) in ...}
+    render_charts(tables, "reports/figures", n_jobs=-1)
+"""
+
+import math
+import os
+
+import numpy as np
+from src.utils import parallel_imap
+from src.utils.parallel import n_workers
+
+# Brand palette
+CHANNEL_COLORS = {
+    "google": "#5555F2",  # Blurple
+    "meta": "#8A57F0",    # Purple
+    "tiktok": "#F55B53",  # Red
+    "reddit": "#F5CF22",  # Yellow
+    "x": "#2FF579",       # Green
+    "twitch": "#46F2FB",  # Cyan
+}
+# for channels outside the brand palette
+FALLBACK_COLORS = ["#6B7280", "#F59E0B", "#10B981", "#EC4899", "#3B82F6", "#8B5CF6"]
+
+CHARTS = {
+    "roas": "roas_by_channel",
+    "contribution": "channel_contribution",
+}
+DPI = 150
+# zlib level for PNGs: 1 encodes several times faster than Pillow's
+# default 6 for a slightly larger file (flat-colour charts compress well)
+PNG_COMPRESS_LEVEL = 1
+
+
+def _colors(channels):
+    extra = iter(FALLBACK_COLORS * (len(channels) // len(FALLBACK_COLORS) + 1))
+    return [CHANNEL_COLORS.get(ch) or next(extra) for ch in channels]
+
+
+class _Template:
+    """One reusable figure: static styling in __init__, data in draw()."""
+
+    figsize = (8, 5)
+
+    def __init__(self, dpi):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        self.fig = Figure(figsize=self.figsize, dpi=dpi)
+        FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_subplot()
+        self.ax.spines["top"].set_visible(False)
+        self.ax.spines["right"].set_visible(False)
+        self.artists = []
+        self.setup()
+
+    def setup(self):
+        pass
+
+    def render(self, data, path, title=None):
+        for artist in self.artists:
+            artist.remove()
+        self.artists = []
+        self.draw(data, title)
+        kwargs = {}
+        if str(path).endswith(".png"):
+            kwargs["pil_kwargs"] = {"compress_level": PNG_COMPRESS_LEVEL}
+        self.fig.savefig(path, **kwargs)
+
+
+class RoasTemplate(_Template):
+    def setup(self):
+        ax = self.ax
+        ax.set_xlabel(r"ROAS (\$ return per \$ spent)")
+        ax.axvline(x=0, color="#D1D5DB", linewidth=0.5)
+        self.fig.subplots_adjust(left=0.15, right=0.93, top=0.9, bottom=0.12)
+
+    def draw(self, roas, title=None):
+        ax = self.ax
+        # ascending for horizontal bars, so the best channel is on top
+        roas = roas.sort_values("roas", ascending=True)
+        channels = roas["channel"].astype(str).tolist()
+        values = roas["roas"].to_numpy(dtype=float)
+        y = np.arange(len(values))
+
+        bars = ax.barh(y, values, color=_colors(channels), edgecolor="white")
+        self.artists.extend(bars.patches)
+        ax.set_yticks(y, channels)
+        ax.set_title(
+            "Return on Ad Spend by Channel" + (f": {title}" if title else ""),
+            fontweight="bold",
+        )
+
+        # Add value labels
+        for bar, val in zip(bars, values):
+            self.artists.append(ax.text(
+                val + 0.01 if val >= 0 else val - 0.01,
+                bar.get_y() + bar.get_height() / 2,
+                f"{val:.2f}",
+                va="center",
+                ha="left" if val >= 0 else "right",
+                fontsize=9,
+            ))
+
+        # room for the labels past the longest bar
+        low, high = min(values.min(initial=0), 0), max(values.max(initial=0), 0)
+        pad = 0.15 * (high - low or 1)
+        ax.set_xlim(low - (pad if low < 0 else 0), high + pad)
+        ax.set_ylim(-0.6, len(values) - 0.4)
+
+
+class ContributionTemplate(_Template):
+    figsize = (10, 6)
+
+    def setup(self):
+        ax = self.ax
+        ax.set_ylabel("Sales Contribution ($)")
+        self.fig.subplots_adjust(left=0.1, right=0.97, top=0.9, bottom=0.22)
+
+    def draw(self, data, title=None):
+        decomp, time_col, channels = data
+        ax = self.ax
+        t = (
+            decomp[time_col].to_numpy() if time_col in decomp.columns
+            else np.arange(len(decomp))
+        )
+        # biggest channel at the bottom of the stack
+        channels = sorted(channels, key=lambda ch: -decomp[ch].sum())
+        values = decomp[channels].to_numpy(dtype=float).T
+
+        if len(channels):
+            polys = ax.stackplot(
+                t, values, labels=channels, colors=_colors(channels), alpha=0.8
+            )
+            self.artists.extend(polys)
+            self.artists.append(ax.legend(
+                loc="upper center", bbox_to_anchor=(0.5, -0.12),
+                ncol=min(len(channels), 6), frameon=False,
+            ))
+            stacked = np.cumsum(values, axis=0)
+            ax.set_ylim(min(stacked.min(), 0), max(stacked.max(), 0) * 1.05 or 1)
+        if len(t) > 1:
+            ax.set_xlim(t[0], t[-1])
+        ax.set_xlabel(time_col.capitalize())
+        ax.set_title(
+            "Channel Contribution Over Time" + (f": {title}" if title else ""),
+            fontweight="bold",
+        )
+
+
+TEMPLATES = {"roas": RoasTemplate, "contribution": ContributionTemplate}
+
+# (pid, chart, dpi) -> template. Keyed by pid so a forked worker builds
+# its own figures instead of drawing on copies of the parent's.
+_templates = {}
+
+
+def _template(chart, dpi=DPI):
+    key = (os.getpid(), chart, dpi)
+    if key not in _templates:
+        _templates[key] = TEMPLATES[chart](dpi)
+    return _templates[key]
+
+
+def _channels(decomp):
+    """Channel columns of a decompose_sales frame (between base and seasonality)."""
+    columns = list(decomp.columns)
+    if "base" in columns and "seasonality" in columns:
+        return columns[columns.index("base") + 1:columns.index("seasonality")]
+    return [c for c in CHANNEL_COLORS if c in columns]
+
+
+def plot_roas_table(roas, path, title=None, dpi=DPI):
+    """ROAS bar chart for a roas_summary frame, saved to path."""
+    _template("roas", dpi).render(roas, path, title)
+    return path
+
+
+def plot_contribution(decomp, path, time_col="week", title=None, dpi=DPI):
+    """Stacked channel contribution over time for a decompose_sales frame."""
+    _template("contribution", dpi).render(
+        (decomp, time_col, _channels(decomp)), path, title
+    )
+    return path
+
+
+def _render_task(task):
+    """Worker: render every chart for a batch of titles; returns their files."""
+    items, output_dir, charts, dpi, fmt = task
+    out = []
+    for name, tables in items:
+        if not isinstance(tables, dict):
+            tables = _load_tables(*tables)
+        folder = os.path.join(output_dir, name)
+        os.makedirs(folder, exist_ok=True)
+
+        files = []
+        for chart in charts:
+            path = os.path.join(folder, f"{CHARTS[chart]}.{fmt}")
+            if chart == "roas":
+                plot_roas_table(tables["roas"], path, name, dpi)
+            else:
+                plot_contribution(
+                    tables["decomposition"], path,
+                    tables.get("time_col", "week"), name, dpi,
+                )
+            files.append(path)
+        out.append((name, files))
+    return out
+
+
+def _load_tables(model, data):
+    """export_tables for a (model or artifact path, data or data path) pair."""
+    from src.viz.export_data import _read_data, export_tables
+
+    if isinstance(model, (str, os.PathLike)):
+        from src.model import load_model
+
+        model = load_model(model)
+    df = _read_data(data) if isinstance(data, (str, os.PathLike)) else data
+    return export_tables(model, df)
+
+
+def render_charts(
+    results,
+    output_dir="reports/figures",
+    charts=("roas", "contribution"),
+    n_jobs=1,
+    dpi=DPI,
+    fmt="png",
+    batch_size=None,
+):
+    """
+    Render charts for many titles straight from in-memory results.
+
+    results: dict name -> tables, either export_data.export_tables output
+        ({"decomposition", "roas"} frames and "time_col", default "week"),
+        or a (model, data) pair (objects or paths) to compute them from
+        in the worker
+    output_dir: charts go to output_dir/<name>/<chart>.<fmt>
+    charts: any of "roas", "contribution"
+    n_jobs: worker processes (-1 = all cores)
+    batch_size: titles per task (default: spread over ~4 tasks per worker,
+        so each worker reuses its figure templates across many titles)
+
+    Returns dict name -> list of files written.
+    """
+    unknown = set(charts) - set(CHARTS)
+    if unknown:
+        raise ValueError(f"Unknown charts {sorted(unknown)}. Use {list(CHARTS)}.")
+
+    items = list(results.items())
+    workers = n_workers(n_jobs)
+    batch_size = batch_size or max(1, math.ceil(len(items) / (4 * workers)))
+    tasks = (
+        (items[i:i + batch_size], output_dir, tuple(charts), dpi, fmt)
+        for i in range(0, len(items), batch_size)
+    )
+
+    files = {}
+    for batch in parallel_imap(_render_task, tasks, n_jobs):
+        files.update(batch)
+    return files
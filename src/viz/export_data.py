@@ -1,31 +1,237 @@
+"""
+Export decomposition and ROAS tables for reporting.
+
+export_models writes both tables for any number of fitted models (or
+save_model artifacts) as CSV, Parquet and/or Arrow. A manifest in the
+output directory records a key for each model's inputs (data contents +
+fitted model), so re-running a nightly export only recomputes the models
+whose inputs changed:
+
+    export_models({"title_a": ("models/a.mmm", "data/a.csv"), ...},
+                  output_dir="reports/exports", formats=("csv", "parquet"))
+
+export_decomposition is the original single-model export used by the R
+chart (data/decomposition.csv + data/roas_summary.csv).
+"""
+
+import hashlib
+import json
 import os
+
+import numpy as np
 import pandas as pd
-from src.data.generate import generate_weekly_data
-from src.model import MMM
-from src.insights import decompose_sales, roas_summary
+from src.utils import parallel_imap
+from src.utils.hashing import frame_fingerprint
 
+FORMATS = {"csv": ".csv", "parquet": ".parquet", "arrow": ".arrow"}
+TABLES = ("decomposition", "roas")
+MANIFEST = "manifest.json"
+# bump when the exported tables change shape, so old outputs get rewritten
+EXPORT_VERSION = 1
 
-def export_decomposition(output_dir="data"):
-    os.makedirs(output_dir, exist_ok=True)
 
-    # Generate data and fit model
-    df = generate_weekly_data(n_weeks=104, seed=42)
-    model = MMM()
-    model.fit(df)
+def export_tables(model, df):
+    """
+    {"decomposition": ..., "roas": ..., "time_col": ...} for one model.
+    Channel columns come from the model; the decomposition starts with the
+    time column, named by time_col (e.g. for charts.render_charts).
+    """
+    from src.insights import decompose_sales, roas_summary
 
-    # Get decomposition
     decomp = decompose_sales(model, df)
-    decomp["week"] = df["week"].values
+    if model.time_col in df.columns:
+        decomp.insert(0, model.time_col, df[model.time_col].to_numpy())
+    return {
+        "decomposition": decomp,
+        "roas": roas_summary(model, df),
+        "time_col": model.time_col,
+    }
+
+
+def write_table(df, path, fmt="csv"):
+    """Write one table as csv, parquet or arrow (the last two need pyarrow)."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format: {fmt}. Use one of {list(FORMATS)}.")
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+        return
+
+    try:
+        import pyarrow as pa
+        import pyarrow.feather as feather
+    except ImportError as e:
+        raise ImportError(f"{fmt} output needs pyarrow: pip install pyarrow") from e
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, path)
+    else:
+        feather.write_feather(table, path)
+
+
+def _file_hash(path):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _model_fingerprint(model):
+    """Hash of a fitted model's params, columns and coefficients."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(json.dumps(model.get_params(), sort_keys=True, default=str).encode())
+    h.update(json.dumps([model.spend_cols_, model.feature_names_]).encode())
+    for values in (
+        model.model.coef_, model.model.intercept_,
+        model.scaler.mean_, model.scaler.scale_,
+    ):
+        h.update(np.ascontiguousarray(values, dtype=float).view(np.uint8))
+    return h.hexdigest()
+
+
+def _input_key(model, data):
+    """
+    Key for one job's inputs. Paths are hashed from their bytes, so
+    skipping an unchanged job never loads the model or parses the data.
+    """
+    model_key = (
+        _file_hash(model) if isinstance(model, (str, os.PathLike))
+        else _model_fingerprint(model)
+    )
+    data_key = (
+        _file_hash(data) if isinstance(data, (str, os.PathLike))
+        else frame_fingerprint(data)
+    )
+    return f"{EXPORT_VERSION}:{model_key}:{data_key}"
+
+
+def _read_data(path):
+    path = str(path)
+    if path.endswith((".parquet", ".pq")):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def _export_job(task):
+    """Worker: load (if needed), compute and write one model's tables."""
+    model, data, paths = task
+    if isinstance(model, (str, os.PathLike)):
+        from src.model import load_model
+
+        model = load_model(model)
+    df = _read_data(data) if isinstance(data, (str, os.PathLike)) else data
+
+    tables = export_tables(model, df)
+    for (table, fmt), path in paths.items():
+        write_table(tables[table], path, fmt)
+    return sorted(paths.values())
+
+
+def _load_manifest(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_manifest(path, manifest):
+    # write-then-rename so an interrupted run never leaves a torn manifest
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def export_models(
+    jobs, output_dir="reports/exports", formats=("csv",), force=False, n_jobs=1
+):
+    """
+    Export decomposition and ROAS for many models, skipping unchanged ones.
+
+    jobs: dict name -> (model, data). model is a fitted MMM or a
+        save_model path; data a DataFrame or a CSV / Parquet path
+    output_dir: tables go to output_dir/<name>/<table>.<ext>, with the
+        manifest at output_dir/manifest.json
+    formats: any of "csv", "parquet", "arrow"
+    force: rewrite everything regardless of the manifest
+    n_jobs: export changed models on this many worker processes
+
+    A job is skipped when its input key matches the manifest and all its
+    output files exist. Returns dict name -> {"status": "written" or
+    "skipped", "files": [...]}.
+    """
+    for fmt in formats:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format: {fmt}. Use one of {list(FORMATS)}.")
+
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST)
+    manifest = _load_manifest(manifest_path)
+
+    results, stale = {}, []
+    for name, (model, data) in jobs.items():
+        paths = {
+            (table, fmt): os.path.join(output_dir, name, table + FORMATS[fmt])
+            for table in TABLES
+            for fmt in formats
+        }
+        key = _input_key(model, data)
+        entry = manifest.get(name, {})
+        if (
+            not force
+            and entry.get("key") == key
+            and all(os.path.exists(p) for p in paths.values())
+        ):
+            results[name] = {"status": "skipped", "files": sorted(paths.values())}
+            continue
+
+        os.makedirs(os.path.join(output_dir, name), exist_ok=True)
+        stale.append((name, key, (model, data, paths)))
+
+    # the manifest is saved even if a later job fails, so finished models
+    # aren't redone on the next run
+    written = parallel_imap(_export_job, (task for _, _, task in stale), n_jobs)
+    try:
+        for (name, key, _), files in zip(stale, written):
+            results[name] = {"status": "written", "files": files}
+            manifest[name] = {"key": key, "files": files}
+    finally:
+        if stale:
+            _save_manifest(manifest_path, manifest)
+    return results
+
+
+def export_decomposition(output_dir="data", model=None, df=None):
+    """
+    Write decomposition.csv and roas_summary.csv to output_dir.
+
+    With no model/df, fits the default model on the synthetic 104-week
+    data (the input the R chart expects).
+    """
+    if model is None or df is None:
+        from src.data.generate import generate_weekly_data
+        from src.model import MMM
+
+        df = generate_weekly_data(n_weeks=104, seed=42) if df is None else df
+        model = MMM().fit(df) if model is None else model
+
+    os.makedirs(output_dir, exist_ok=True)
+    tables = export_tables(model, df)
 
-    # Reorder columns for nicer output
-    cols = ["week", "base", "meta", "google", "tiktok", "reddit", "x", "twitch", "seasonality", "predicted"]
+    # time, base, channels, seasonality, predicted (no controls)
+    channels = [col.replace("spend_", "") for col in model.spend_cols_]
+    cols = [model.time_col, "base", *channels, "seasonality", "predicted"]
+    decomp = tables["decomposition"]
     decomp = decomp[[c for c in cols if c in decomp.columns]]
 
     decomp.to_csv(f"{output_dir}/decomposition.csv", index=False)
     print(f"Exported decomposition to {output_dir}/decomposition.csv")
 
     # Also export ROAS summary
-    roas = roas_summary(model, df)
+    roas = tables["roas"]
     roas.to_csv(f"{output_dir}/roas_summary.csv", index=False)
     print(f"Exported ROAS summary to {output_dir}/roas_summary.csv")
 
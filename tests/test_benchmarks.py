@@ -0,0 +1,35 @@
+from benchmarks import run
+from benchmarks.run import compare, make_data, run_benchmarks
+
+
+def test_make_data_scales_channels():
+    df = make_data(n_weeks=20, n_channels=9)
+    assert len(df) == 20
+    assert sum(c.startswith("spend_") for c in df.columns) == 9
+
+
+def test_benchmark_report_and_compare():
+    """A tiny run should produce comparable rows, and slowdowns get flagged."""
+    report = run_benchmarks(
+        weeks=[30], channels=[6], groups=[1], repeat=1, stages=["fit", "predict"]
+    )
+    assert [r["stage"] for r in report["results"]] == ["fit", "predict"]
+    assert all(r["wall_s"] > 0 and r["peak_mb"] >= 0 for r in report["results"])
+
+    slower = {
+        "meta": report["meta"],
+        "results": [dict(r, wall_s=r["wall_s"] * 2) for r in report["results"]],
+    }
+    rows = compare(report, slower, threshold=0.25)
+    assert len(rows) == 2
+    assert all(r["regressed"] for r in rows)
+
+
+def test_unselected_stages_skip_their_setup(monkeypatch):
+    def no_panel(*args):
+        raise AssertionError("panel built for a stage that wasn't selected")
+
+    monkeypatch.setattr(run, "make_panel", no_panel)
+    report = run_benchmarks(weeks=[30], channels=[6], groups=[1], repeat=1,
+                            stages=["fit"])
+    assert [r["stage"] for r in report["results"]] == ["fit"]
@@ -0,0 +1,130 @@
+import json
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+from src.cli import main
+
+
+def test_cli_pipeline(tmp_path, capsys):
+    data = str(tmp_path / "data.csv")
+    model = str(tmp_path / "model.mmm")
+    decomp = str(tmp_path / "decomp.csv")
+    roas = str(tmp_path / "roas.csv")
+
+    main(["generate", "--weeks", "80", "--out", data])
+    main(["fit", "--data", data, "--out", model, "--decay", "meta=0.7"])
+    main(["decompose", "--model", model, "--data", data,
+          "--out", decomp, "--roas", roas])
+
+    assert len(pd.read_csv(decomp)) == 80
+    assert "roas" in pd.read_csv(roas).columns
+
+    capsys.readouterr()
+    main(["scenario", "--model", model, "--data", data, "--set", "spend_meta=1.2"])
+    result = json.loads(capsys.readouterr().out)
+    assert result["spend_changes"]["spend_meta"]["delta"] > 0
+    assert result["sales_delta"] != 0
+
+
+def test_cli_batch_config(tmp_path):
+    data = str(tmp_path / "data.csv")
+    cv_out = str(tmp_path / "cv.json")
+    config = tmp_path / "jobs.toml"
+    config.write_text(f"""
+[[jobs]]
+command = "generate"
+weeks = 70
+out = "{data}"
+
+[[jobs]]
+command = "cv"
+data = "{data}"
+min_train_weeks = 60
+test_weeks = 5
+step = 5
+out = "{cv_out}"
+decay_rates = {{ meta = 0.7 }}
+""")
+
+    main(["batch", str(config)])
+
+    results = json.loads(open(cv_out).read())
+    assert results["n_folds"] == 2
+    assert "folds" not in results
+
+
+def test_cli_config_fills_required_options(tmp_path):
+    data = str(tmp_path / "data.csv")
+    model = str(tmp_path / "model.mmm")
+    main(["generate", "--weeks", "60", "--out", data])
+
+    config = tmp_path / "fit.json"
+    config.write_text(json.dumps({"data": data, "out": model, "alpha": 0.5}))
+    main(["fit", "--config", str(config)])
+
+    from src.model import load_model
+    assert load_model(model).alpha == 0.5
+
+
+def test_cli_generate_panel(tmp_path):
+    out = str(tmp_path / "panel.csv")
+    main(["generate", "--weeks", "14", "--freq", "D", "--titles", "2",
+          "--geos", "3", "--channels", "8", "--chunk-rows", "30", "--out", out])
+
+    df = pd.read_csv(out)
+    assert len(df) == 14 * 2 * 3
+    assert sum(c.startswith("spend_") for c in df.columns) == 8
+
+
+def test_cli_import_is_light():
+    code = (
+        "import sys, src.cli, src.viz, src.insights, src.service; "
+        "print(any(m.split('.')[0] in ('sklearn', 'matplotlib', 'scipy') "
+        "for m in sys.modules))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True,
+                         text=True, check=True).stdout
+    assert out.strip() == "False"
+
+
+def test_cli_export_many_models(tmp_path, capsys):
+    args = []
+    for name in ("a", "b"):
+        data = str(tmp_path / f"{name}.csv")
+        model = str(tmp_path / f"{name}.mmm")
+        main(["generate", "--weeks", "60", "--out", data])
+        main(["fit", "--data", data, "--out", model])
+        args += ["--model", model, "--data", data]
+
+    out_dir = str(tmp_path / "exports")
+    capsys.readouterr()
+    main(["export", *args, "--out-dir", out_dir])
+    assert "Exported 2 model(s), skipped 0" in capsys.readouterr().out
+    main(["export", *args, "--out-dir", out_dir])
+    assert "Exported 0 model(s), skipped 2" in capsys.readouterr().out
+    assert len(pd.read_csv(tmp_path / "exports" / "b" / "decomposition.csv")) == 60
+
+
+def test_cli_plot_many_models(tmp_path, capsys):
+    args = []
+    for name in ("a", "b"):
+        data = str(tmp_path / f"{name}.csv")
+        model = str(tmp_path / f"{name}.mmm")
+        main(["generate", "--weeks", "60", "--out", data])
+        main(["fit", "--data", data, "--out", model])
+        args += ["--model", model, "--data", data]
+
+    capsys.readouterr()
+    main(["plot", *args, "--chart", "contribution", "--out-dir", str(tmp_path)])
+    assert "2 model(s)" in capsys.readouterr().out
+    assert (tmp_path / "b" / "channel_contribution.png").exists()
+    assert not (tmp_path / "b" / "roas_by_channel.png").exists()
+
+
+def test_cli_config_without_file_is_a_usage_error(capsys):
+    with pytest.raises(SystemExit) as e:
+        main(["fit", "--config"])
+    assert e.value.code == 2
+    assert "--config needs a FILE" in capsys.readouterr().err
@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.data.generate import (
+    generate_panel_chunks,
+    generate_panel_data,
+    generate_weekly_data,
+    ground_truth,
+    write_chunks,
+)
+from src.data.ingest import iter_groups, load_panel
+from src.model import PanelMMM
+
+
+def test_weekly_data_handles_short_series():
+    for n_weeks in [1, 3, 4]:
+        df = generate_weekly_data(n_weeks=n_weeks, seed=1)
+        assert len(df) == n_weeks
+    # the launch spike is still there when the series is shorter than it
+    assert generate_weekly_data(n_weeks=2)["sales"].iloc[0] > 100000
+
+
+def test_panel_chunks_dont_depend_on_chunk_size():
+    kwargs = dict(n_periods=30, n_channels=9, titles=3, geos=2, seed=7)
+    whole = generate_panel_data(chunk_rows=10_000, **kwargs)
+    chunks = list(generate_panel_chunks(chunk_rows=50, **kwargs))
+
+    assert len(chunks) == 6  # one series per chunk
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), whole)
+
+    assert len(whole) == 30 * 3 * 2
+    spend_cols = [c for c in whole.columns if c.startswith("spend_")]
+    assert spend_cols == list(ground_truth(9, seed=7)["coefficients"])
+    assert whole.groupby(["title", "geo"], observed=True).size().eq(30).all()
+
+
+def test_daily_panel_has_day_and_week():
+    df = generate_panel_data(n_periods=21, freq="D", seed=1)
+    assert df["day"].tolist() == list(range(21))
+    assert df["week"].tolist() == [d // 7 for d in range(21)]
+    assert (df["date"].diff().dropna() == pd.Timedelta(days=1)).all()
+    assert ground_truth(freq="D")["weekday_amplitude"] > 0
+
+
+def test_write_chunks_csv(tmp_path):
+    path = str(tmp_path / "panel.csv")
+    chunks = generate_panel_chunks(n_periods=10, titles=2, geos=2, chunk_rows=20)
+    assert write_chunks(chunks, path) == 40
+
+    df = pd.read_csv(path)
+    assert len(df) == 40
+    np.testing.assert_array_equal(
+        df["sales"], generate_panel_data(n_periods=10, titles=2, geos=2)["sales"]
+    )
+
+
+def _long_exports(wide):
+    """Split a wide panel into long spend rows (two campaigns per channel)."""
+    spend_cols = [c for c in wide.columns if c.startswith("spend_")]
+    long = wide.melt(
+        id_vars=["geo", "date"], value_vars=spend_cols,
+        var_name="channel", value_name="spend",
+    )
+    long["channel"] = long["channel"].str.replace("spend_", "")
+    long["spend"] /= 2
+    parts = [long.assign(campaign=long["channel"] + f" {kind}") for kind in ("A", "B")]
+    spend = pd.concat(parts).sample(frac=1, random_state=0).drop(columns="channel")
+    channel_map = {
+        f"{ch} {kind}": ch for ch in long["channel"].unique() for kind in ("A", "B")
+    }
+    return spend, wide[["date", "geo", "sales"]], channel_map
+
+
+def test_ingest_pivots_long_exports_back_to_wide(tmp_path):
+    wide = generate_panel_data(n_periods=28, freq="D", geos=3, seed=3)
+    spend, sales, channel_map = _long_exports(wide)
+    spend.to_csv(tmp_path / "spend.csv", index=False)
+
+    daily = load_panel(
+        str(tmp_path / "spend.csv"), sales, channel_col="campaign",
+        channel_map=channel_map, freq="D", chunk_rows=100,
+    )
+    expected = wide.sort_values(["geo", "day"], ignore_index=True)
+    daily = daily.sort_values(["geo", "day"], ignore_index=True)
+    spend_cols = sorted(c for c in wide.columns if c.startswith("spend_"))
+
+    assert [c for c in daily.columns if c.startswith("spend_")] == spend_cols
+    np.testing.assert_allclose(daily[spend_cols], expected[spend_cols], atol=0.01)
+    np.testing.assert_array_equal(daily["sales"], expected["sales"])
+    np.testing.assert_array_equal(daily["week"], expected["week"])
+
+    # weekly: days summed into weeks counted from the first date
+    weekly = load_panel(spend, sales, channel_col="campaign", channel_map=channel_map)
+    assert len(weekly) == 3 * 4
+    by_week = expected.groupby(["geo", "week"], observed=True)["sales"].sum()
+    np.testing.assert_array_equal(weekly["sales"], by_week.to_numpy())
+
+
+def test_ingest_validates_rows():
+    wide = generate_panel_data(n_periods=14, freq="D", geos=2, seed=3)
+    spend, sales, channel_map = _long_exports(wide)
+
+    negative = spend.assign(spend=-spend["spend"])
+    with pytest.raises(ValueError, match="negative"):
+        load_panel(negative, sales, channel_col="campaign", channel_map=channel_map)
+
+    with pytest.raises(ValueError, match="channel_map"):
+        load_panel(spend, sales, channel_col="campaign", channel_map={})
+
+    gappy = sales[sales["date"] != sales["date"].iloc[5]]
+    with pytest.raises(ValueError, match="no sales"):
+        list(iter_groups(spend, gappy, channel_col="campaign",
+                         channel_map=channel_map, freq="D"))
+
+    # spend that has nowhere to go is an error, not silently dropped
+    kwargs = dict(channel_col="campaign", channel_map=channel_map)
+    with pytest.raises(ValueError, match="no sales rows"):
+        load_panel(spend, sales[sales["geo"] == "geo_0"], **kwargs)
+    with pytest.raises(ValueError, match="outside"):
+        load_panel(spend, sales[sales["date"] != sales["date"].max()],
+                   freq="D", **kwargs)
+
+
+def test_ingest_keeps_sales_precision():
+    wide = generate_panel_data(n_periods=14, freq="D", geos=1, seed=3)
+    spend, sales, channel_map = _long_exports(wide)
+    sales = sales.assign(sales=12345678.91)
+
+    daily = load_panel(spend, sales, channel_col="campaign",
+                       channel_map=channel_map, freq="D")
+    assert (daily["sales"] == 12345678.91).all()
+
+
+def test_ingest_feeds_panel_fit_one_group_at_a_time():
+    wide = generate_panel_data(n_periods=30, geos=2, seed=3)
+    spend, sales, channel_map = _long_exports(wide)
+    groups = iter_groups(spend, sales, channel_col="campaign", channel_map=channel_map)
+
+    panel = PanelMMM("geo").fit_groups(groups)
+    assert sorted(panel.models_) == ["geo_0", "geo_1"]
+    assert panel.errors_ == {}
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".arrow"])
+def test_ingest_reads_columnar_files(tmp_path, suffix):
+    pytest.importorskip("pyarrow")
+    import pyarrow.feather as feather
+
+    wide = generate_panel_data(n_periods=14, geos=2, seed=3)
+    spend, sales, channel_map = _long_exports(wide)
+    spend = spend.astype({"geo": str})
+    path = str(tmp_path / f"spend{suffix}")
+    if suffix == ".parquet":
+        spend.to_parquet(path, row_group_size=50)
+    else:
+        feather.write_feather(spend, path, chunksize=50)
+
+    kwargs = dict(channel_col="campaign", channel_map=channel_map, chunk_rows=40)
+    pd.testing.assert_frame_equal(
+        load_panel(path, sales, **kwargs), load_panel(spend, sales, **kwargs)
+    )
@@ -1,13 +1,19 @@
 import numpy as np
+import pytest
 from src.data.generate import generate_weekly_data
 from src.model import MMM
 from src.insights import (
     decompose_sales,
+    decompose_batch,
     contribution_summary,
     calculate_roas,
     roas_summary,
     budget_scenario,
+    budget_scenarios,
     optimize_reallocation,
+    optimize_budget,
+    bootstrap_intervals,
+    response_curves,
 )
 
 
@@ -28,6 +34,105 @@ def test_decomposition_sums_to_predictions():
     )
 
 
+def test_decomposition_is_memoized_until_refit():
+    df = generate_weekly_data(n_weeks=52, seed=789)
+    model = MMM().fit(df)
+
+    first = decompose_sales(model, df)
+    first["base"] = 0  # callers get their own copy
+    calculate_roas(model, df)
+    contribution_summary(model, df)
+    assert len(model._decomposition_cache) == 1
+
+    second = decompose_sales(model, df)
+    np.testing.assert_allclose(second["predicted"], model.predict(df))
+
+    model.fit(df.iloc[:40])
+    assert len(model._decomposition_cache) == 0
+    np.testing.assert_allclose(
+        decompose_sales(model, df)["predicted"], model.predict(df)
+    )
+
+
+def _steady_state_contribution(model, df, channel, spend, n_weeks=300):
+    """Last-week predicted lift from holding one channel at spend forever."""
+    frame = df.iloc[[0] * n_weeks].reset_index(drop=True)
+    frame["week"] = np.arange(n_weeks)
+    frame[model.spend_cols_] = 0.0
+    baseline = model.predict(frame)[-1]
+    frame[f"spend_{channel}"] = spend
+    return model.predict(frame)[-1] - baseline
+
+
+def test_response_curves_match_steady_state_predictions():
+    df = generate_weekly_data(n_weeks=104, seed=789)
+    kernel = {"type": "weibull", "shape": 2.0, "scale": 3.0, "max_lag": 8}
+    model = MMM(
+        decay_rates={"meta": 0.6, "twitch": kernel},
+        saturation_method="hill",
+        saturation_params={"half_saturation": 60000, "slope": 1.5},
+    ).fit(df)
+    curves = response_curves(model)
+
+    for channel, spend in [("meta", 40000.0), ("twitch", 12000.0)]:
+        expected = _steady_state_contribution(model, df, channel, spend)
+        np.testing.assert_allclose(
+            curves.contribution(channel, spend), expected, rtol=1e-4
+        )
+        step = 1.0
+        slope = (curves.contribution(channel, spend + step)
+                 - curves.contribution(channel, spend)) / step
+        np.testing.assert_allclose(curves.marginal(channel, spend), slope, rtol=1e-2)
+
+    # past the table: computed exactly instead of clamped
+    far = 100 * model.spend_max_[0]
+    np.testing.assert_allclose(
+        curves.contribution("spend_meta", [far, 0.0]),
+        [_steady_state_contribution(model, df, "meta", far), 0.0],
+        rtol=1e-4, atol=1e-6,
+    )
+
+
+def test_response_curves_rebuild_after_refit():
+    df = generate_weekly_data(n_weeks=120, seed=789)
+    model = MMM().fit(df.iloc[:100])
+    curves = response_curves(model)
+    before = curves.contribution("meta", 30000.0)
+
+    model.update(df.iloc[100:])
+    assert response_curves(model) is curves
+    np.testing.assert_allclose(
+        curves.contribution("meta", 30000.0),
+        _steady_state_contribution(model, df, "meta", 30000.0),
+        rtol=1e-4,
+    )
+    assert curves.contribution("meta", 30000.0) != before
+
+
+def test_response_curves_reject_decay_of_one():
+    df = generate_weekly_data(n_weeks=52, seed=789)
+    model = MMM(decay_rates={"meta": 1.0}).fit(df)
+    with pytest.raises(ValueError, match="meta"):
+        response_curves(model)
+
+
+def test_decompose_batch_matches_single_frames():
+    df = generate_weekly_data(n_weeks=52, seed=789)
+    other = generate_weekly_data(n_weeks=30, seed=790)
+    model = MMM().fit(df)
+    other_model = MMM().fit(other)
+
+    batch = decompose_batch([model, other_model, model], [df, other, df.iloc[10:]])
+
+    assert [len(d) for d in batch] == [52, 30, 42]
+    for decomp, m, frame in zip(
+        batch, [model, other_model, model], [df, other, df.iloc[10:]]
+    ):
+        expected = decompose_sales(m, frame)
+        assert list(decomp.index) == list(frame.index)
+        np.testing.assert_allclose(decomp.to_numpy(), expected.to_numpy())
+
+
 def test_contribution_summary_runs():
     """Summary should return reasonable structure."""
     df = generate_weekly_data(n_weeks=52, seed=789)
@@ -94,3 +199,90 @@ def test_optimize_reallocation():
     assert result["from_channel"] == "reddit"
     assert result["to_channel"] == "meta"
     assert result["shift_amount"] > 0
+
+
+def test_budget_scenarios_match_single_scenario():
+    """Batched scenarios should agree with budget_scenario one by one."""
+    df = generate_weekly_data(n_weeks=52, seed=789)
+    model = MMM()
+    model.fit(df)
+
+    rng = np.random.default_rng(0)
+    multipliers = rng.uniform(0.5, 1.5, size=(5, len(model.spend_cols_)))
+    batch = budget_scenarios(model, df, multipliers, chunk_size=2)
+
+    assert batch["scenario_sales"].shape == (5,)
+    for i, row in enumerate(multipliers):
+        single = budget_scenario(model, df, dict(zip(model.spend_cols_, row)))
+        np.testing.assert_allclose(batch["scenario_sales"][i], single["scenario_sales"])
+        np.testing.assert_allclose(batch["baseline_sales"], single["baseline_sales"])
+
+
+def test_budget_scenarios_subset_of_channels():
+    """Unlisted channels keep their spend."""
+    df = generate_weekly_data(n_weeks=52, seed=789)
+    model = MMM()
+    model.fit(df)
+
+    batch = budget_scenarios(model, df, [[1.1], [1.0]], spend_cols=["spend_meta"])
+    single = budget_scenario(model, df, {"spend_meta": 1.1})
+
+    np.testing.assert_allclose(batch["scenario_sales"][0], single["scenario_sales"])
+    np.testing.assert_allclose(batch["sales_delta"][1], 0, atol=1e-6)
+
+
+def test_optimize_budget_keeps_total_and_bounds():
+    """Optimal mix should spend the same budget, stay in bounds, and not lose sales."""
+    df = generate_weekly_data(n_weeks=52, seed=789)
+    model = MMM(alpha=0.1)
+    model.fit(df)
+
+    result = optimize_budget(model, df, bounds={"reddit": (1.0, 1.0)})
+
+    assert result["converged"]
+    assert result["multipliers"]["spend_reddit"] == pytest.approx(1.0)
+    assert all(0.5 - 1e-9 <= m <= 2.0 + 1e-9 for m in result["multipliers"].values())
+
+    new_total = sum(c["new"] for c in result["spend_changes"].values())
+    assert new_total == pytest.approx(df[model.spend_cols_].sum().sum())
+    # the current mix is feasible, so the optimum can't be worse
+    assert result["sales_delta"] >= -1e-6
+
+
+def test_optimize_budget_rejects_unreachable_budget():
+    df = generate_weekly_data(n_weeks=52, seed=789)
+    model = MMM()
+    model.fit(df)
+
+    with pytest.raises(ValueError):
+        optimize_budget(model, df, total_budget=1.0)
+
+
+def test_bootstrap_intervals_bracket_replicates():
+    """Point estimates match calculate_roas and intervals are ordered."""
+    df = generate_weekly_data(n_weeks=52, seed=789)
+    model = MMM()
+    model.fit(df)
+
+    summary = bootstrap_intervals(model, df, n_boot=30, block_size=4)
+    roas = calculate_roas(model, df)
+
+    assert len(summary) == 6
+    for _, row in summary.iterrows():
+        assert row["roas"] == pytest.approx(roas[row["channel"]]["roas"])
+        assert row["roas_lower"] <= row["roas_upper"]
+        assert row["contribution_lower"] <= row["contribution_upper"]
+
+
+def test_bootstrap_intervals_parallel_is_deterministic():
+    """Same seed should give the same intervals regardless of worker count."""
+    df = generate_weekly_data(n_weeks=52, seed=789)
+    model = MMM()
+    model.fit(df)
+
+    serial = bootstrap_intervals(model, df, n_boot=20, seed=1)
+    parallel = bootstrap_intervals(model, df, n_boot=20, seed=1, n_jobs=2)
+
+    np.testing.assert_allclose(
+        serial["roas_lower"].to_numpy(), parallel["roas_lower"].to_numpy()
+    )
@@ -1,6 +1,11 @@
+import subprocess
+import sys
+
 import numpy as np
+import pandas as pd
+import pytest
 from src.data.generate import generate_weekly_data
-from src.model import MMM
+from src.model import MMM, PanelMMM, load_model, save_model
 
 
 def test_model_fits():
@@ -42,3 +47,250 @@ def test_custom_decay_rates():
 
     # Should still work
     assert model.model is not None
+
+
+def test_feature_matrix_matches_named_features():
+    """The array pipeline and the named DataFrame view should agree."""
+    df = generate_weekly_data(n_weeks=52, seed=123)
+    model = MMM()
+    model.fit(df)
+
+    X = model._build_matrix(df)
+    features = model._build_features(df)
+
+    assert X.flags.c_contiguous
+    assert features.columns.tolist() == model.feature_names_
+    np.testing.assert_array_equal(features.to_numpy(), X)
+
+
+def test_feature_cache_reuses_same_data():
+    """Same content -> cached matrix; changed content -> rebuilt."""
+    df = generate_weekly_data(n_weeks=52, seed=123)
+    model = MMM()
+    model.fit(df)
+
+    X = model._build_matrix(df)
+    assert model._build_matrix(df.copy()) is X
+
+    changed = df.copy()
+    changed.loc[10, "spend_meta"] += 1000
+    assert model._build_matrix(changed) is not X
+
+    # refitting drops anything built under the old fit
+    model.fit(df)
+    assert model._build_matrix(df) is not X
+
+
+def _panel(n_titles=3):
+    parts = []
+    for i in range(n_titles):
+        df = generate_weekly_data(n_weeks=52, seed=100 + i)
+        df["title"] = f"title_{i}"
+        parts.append(df)
+    # shuffle rows so groups have to be pulled back into week order
+    return pd.concat(parts, ignore_index=True).sample(frac=1, random_state=0)
+
+
+def test_daily_model_with_multiple_seasonalities():
+    from src.data.generate import generate_panel_data
+
+    df = generate_panel_data(n_periods=400, freq="D", seed=5)
+    model = MMM(seasonalities=[(7, 3), (365.25, 4)], time_col="day").fit(df)
+
+    fourier = [n for n in model.feature_names_ if n.startswith(("sin_", "cos_"))]
+    assert fourier[:2] == ["sin_7_1", "cos_7_1"]
+    assert len(fourier) == 2 * (3 + 4)
+    assert len(model.predict(df)) == 400
+
+    # default model keeps the plain sin_k / cos_k names
+    assert "sin_1" in MMM().fit(generate_weekly_data(n_weeks=52)).feature_names_
+
+
+def test_panel_fits_each_group():
+    """Each group's model should match fitting that group on its own."""
+    panel = _panel()
+    model = PanelMMM("title", n_jobs=2).fit(panel)
+
+    assert sorted(model.models_) == ["title_0", "title_1", "title_2"]
+    assert model.errors_ == {}
+
+    preds = model.predict(panel)
+    one = panel[panel["title"] == "title_1"].sort_values("week")
+    expected = MMM().fit(one).predict(one)
+
+    mask = panel["title"].to_numpy() == "title_1"
+    order = np.argsort(panel["week"].to_numpy()[mask])
+    np.testing.assert_allclose(preds[mask][order], expected)
+
+    # the batched prediction matches each group's own predict
+    for key, group_model in model.models_.items():
+        rows = panel["title"].to_numpy() == key
+        order = np.argsort(panel["week"].to_numpy()[rows])
+        np.testing.assert_allclose(
+            preds[rows][order],
+            group_model.predict(panel[rows].iloc[order]),
+            rtol=1e-10,
+        )
+
+
+def test_panel_isolates_failed_groups():
+    """A broken group is reported, the rest still fit and predict."""
+    panel = _panel(2)
+    panel.loc[panel["title"] == "title_0", "sales"] = np.nan
+
+    model = PanelMMM("title").fit(panel)
+
+    assert list(model.models_) == ["title_1"]
+    assert "title_0" in model.errors_
+
+    preds = model.predict(panel)
+    assert np.isnan(preds[panel["title"].to_numpy() == "title_0"]).all()
+
+    decomp = model.decompose_sales(panel)
+    assert (decomp["title"] == "title_1").all()
+    np.testing.assert_allclose(
+        decomp["predicted"].to_numpy(),
+        preds[panel["title"].to_numpy() == "title_1"],
+        rtol=1e-6,
+    )
+
+
+def test_update_matches_full_refit():
+    """Appending weeks with update() should land where a full fit does."""
+    df = generate_weekly_data(n_weeks=80, seed=123)
+    full = MMM(decay_rates={"meta": 0.8}).fit(df)
+
+    model = MMM(decay_rates={"meta": 0.8}).fit(df.iloc[:70])
+    model.update(df.iloc[70:75])
+    for i in range(75, 80):
+        model.update(df.iloc[i:i + 1])
+
+    np.testing.assert_allclose(model.adstock_state_, full.adstock_state_)
+    np.testing.assert_allclose(model.scaler.mean_, full.scaler.mean_)
+    np.testing.assert_allclose(model.predict(df), full.predict(df), rtol=1e-4)
+
+
+def test_kernel_adstock_update_matches_full_refit():
+    """Kernel channels carry their spend history through update()."""
+    df = generate_weekly_data(n_weeks=80, seed=123)
+    decay_rates = {
+        "meta": 0.8,
+        "twitch": {"type": "weibull", "shape": 2.0, "scale": 3, "max_lag": 8},
+        "tiktok": {"type": "delayed", "decay": 0.6, "delay": 2, "max_lag": 6},
+    }
+    full = MMM(decay_rates=decay_rates).fit(df)
+
+    model = MMM(decay_rates=decay_rates).fit(df.iloc[:70])
+    model.update(df.iloc[70:75])
+    for i in range(75, 80):
+        model.update(df.iloc[i:i + 1])
+
+    assert model.spend_history_.shape == (7, len(model.spend_cols_))
+    np.testing.assert_allclose(model.spend_history_, full.spend_history_)
+    np.testing.assert_allclose(model.scaler.mean_, full.scaler.mean_)
+    np.testing.assert_allclose(model.predict(df), full.predict(df), rtol=1e-4)
+
+
+def test_update_requires_fit():
+    df = generate_weekly_data(n_weeks=52, seed=123)
+    with pytest.raises(ValueError):
+        MMM().update(df)
+
+
+def test_artifact_round_trip(tmp_path):
+    """A saved and reloaded model should predict exactly like the original."""
+    df = generate_weekly_data(n_weeks=52, seed=123)
+    model = MMM(decay_rates={"meta": 0.7}, saturation_method="log").fit(df)
+
+    path = tmp_path / "model.mmm"
+    save_model(model, path)
+    loaded = load_model(path)
+
+    np.testing.assert_array_equal(loaded.predict(df), model.predict(df))
+    assert loaded.get_coefficients() == model.get_coefficients()
+    assert loaded.decay_rates == {"meta": 0.7}
+    np.testing.assert_array_equal(loaded.adstock_state_, model.adstock_state_)
+    np.testing.assert_array_equal(loaded.spend_max_, model.spend_max_)
+
+
+def test_artifact_keeps_kernel_adstock(tmp_path):
+    df = generate_weekly_data(n_weeks=52, seed=123)
+    kernel = {"type": "weibull", "shape": 2.0, "scale": 3.0, "max_lag": 8}
+    model = MMM(decay_rates={"meta": 0.7, "twitch": kernel}).fit(df)
+
+    path = tmp_path / "kernel.mmm"
+    save_model(model, path)
+    loaded = load_model(path)
+
+    assert loaded.decay_rates == {"meta": 0.7, "twitch": kernel}
+    np.testing.assert_array_equal(loaded.spend_history_, model.spend_history_)
+    np.testing.assert_array_equal(loaded.predict(df), model.predict(df))
+
+
+def test_artifact_keeps_seasonalities(tmp_path):
+    from src.data.generate import generate_panel_data
+
+    df = generate_panel_data(n_periods=120, freq="D", seed=5)
+    model = MMM(seasonalities=[(7, 2), (365.25, 3)], time_col="day").fit(df)
+
+    path = tmp_path / "daily.mmm"
+    save_model(model, path)
+    loaded = load_model(path)
+
+    assert loaded.seasonalities == [(7.0, 2), (365.25, 3)]
+    assert loaded.time_col == "day"
+    np.testing.assert_array_equal(loaded.predict(df), model.predict(df))
+
+
+def test_hill_saturation_model_and_artifact(tmp_path):
+    df = generate_weekly_data(n_weeks=52, seed=123)
+    params = {"half_saturation": {"meta": 80000, "google": 60000}, "slope": 1.5}
+    with pytest.raises(ValueError):
+        # every channel needs a half-saturation point
+        MMM(saturation_method="hill", saturation_params=params).fit(df)
+
+    params["half_saturation"] = dict(
+        params["half_saturation"], tiktok=40000, reddit=15000, x=20000, twitch=35000
+    )
+    model = MMM(saturation_method="hill", saturation_params=params).fit(df)
+    assert np.isfinite(model.predict(df)).all()
+
+    path = tmp_path / "hill.mmm"
+    save_model(model, path)
+    loaded = load_model(path)
+
+    assert loaded.saturation_params["half_saturation"]["meta"] == 80000
+    assert loaded.saturation_params["slope"]["x"] == 1.5
+    np.testing.assert_array_equal(loaded.predict(df), model.predict(df))
+
+
+def test_artifact_loads_without_sklearn(tmp_path):
+    """Scoring from an artifact shouldn't import sklearn at all."""
+    df = generate_weekly_data(n_weeks=52, seed=123)
+    path = tmp_path / "model.mmm"
+    save_model(MMM().fit(df), path)
+
+    code = (
+        "import sys\n"
+        "from src.data.generate import generate_weekly_data\n"
+        "from src.model import load_model\n"
+        f"model = load_model({str(path)!r})\n"
+        "model.predict(generate_weekly_data(n_weeks=52, seed=123))\n"
+        "assert 'sklearn' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_artifact_rejects_newer_format(tmp_path):
+    df = generate_weekly_data(n_weeks=52, seed=123)
+    path = tmp_path / "model.mmm"
+    save_model(MMM().fit(df), path)
+
+    with np.load(path) as data:
+        arrays = dict(data)
+    arrays["format_version"] = np.array(999)
+    with open(path, "wb") as f:
+        np.savez(f, **arrays)
+
+    with pytest.raises(ValueError):
+        load_model(path)
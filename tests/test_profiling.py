@@ -0,0 +1,76 @@
+import json
+
+import pandas as pd
+from src.data.generate import generate_weekly_data
+from src.model import MMM, PanelMMM
+from src.utils import profile, span
+from src.utils.profiling import active
+from src.validation import rolling_origin_cv
+
+
+def test_span_is_noop_without_profile():
+    assert active() is None
+    with span("anything", x=1) as s:
+        pass
+    with span("other") as t:
+        pass
+    assert s is t  # one shared null span, nothing allocated
+
+
+def test_profile_records_nested_fit_stages():
+    df = generate_weekly_data(n_weeks=60, seed=1)
+    with profile() as prof:
+        MMM().fit(df)
+        MMM().fit(df)
+
+    tree = prof.to_dict()["spans"]
+    assert [node["name"] for node in tree] == ["mmm.fit", "mmm.fit"]
+    children = [c["name"] for c in tree[0]["children"]]
+    assert children == ["mmm.features", "mmm.scale", "mmm.solve"]
+
+    summary = prof.summary()
+    fit = summary.set_index("name").loc["mmm.fit"]
+    assert fit["calls"] == 2
+    assert fit["self_ms"] < fit["total_ms"]
+
+    trace = prof.to_chrome_trace()
+    assert {e["ph"] for e in trace["traceEvents"]} == {"X"}
+    assert len(trace["traceEvents"]) == len(prof.records)
+    json.dumps(trace)
+
+
+def test_profile_memory_and_cv_folds(tmp_path):
+    df = generate_weekly_data(n_weeks=64, seed=2)
+    with profile(memory=True) as prof:
+        rolling_origin_cv(df, min_train_weeks=56, test_weeks=4, step=4)
+
+    folds = prof.summary(group_by="fold")
+    folds = folds[folds["name"] == "cv.fold"]
+    assert sorted(folds["fold"]) == [0, 1]
+    assert (prof.summary()["peak_bytes"] >= 0).all()
+    assert all("peak_bytes" in r for r in prof.records)
+
+    path = tmp_path / "profile.json"
+    prof.to_json(path)
+    assert json.loads(path.read_text())["spans"][0]["name"] == "cv"
+
+
+def test_profile_collects_spans_from_process_workers():
+    parts = []
+    for i in range(3):
+        part = generate_weekly_data(n_weeks=52, seed=10 + i)
+        part["title"] = f"title_{i}"
+        parts.append(part)
+    panel = pd.concat(parts, ignore_index=True)
+
+    with profile() as prof:
+        PanelMMM("title", n_jobs=2).fit(panel)
+
+    groups = [r for r in prof.records if r["name"] == "panel.group"]
+    assert sorted(r["attrs"]["group"] for r in groups) == [
+        "title_0", "title_1", "title_2"
+    ]
+    # attached under the panel.fit span in the parent process
+    root = prof.records[groups[0]["parent"]]
+    assert root["name"] == "panel.fit"
+    assert prof.to_dict()["spans"][0]["name"] == "panel.fit"
@@ -0,0 +1,158 @@
+import asyncio
+import json
+import urllib.request
+
+import numpy as np
+import pytest
+from src.data.generate import generate_weekly_data
+from src.insights import budget_scenario, response_curves
+from src.model import MMM, save_model
+from src.service import ScoringService, SizedLRU
+
+
+def test_sized_lru_evicts_oldest_by_size():
+    cache = SizedLRU(max_bytes=10, sizeof=len)
+    cache.put("a", "xxxx")
+    cache.put("b", "xxxx")
+    cache.get("a")  # a is now most recent
+    cache.put("c", "xxxx")
+
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+    assert cache.total_bytes == 8
+
+
+def test_sized_lru_resize_evicts_grown_entries():
+    evicted = []
+    cache = SizedLRU(max_bytes=10, sizeof=len, on_evict=evicted.append)
+    a, b = ["x"] * 4, ["x"] * 4
+    cache.put("a", a)
+    cache.put("b", b)
+
+    b.extend(["x"] * 4)  # b grew while cached
+    cache.resize("b")
+    assert evicted == ["a"]
+    assert cache.total_bytes == 8
+
+
+def test_sized_lru_coalesces_concurrent_loads():
+    """Two callers asking for the same missing key should share one load."""
+    cache = SizedLRU(max_bytes=100, sizeof=lambda v: 1)
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def main():
+        return await asyncio.gather(
+            cache.get_or_load("k", load), cache.get_or_load("k", load)
+        )
+
+    assert asyncio.run(main()) == ["value", "value"]
+    assert len(calls) == 1
+
+
+@pytest.fixture
+def artifacts(tmp_path):
+    df = generate_weekly_data(n_weeks=52, seed=789)
+    model = MMM().fit(df)
+    save_model(model, tmp_path / "model.mmm")
+    df.to_csv(tmp_path / "data.csv", index=False)
+    return model, df, str(tmp_path / "model.mmm"), str(tmp_path / "data.csv")
+
+
+def test_service_coalesces_identical_queries(artifacts):
+    model, df, model_path, data_path = artifacts
+    service = ScoringService()
+    body = {
+        "model": model_path,
+        "data": data_path,
+        "reallocations": {"spend_meta": 1.1},
+    }
+
+    async def main():
+        queries = [service.query("scenario", body) for _ in range(5)]
+        return await asyncio.gather(*queries)
+
+    results = asyncio.run(main())
+
+    expected = budget_scenario(model, df, {"spend_meta": 1.1})
+    assert all(r == results[0] for r in results)
+    np.testing.assert_allclose(results[0]["scenario_sales"], expected["scenario_sales"])
+    assert service.coalesced == 4
+    assert service.models.misses == 1
+
+
+def test_service_tracks_model_cache_growth(artifacts):
+    _, df, model_path, _ = artifacts
+    service = ScoringService()
+    rows = json.loads(df.to_json(orient="records", date_format="iso"))
+
+    async def main():
+        await service.query("response", {"model": model_path, "spend": {"meta": 1}})
+        before = service.models.total_bytes
+        await service.query("decompose", {"model": model_path, "rows": rows})
+        return before, service.models.total_bytes
+
+    before, after = asyncio.run(main())
+    # the decompose query cached features + a decomposition on the model
+    assert after > before
+
+    # a cache too small for the grown model drops it and its lock
+    service = ScoringService(max_cache_bytes=2 * before)
+    asyncio.run(main())
+    assert len(service.models) == 0
+    assert not service._model_locks
+
+
+def test_service_over_http(artifacts):
+    model, _, model_path, data_path = artifacts
+    service = ScoringService()
+
+    async def main():
+        server = await service.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+
+        def request(path, body=None):
+            data = json.dumps(body).encode() if body is not None else None
+            req = urllib.request.Request(f"http://127.0.0.1:{port}{path}", data=data)
+            try:
+                with urllib.request.urlopen(req) as resp:
+                    return resp.status, json.loads(resp.read())
+            except urllib.error.HTTPError as e:
+                return e.code, json.loads(e.read())
+
+        loop = asyncio.get_running_loop()
+        body = {"model": model_path, "data": data_path}
+        roas = await loop.run_in_executor(None, request, "/roas", body)
+        missing = await loop.run_in_executor(None, request, "/roas", {})
+        response = await loop.run_in_executor(
+            None, request, "/response",
+            {"model": model_path, "spend": {"meta": 40000, "google": 0}},
+        )
+        for path in ("/nope", "/nope/again"):
+            await loop.run_in_executor(None, request, path, {})
+        stats = await loop.run_in_executor(None, request, "/stats")
+
+        server.close()
+        await server.wait_closed()
+        return roas, missing, response, stats
+
+    roas, missing, response, stats = asyncio.run(main())
+
+    assert roas[0] == 200
+    assert len(roas[1]) == 6
+    assert missing[0] == 400
+    assert response[0] == 200
+    assert response[1]["channels"]["google"]["contribution"] == 0
+    np.testing.assert_allclose(
+        response[1]["total_contribution"],
+        response_curves(model).contribution("meta", 40000),
+    )
+    assert stats[1]["endpoints"]["/roas"]["requests"] == 2
+    assert "p99_ms" in stats[1]["endpoints"]["/roas"]
+    # unknown paths share one stats bucket
+    assert stats[1]["endpoints"]["other"]["requests"] == 2
+    assert "/nope" not in stats[1]["endpoints"]
@@ -1,5 +1,19 @@
 import numpy as np
-from src.transforms import adstock, saturation
+import pytest
+from src.transforms import (
+    adstock,
+    adstock_kernel,
+    adstock_matrix,
+    convolve_adstock,
+    delayed_kernel,
+    fourier_basis,
+    fourier_features,
+    saturation,
+    saturation_derivative,
+    saturation_grid,
+    saturation_grid_derivative,
+    weibull_kernel,
+)
 
 
 def test_adstock_basic():
@@ -48,3 +62,150 @@ def test_saturation_monotone():
         result = saturation(x, method=method)
         diffs = np.diff(result)
         assert np.all(diffs >= 0), f"{method} not monotone"
+
+
+def _reference_adstock(x, decay, initial=0.0):
+    """Plain Python recursion: out[t] = x[t] + decay * out[t - 1]."""
+    out, prev = [], initial
+    for value in x:
+        prev = value + decay * prev
+        out.append(prev)
+    return np.array(out)
+
+
+def test_adstock_matrix_matches_reference_recursion():
+    """Batched adstock should match the recursion for every channel."""
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 1000, size=(30, 4))
+    decays = [0.0, 0.3, 0.3, 0.9]
+    initial = [5.0, 0.0, 100.0, 250.0]
+
+    result = adstock_matrix(X, decays)
+    continued = adstock_matrix(X, decays, initial=initial)
+
+    for j, decay in enumerate(decays):
+        expected = _reference_adstock(X[:, j], decay)
+        np.testing.assert_allclose(result[:, j], expected, rtol=1e-12)
+        np.testing.assert_allclose(adstock(X[:, j], decay), expected, rtol=1e-12)
+        np.testing.assert_allclose(
+            continued[:, j], _reference_adstock(X[:, j], decay, initial[j]),
+            rtol=1e-12,
+        )
+
+
+def test_adstock_matrix_rejects_bad_decay():
+    """Same decay validation as the single-series version."""
+    with pytest.raises(ValueError):
+        adstock_matrix(np.ones((3, 2)), [0.5, 1.5])
+
+
+def test_convolve_adstock_fft_matches_direct():
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 100, (200, 4))
+    kernels = [weibull_kernel(2.0, 10, 90), weibull_kernel(0.8, 5, 30),
+               delayed_kernel(0.6, 3, 13), np.array([1.0])]
+
+    direct = convolve_adstock(X, kernels, method="direct")
+    fft = convolve_adstock(X, kernels, method="fft")
+    np.testing.assert_allclose(fft, direct, atol=1e-9)
+    # lag 0 weight is the first kernel entry
+    np.testing.assert_allclose(direct[:, 3], X[:, 3])
+
+
+def test_weibull_cdf_shape_one_is_geometric():
+    """exp(-lag/scale) weights are geometric decay exp(-1/scale)."""
+    X = np.random.default_rng(1).uniform(0, 10, (60, 2))
+    kernel = adstock_kernel(
+        {"type": "weibull", "shape": 1.0, "scale": 4.0, "max_lag": 60, "kind": "cdf"}
+    )
+    np.testing.assert_allclose(
+        convolve_adstock(X, kernel), adstock_matrix(X, np.exp(-1 / 4.0)), rtol=1e-10
+    )
+
+
+def test_convolve_adstock_history_continues_series():
+    X = np.random.default_rng(2).uniform(0, 10, (100, 3))
+    kernels = [weibull_kernel(2.0, 6, 20)] * 3
+    full = convolve_adstock(X, kernels)
+    tail = convolve_adstock(X[70:], kernels, history=X[:70])
+    np.testing.assert_allclose(tail, full[70:])
+
+
+def test_delayed_kernel_peaks_at_delay():
+    kernel = delayed_kernel(0.5, 3, 10)
+    assert kernel.argmax() == 3
+    assert kernel.max() == 1.0
+    with pytest.raises(ValueError):
+        adstock_kernel({"type": "gamma"})
+
+
+def test_saturation_derivative_matches_finite_difference():
+    x = np.linspace(1, 1000, 50)
+    h = 1e-4
+    for method in ["sqrt", "log"]:
+        numeric = (saturation(x + h, method) - saturation(x - h, method)) / (2 * h)
+        np.testing.assert_allclose(saturation_derivative(x, method), numeric, rtol=1e-6)
+
+
+def test_parametric_saturation_derivatives():
+    x = np.linspace(1, 200000, 50)
+    h = 1e-3
+    curves = {
+        "hill": {"half_saturation": 50000.0, "slope": 2.0},
+        "logistic": {"lam": 1e-5},
+    }
+    for method, params in curves.items():
+        numeric = (
+            saturation(x + h, method, **params) - saturation(x - h, method, **params)
+        ) / (2 * h)
+        np.testing.assert_allclose(
+            saturation_derivative(x, method, **params), numeric, rtol=1e-5
+        )
+
+
+def test_hill_half_saturation():
+    assert saturation(50000.0, "hill", half_saturation=50000.0) == 0.5
+    assert saturation(0.0, "hill", half_saturation=1.0, slope=3.0) == 0.0
+    with pytest.raises(ValueError):
+        saturation([1.0], "hill")  # half_saturation is required
+
+
+def test_saturation_grid_matches_one_setting_at_a_time():
+    rng = np.random.default_rng(0)
+    x = rng.uniform(0, 100000, (52, 3))
+    K = rng.uniform(10000, 80000, (20, 3))  # per channel
+    S = rng.uniform(0.5, 3.0, 20)  # shared by all channels
+
+    grid = saturation_grid(x, "hill", half_saturation=K, slope=S)
+    slopes = saturation_grid_derivative(x, "hill", half_saturation=K, slope=S)
+    assert grid.shape == slopes.shape == (20, 52, 3)
+
+    for i in range(20):
+        np.testing.assert_allclose(
+            grid[i], saturation(x, "hill", half_saturation=K[i], slope=S[i])
+        )
+        np.testing.assert_allclose(
+            slopes[i],
+            saturation_derivative(x, "hill", half_saturation=K[i], slope=S[i]),
+        )
+
+
+def test_fourier_basis_is_cached_and_read_only():
+    t = np.arange(730, dtype=float)
+    basis = fourier_basis(t, 365.25, 3)
+
+    assert basis.shape == (730, 6)
+    np.testing.assert_allclose(basis[:, 2], np.sin(2 * np.pi * 2 * t / 365.25))
+    np.testing.assert_allclose(basis[:, 3], np.cos(2 * np.pi * 2 * t / 365.25))
+    assert not basis.flags.writeable
+
+    # same time index (even as a new array) hits the cache
+    assert fourier_basis(t.copy(), 365.25, 3) is basis
+    assert fourier_basis(t[:-1], 365.25, 3) is not basis
+
+
+def test_fourier_features_stacks_periods():
+    t = np.arange(30)
+    features = fourier_features(t, [(7, 2), (365.25, 1)])
+    np.testing.assert_array_equal(features[:, :4], fourier_basis(t, 7, 2))
+    np.testing.assert_array_equal(features[:, 4:], fourier_basis(t, 365.25, 1))
@@ -1,6 +1,16 @@
 import numpy as np
 from src.data.generate import generate_weekly_data
-from src.validation import rolling_origin_cv, mae, mape, r_squared
+import pytest
+from src.validation import (
+    rolling_origin_cv,
+    mae,
+    mape,
+    r_squared,
+    grid_search,
+    random_search,
+    successive_halving,
+    regularization_path,
+)
 
 
 def test_mae_perfect():
@@ -60,3 +70,162 @@ def test_rolling_cv_respects_time():
     )
     for fold in results["folds"]:
         assert fold["train_weeks"] <= fold["test_start"]
+
+
+def test_grid_search_matches_rolling_cv():
+    """Shared-feature scoring should give the same numbers as plain CV."""
+    df = generate_weekly_data(n_weeks=80, seed=456)
+    grid = {"decay_rates": [{"meta": 0.7}], "alpha": [0.1, 1.0]}
+    results = grid_search(df, grid, step=8)
+
+    assert len(results["results"]) == 2
+    for r in results["results"]:
+        expected = rolling_origin_cv(df, step=8, **r["params"])
+        np.testing.assert_allclose(r["avg_mae"], expected["avg_mae"])
+
+
+def test_regularization_path_matches_rolling_cv():
+    """Path scores at any alpha should be what a plain CV fit gives."""
+    df = generate_weekly_data(n_weeks=80, seed=456)
+    result = regularization_path(df, l1_ratios=[0.5, 0.9], n_alphas=10, step=8)
+
+    assert result["scores"].shape == (2, 10)
+    assert result["coef_path"].shape == (2, len(result["feature_names"]), 10)
+    assert len(result["coefficients"]) == result["coef_path"].size
+
+    for i, k in [(0, 0), (1, 5)]:
+        expected = rolling_origin_cv(
+            df, step=8, alpha=result["alphas"][i, k],
+            l1_ratio=result["l1_ratios"][i],
+        )
+        np.testing.assert_allclose(result["scores"][i, k], expected["avg_mae"],
+                                   rtol=1e-5)
+
+    best = result["scores"].min()
+    assert result["best_score"] == best
+    assert result["model"].alpha == result["best_alpha"]
+    # biggest alpha in the grid zeroes every coefficient
+    np.testing.assert_allclose(result["coef_path"][:, :, 0], 0)
+
+
+def test_regularization_path_rejects_fixed_alpha():
+    df = generate_weekly_data(n_weeks=60, seed=456)
+    with pytest.raises(ValueError):
+        regularization_path(df, alpha=1.0)
+
+
+def test_grid_search_over_hill_curves():
+    df = generate_weekly_data(n_weeks=80, seed=456)
+    grid = {
+        "saturation_params": [
+            {"half_saturation": 20000.0},
+            {"half_saturation": 60000.0, "slope": 2.0},
+        ]
+    }
+    results = grid_search(df, grid, step=8, saturation_method="hill")
+
+    assert len(results["results"]) == 2
+    for r in results["results"]:
+        expected = rolling_origin_cv(
+            df, step=8, saturation_method="hill", **r["params"]
+        )
+        np.testing.assert_allclose(r["avg_mae"], expected["avg_mae"])
+
+
+def test_grid_search_mixes_fixed_and_parametric_curves():
+    """hill params are ignored by the sqrt candidates, not an error."""
+    df = generate_weekly_data(n_weeks=80, seed=456)
+    grid = {
+        "saturation_method": ["sqrt", "hill"],
+        "saturation_params": [{"half_saturation": 20000.0}],
+    }
+    results = grid_search(df, grid, step=8)
+
+    assert len(results["results"]) == 2
+    for r in results["results"]:
+        params = dict(r["params"])
+        if params["saturation_method"] == "sqrt":
+            params.pop("saturation_params")
+        expected = rolling_origin_cv(df, step=8, **params)
+        np.testing.assert_allclose(r["avg_mae"], expected["avg_mae"])
+
+
+def test_grid_search_parallel_matches_serial():
+    """Running candidates in a process pool shouldn't change the ranking."""
+    df = generate_weekly_data(n_weeks=80, seed=456)
+    grid = {"decay_rates": [0.3, 0.6], "saturation_method": ["sqrt", "log"]}
+
+    serial = grid_search(df, grid, step=8)
+    parallel = grid_search(df, grid, step=8, n_jobs=2)
+
+    assert serial["best_params"] == parallel["best_params"]
+    assert [r["avg_mae"] for r in serial["results"]] == [
+        r["avg_mae"] for r in parallel["results"]
+    ]
+
+
+def test_successive_halving_keeps_best():
+    """Only the final survivors should be scored on every fold."""
+    df = generate_weekly_data(n_weeks=80, seed=456)
+    grid = {"decay_rates": [0.3, 0.6], "alpha": [0.1, 1.0]}
+    results = successive_halving(df, grid, factor=2)
+
+    n_folds = rolling_origin_cv(df)["n_folds"]
+    best = results["results"][0]
+    assert best["params"] == results["best_params"]
+    assert best["n_folds"] == n_folds
+    assert any(r["n_folds"] < n_folds for r in results["results"])
+
+
+def test_random_search_samples_n_iter():
+    df = generate_weekly_data(n_weeks=80, seed=456)
+    results = random_search(df, {"alpha": [0.1, 1.0, 10.0]}, n_iter=3, step=8)
+    assert len(results["results"]) == 3
+
+
+def test_search_rejects_unknown_params():
+    df = generate_weekly_data(n_weeks=80, seed=456)
+    with pytest.raises(ValueError):
+        grid_search(df, {"n_fourier_terms": [1, 2]})
+
+
+def test_rolling_cv_reuse_features_matches():
+    """Slicing one full-series feature matrix should give the same folds."""
+    df = generate_weekly_data(n_weeks=80, seed=456)
+    baseline = rolling_origin_cv(df, step=8)
+    reused = rolling_origin_cv(df, step=8, reuse_features=True)
+
+    assert reused["n_folds"] == baseline["n_folds"]
+    for a, b in zip(baseline["folds"], reused["folds"]):
+        np.testing.assert_allclose(a["mae"], b["mae"])
+        np.testing.assert_allclose(a["r2"], b["r2"])
+
+
+def test_rolling_cv_warm_start_close_to_cold_start():
+    """Warm-started folds should land on the same solution within tolerance."""
+    df = generate_weekly_data(n_weeks=80, seed=456)
+    cold = rolling_origin_cv(df, step=4, alpha=0.1)
+    warm = rolling_origin_cv(
+        df, step=4, alpha=0.1, reuse_features=True, warm_start=True
+    )
+    np.testing.assert_allclose(warm["avg_mae"], cold["avg_mae"], rtol=1e-3)
+
+
+def test_rolling_cv_warm_start_needs_reuse():
+    df = generate_weekly_data(n_weeks=80, seed=456)
+    with pytest.raises(ValueError):
+        rolling_origin_cv(df, warm_start=True)
+
+
+def test_rolling_cv_parallel_folds_in_order():
+    """Fold-parallel CV should keep fold order and match the serial numbers."""
+    df = generate_weekly_data(n_weeks=80, seed=456)
+    serial = rolling_origin_cv(df, step=4)
+
+    for backend in ["process", "thread"]:
+        parallel = rolling_origin_cv(df, step=4, n_jobs=2, backend=backend)
+        assert [f["fold"] for f in parallel["folds"]] == list(
+            range(serial["n_folds"])
+        )
+        for a, b in zip(serial["folds"], parallel["folds"]):
+            np.testing.assert_allclose(a["mae"], b["mae"])
@@ -0,0 +1,145 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.data.generate import generate_weekly_data
+from src.insights import decompose_sales
+from src.model import MMM, save_model
+from src.viz import export_decomposition, export_models, plot_roas, render_charts
+from src.viz import charts
+from src.viz.export_data import export_tables
+
+
+@pytest.fixture
+def jobs(tmp_path):
+    jobs = {}
+    for i in range(3):
+        df = generate_weekly_data(n_weeks=60, seed=i)
+        data = tmp_path / f"t{i}.csv"
+        df.to_csv(data, index=False)
+        save_model(MMM().fit(df), tmp_path / f"t{i}.mmm")
+        jobs[f"t{i}"] = (str(tmp_path / f"t{i}.mmm"), str(data))
+    return jobs
+
+
+def test_export_models_skips_unchanged_inputs(tmp_path, jobs):
+    out = str(tmp_path / "out")
+    first = export_models(jobs, out)
+    assert {r["status"] for r in first.values()} == {"written"}
+
+    decomp = pd.read_csv(f"{out}/t0/decomposition.csv")
+    df = pd.read_csv(jobs["t0"][1])
+    assert decomp.columns[0] == "week"
+    np.testing.assert_allclose(decomp["predicted"], MMM().fit(df).predict(df))
+
+    again = export_models(jobs, out)
+    assert {r["status"] for r in again.values()} == {"skipped"}
+
+    # new data for one title -> only that one is redone
+    generate_weekly_data(n_weeks=60, seed=99).to_csv(jobs["t1"][1], index=False)
+    third = export_models(jobs, out)
+    assert [n for n, r in third.items() if r["status"] == "written"] == ["t1"]
+
+    with open(f"{out}/manifest.json") as f:
+        assert sorted(json.load(f)) == ["t0", "t1", "t2"]
+
+
+def test_export_models_in_memory_and_missing_files(tmp_path):
+    df = generate_weekly_data(n_weeks=60, seed=3)
+    model = MMM().fit(df)
+    out = str(tmp_path / "out")
+
+    export_models({"a": (model, df)}, out)
+    assert export_models({"a": (model, df)}, out)["a"]["status"] == "skipped"
+
+    # refit with other params -> new key
+    refit = MMM(alpha=0.5).fit(df)
+    assert export_models({"a": (refit, df)}, out)["a"]["status"] == "written"
+
+    # a deleted output is rewritten even though inputs match
+    (tmp_path / "out" / "a" / "roas.csv").unlink()
+    assert export_models({"a": (refit, df)}, out)["a"]["status"] == "written"
+
+    with pytest.raises(ValueError):
+        export_models({"a": (refit, df)}, out, formats=("xlsx",))
+
+
+def test_export_models_columnar_round_trip(tmp_path):
+    pytest.importorskip("pyarrow")
+    import pyarrow.feather as feather
+
+    df = generate_weekly_data(n_weeks=60, seed=3)
+    model = MMM().fit(df)
+    out = tmp_path / "out"
+    result = export_models({"a": (model, df)}, str(out), formats=("parquet", "arrow"))
+    assert len(result["a"]["files"]) == 4
+
+    tables = export_tables(model, df)
+    for table in ("decomposition", "roas"):
+        pd.testing.assert_frame_equal(
+            pd.read_parquet(out / "a" / f"{table}.parquet"), tables[table]
+        )
+        pd.testing.assert_frame_equal(
+            feather.read_feather(out / "a" / f"{table}.arrow"), tables[table]
+        )
+
+
+def test_export_decomposition_uses_model_channels(tmp_path):
+    df = generate_weekly_data(n_weeks=60, seed=3)
+    df = df.rename(columns={"spend_x": "spend_youtube"})
+    model = MMM().fit(df)
+
+    decomp, roas = export_decomposition(str(tmp_path), model=model, df=df)
+    assert "youtube" in decomp.columns and "x" not in decomp.columns
+    assert "promo" not in decomp.columns
+    np.testing.assert_allclose(
+        decomp["youtube"], decompose_sales(model, df)["youtube"]
+    )
+    assert set(roas["channel"]) == {c[6:] for c in model.spend_cols_}
+
+
+def test_render_charts_from_memory_and_paths(tmp_path, jobs):
+    df = generate_weekly_data(n_weeks=60, seed=5)
+    results = {"mem": export_tables(MMM().fit(df), df), **jobs}
+    out = str(tmp_path / "figs")
+
+    files = render_charts(results, out, n_jobs=2)
+    assert sorted(files) == ["mem", "t0", "t1", "t2"]
+    for paths in files.values():
+        assert [p.rsplit("/", 1)[1] for p in paths] == [
+            "roas_by_channel.png", "channel_contribution.png"
+        ]
+        for path in paths:
+            with open(path, "rb") as f:
+                assert f.read(8) == b"\x89PNG\r\n\x1a\n"
+
+    with pytest.raises(ValueError):
+        render_charts(results, out, charts=("pie",))
+
+
+def test_render_charts_uses_the_model_time_column(tmp_path):
+    df = generate_weekly_data(n_weeks=60, seed=5)
+    df = df.assign(day=df["week"] * 7).drop(columns="week")
+    model = MMM(time_col="day", seasonalities=[(365.25, 2)]).fit(df)
+
+    render_charts({"daily": export_tables(model, df)}, str(tmp_path),
+                  charts=("contribution",))
+    ax = charts._template("contribution").ax
+    assert ax.get_xlabel() == "Day"
+    assert ax.get_xlim() == (0, 7 * 59)
+
+
+def test_chart_templates_are_reused(tmp_path):
+    df = generate_weekly_data(n_weeks=60, seed=5)
+    roas = export_tables(MMM().fit(df), df)["roas"]
+
+    plot_roas(output_dir=str(tmp_path), roas=roas)
+    template = charts._template("roas")
+    plot_roas(output_dir=str(tmp_path), roas=roas.head(2))
+    assert charts._template("roas") is template
+    # the previous title's bars are gone, not drawn over
+    assert len(template.ax.patches) == 2
+    assert [t.get_text() for t in template.ax.get_yticklabels()] == list(
+        roas.head(2).sort_values("roas")["channel"]
+    )